@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Measure how much slower a loop runs when the debugger "continue"s
+over it with a line breakpoint set in a function that isn't called:
+with "set fastcontinue" off and on, and with "set codebreak" on, where
+no trace hook is left installed.
+
+Usage: bench-codebreak.py [--iterations N] [--repeat N]
+"""
+import time
+
+import benchutil as Mbenchutil  # Before trepan
+from trepan import debugger as Mdebugger
+from trepan.inout import stringarray as Mstringarray
+
+
+def square(x):
+    return x * x
+
+
+def never_called():
+    return
+
+
+def loop(iterations):
+    total = 0
+    for i in range(iterations):
+        total += square(i)
+        pass
+    return total
+
+
+def run_plain(iterations):
+    start = time.time()
+    loop(iterations)
+    return time.time() - start
+
+
+def run_debugged(iterations, fastcontinue, codebreak):
+    cmds = ['set fastcontinue %s' % ('on' if fastcontinue else 'off'),
+            'set codebreak %s' % ('on' if codebreak else 'off'),
+            'break %d' % (never_called.func_code.co_firstlineno + 1),
+            'continue']
+    d_opts = {'input' : Mstringarray.StringArrayInput(cmds),
+              'output': Mstringarray.StringArrayOutput()}
+    d = Mdebugger.Debugger(d_opts)
+    d.settings['highlight'] = 'plain'
+    d.core.start()
+    # We stop here and run cmds, so the loop runs under "continue".
+    start = time.time()
+    loop(iterations)
+    elapsed = time.time() - start
+    d.core.stop()
+    return elapsed
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__)
+    parser.add_option('--iterations', type='int', default=100000,
+                      help='number of loop iterations')
+    opts, args = parser.parse_args()
+
+    plain = Mbenchutil.best_of(opts.repeat, run_plain, opts.iterations)
+    print('%-22s %8.3fs' % ('plain', plain))
+    for title, run_args in (('fastcontinue off', (False, False)),
+                            ('fastcontinue on', (True, False)),
+                            ('codebreak on', (True, True))):
+        elapsed = Mbenchutil.best_of(opts.repeat, run_debugged,
+                                     opts.iterations, *run_args)
+        print('%-22s %8.3fs %6.1fx' % (title, elapsed, elapsed / plain))
+        pass
+    return
+
+if __name__ == '__main__':
+    main()
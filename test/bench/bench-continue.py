@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Measure how much slower programs in test/example run when the
+debugger "continue"s over them with a few breakpoints set, with and
+without "set fastcontinue".
+
+Usage: bench-continue.py [--repeat N]
+"""
+import os, sys, time
+
+import benchutil as Mbenchutil  # Before trepan
+from trepan import debugger as Mdebugger
+from trepan.inout import stringarray as Mstringarray
+
+# Program, its arguments, and the lines to set breakpoints on.
+PROGRAMS = (
+    ('fib.py',   ['20'], [7]),
+    ('hanoi.py', ['12'], [15, 16, 28]),
+    )
+
+
+def run_plain(path, args):
+    globals_ = {'__name__': '__main__', '__file__': path,
+                '__builtins__': __builtins__}
+    sys.argv = [path] + args
+    code = compile(open(path).read(), path, 'exec')
+    start = time.time()
+    exec(code, globals_)
+    return time.time() - start
+
+
+def run_debugged(path, args, linenos, fastcontinue):
+    cmds = ['set fastcontinue %s' % ('on' if fastcontinue else 'off')]
+    cmds += ['break %d' % lineno for lineno in linenos]
+    # One for each stop at a breakpoint and then some.
+    cmds += ['continue'] * 10
+    d_opts = {'input' : Mstringarray.StringArrayInput(cmds),
+              'output': Mstringarray.StringArrayOutput()}
+    d = Mdebugger.Debugger(d_opts)
+    d.settings['highlight'] = 'plain'
+    sys.argv = [path] + args
+    start = time.time()
+    d.run_script(path)
+    return time.time() - start
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__)
+    opts, args = parser.parse_args()
+
+    print('%-10s %8s  %17s  %17s' % ('program', 'plain', 'fastcontinue off',
+                                     'fastcontinue on'))
+    saved_argv, saved_stdout = sys.argv, sys.stdout
+    devnull = open(os.devnull, 'w')
+    for program, prog_args, linenos in PROGRAMS:
+        path = os.path.join(Mbenchutil.exampledir, program)
+        try:
+            sys.stdout = devnull
+            plain = Mbenchutil.best_of(opts.repeat, run_plain, path,
+                                       prog_args)
+            slow  = Mbenchutil.best_of(opts.repeat, run_debugged, path,
+                                       prog_args, linenos, False)
+            fast  = Mbenchutil.best_of(opts.repeat, run_debugged, path,
+                                       prog_args, linenos, True)
+        finally:
+            sys.argv, sys.stdout = saved_argv, saved_stdout
+            pass
+        print('%-10s %7.3fs  %8.3fs %6.1fx  %8.3fs %6.1fx' %
+              (program, plain, slow, slow / plain, fast, fast / plain))
+        pass
+    return
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""Measure what it costs to get the debugger going, from each of the
+ways in:
+
+  import          import trepan.api
+  debugger        create a Debugger()
+  debug           trepan.api.debug() to its first prompt, building the
+                  debugger as well
+  post_mortem     post_mortem() on an exception to its first prompt,
+                  building the debugger as well
+  standby         the same, with a debugger built by warm_standby()
+  help            run "trepan2 --help"
+  script          run "trepan2 --nx script.py" to its first prompt and
+                  back out, on end of input
+
+Each is measured in a new Python process, as it would be the first
+time. "python" is the time for running "python -c pass", which the
+last two include.
+
+The results are written in JSON, best and median times in seconds,
+so that runs before and after a change can be compared. Given the
+results of an earlier run with --baseline, each result also gets the
+ratio of its best time to the baseline's.
+
+Usage: bench-startup.py [--repeat N] [--output FILE] [--baseline FILE]
+                        [name ...]
+"""
+import json, os, platform, subprocess, sys, time
+from optparse import SUPPRESS_HELP
+
+import benchutil as Mbenchutil
+
+trepan2 = os.path.join(Mbenchutil.top_builddir, 'bin', 'trepan2')
+script = os.path.join(Mbenchutil.top_builddir, 'test', 'example', 'gcd.py')
+
+
+def first_prompt_input(cmds):
+    """Return debugger input giving `cmds', which records the time the
+    first command is read, that is when the debugger first prompts."""
+    from trepan.inout import stringarray as Mstringarray
+
+    class FirstPromptInput(Mstringarray.StringArrayInput):
+        prompt_time = None
+
+        def readline(self, use_raw=None, prompt=''):
+            if self.prompt_time is None:
+                self.prompt_time = time.time()
+                pass
+            return Mstringarray.StringArrayInput.readline(self, use_raw,
+                                                          prompt)
+        pass
+    return FirstPromptInput(cmds)
+
+
+def debugger_opts(cmds=[]):
+    from trepan.inout import stringarray as Mstringarray
+    return {'input':  first_prompt_input(cmds),
+            'output': Mstringarray.StringArrayOutput()}
+
+
+def crash():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        return sys.exc_info()
+    return None
+
+
+def time_import():
+    start = time.time()
+    import trepan.api  # NOQA
+    return time.time() - start
+
+
+def time_debugger():
+    from trepan import debugger as Mdebugger
+    d_opts = debugger_opts()
+    start = time.time()
+    Mdebugger.Debugger(d_opts)
+    return time.time() - start
+
+
+def time_debug():
+    from trepan import api as Mapi
+    d_opts = debugger_opts(['continue'])
+    start = time.time()
+    Mapi.debug(dbg_opts=d_opts)
+    Mapi.stop()
+    return d_opts['input'].prompt_time - start
+
+
+def time_post_mortem():
+    from trepan import debugger as Mdebugger, post_mortem as Mpost_mortem
+    d_opts = debugger_opts()
+    exc = crash()
+    start = time.time()
+    # This is what post_mortem() does without a debugger, but with
+    # input we can time.
+    d = Mdebugger.Debugger(d_opts)
+    Mpost_mortem.post_mortem(exc, dbg=d)
+    return d_opts['input'].prompt_time - start
+
+
+def time_standby():
+    from trepan import post_mortem as Mpost_mortem
+    d_opts = debugger_opts()
+    Mpost_mortem.warm_standby(d_opts).thread.join()
+    exc = crash()
+    start = time.time()
+    Mpost_mortem.post_mortem(exc, dbg=Mpost_mortem.standby.debugger())
+    return d_opts['input'].prompt_time - start
+
+
+IN_PROCESS = {
+    'import':      time_import,
+    'debugger':    time_debugger,
+    'debug':       time_debug,
+    'post_mortem': time_post_mortem,
+    'standby':     time_standby,
+    }
+
+COMMANDS = {
+    'python': [sys.executable, '-c', 'pass'],
+    'help':   [sys.executable, trepan2, '--help'],
+    'script': [sys.executable, trepan2, '--nx', '--highlight=plain',
+               script, '3', '5'],
+    }
+
+NAMES = ('python', 'import', 'debugger', 'debug', 'post_mortem',
+         'standby', 'help', 'script')
+
+
+def run_once(name):
+    """Measure `name' once in a new process and return the seconds it
+    took."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([Mbenchutil.top_builddir,
+                                         env.get('PYTHONPATH', '')])
+    devnull = open(os.devnull, 'r+')
+    try:
+        if name in COMMANDS:
+            start = time.time()
+            subprocess.call(COMMANDS[name], env=env, stdin=devnull,
+                            stdout=devnull, stderr=devnull)
+            return time.time() - start
+        output = subprocess.Popen([sys.executable, __file__, '--child',
+                                   name], env=env, stdin=devnull,
+                                  stdout=subprocess.PIPE).communicate()[0]
+    finally:
+        devnull.close()
+        pass
+    return float(output.split()[-1])
+
+
+def summarize(times):
+    times = sorted(times)
+    return {'best': times[0], 'median': times[len(times) // 2],
+            'runs': len(times)}
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__, repeat=5,
+                                     repeat_help='number of runs of each')
+    parser.add_option('--output', metavar='FILE',
+                      help='write the JSON results to FILE, not stdout')
+    parser.add_option('--baseline', metavar='FILE',
+                      help='compare with the JSON results in FILE')
+    parser.add_option('--child', help=SUPPRESS_HELP)
+    opts, names = parser.parse_args()
+
+    if opts.child:
+        # Print the time so run_once() can pick it up after anything
+        # the debugger may have printed.
+        print(repr(IN_PROCESS[opts.child]()))
+        return
+    for name in names:
+        if name not in NAMES:
+            parser.error('%s is not one of: %s' % (name, ', '.join(NAMES)))
+            pass
+        pass
+
+    results = {}
+    times = dict([(name, []) for name in names or NAMES])
+    # Take turns so that any drift in the machine's speed affects all
+    # alike.
+    for i in range(opts.repeat):
+        for name in times:
+            times[name].append(run_once(name))
+            pass
+        pass
+    baseline = {}
+    if opts.baseline:
+        baseline = json.load(open(opts.baseline))['results']
+        pass
+    for name, name_times in times.items():
+        results[name] = summarize(name_times)
+        if name in baseline:
+            results[name]['ratio'] = (results[name]['best'] /
+                                      baseline[name]['best'])
+            pass
+        pass
+    report = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': results}
+    text = json.dumps(report, indent=2, separators=(',', ': '),
+                      sort_keys=True)
+    if opts.output:
+        out = open(opts.output, 'w')
+        out.write(text + '\n')
+        out.close()
+    else:
+        print(text)
+        pass
+    return
+
+if __name__ == '__main__':
+    main()
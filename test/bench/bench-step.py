@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Measure how long "step N" takes to get to its stop in
+example/fib.py: counting each event in the full trace dispatcher, and
+fast-forwarding with the debugger's counting trace function.
+
+Usage: bench-step.py [--count N] [--fib N] [--repeat N]
+"""
+import os, sys, time
+
+import benchutil as Mbenchutil  # Before trepan
+from trepan import debugger as Mdebugger
+from trepan.inout import stringarray as Mstringarray
+
+fib_path = os.path.join(Mbenchutil.exampledir, 'fib.py')
+
+
+class TimedInput(Mstringarray.StringArrayInput):
+    """Notes the time at which each command is read."""
+    def __init__(self, inp):
+        Mstringarray.StringArrayInput.__init__(self, inp)
+        self.times = []
+        return
+
+    def readline(self, use_raw=None, prompt=''):
+        self.times.append(time.time())
+        return Mstringarray.StringArrayInput.readline(self, use_raw, prompt)
+    pass
+
+
+def run_step(count, fib_arg, fast_forward):
+    inp = TimedInput(['step %d' % count, 'quit!'])
+    d_opts = {'input' : inp, 'output': Mstringarray.StringArrayOutput()}
+    d = Mdebugger.Debugger(d_opts)
+    d.settings['highlight'] = 'plain'
+    if not fast_forward:
+        d.core._can_fast_forward = lambda: False
+        pass
+    sys.argv = [fib_path, str(fib_arg)]
+    d.run_script(fib_path)
+    # The time between reading "step" and reading the command after it.
+    return inp.times[1] - inp.times[0]
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__)
+    parser.add_option('--count', type='int', default=1000000,
+                      help='number of events to step')
+    parser.add_option('--fib', type='int', default=27,
+                      help='argument to give fib.py')
+    opts, args = parser.parse_args()
+
+    saved_argv = sys.argv
+    try:
+        slow = Mbenchutil.best_of(opts.repeat, run_step, opts.count,
+                                  opts.fib, False)
+        fast = Mbenchutil.best_of(opts.repeat, run_step, opts.count,
+                                  opts.fib, True)
+    finally:
+        sys.argv = saved_argv
+        pass
+    print('step %d' % opts.count)
+    print('%-14s %8.3fs' % ('full dispatch', slow))
+    print('%-14s %8.3fs %6.1fx faster' % ('fast-forward', fast, slow / fast))
+    return
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Measure what debugging one thread with trepan.api.debug_thread()
+costs the other threads, relative to running with no debugger.
+
+One thread is the target and sits in the debugger; the others run
+the same loop as bench-threads.py, each calling debug_if_targeted()
+first as a server would per request. They should get no trace
+function and run at full speed.
+
+Usage: bench-thread-target.py [--iterations N] [--repeat N]
+"""
+import os, sys, threading, time
+
+import benchutil as Mbenchutil  # Before trepan
+from trepan import api as Mapi, debugger as Mdebugger
+from trepan.inout import stringarray as Mstringarray
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def myfunction(iterations, lock, counter, traced):
+    Mapi.debug_if_targeted()
+    if sys.gettrace() is not None:
+        traced.append(threading.currentThread().getName())
+        pass
+    for i in range(iterations):
+        # entering critical section
+        lock.acquire()
+        counter[0] += 1
+        lock.release()
+        # exiting critical section
+        x = i * i
+        pass
+    return
+
+
+def target_function(ready, done):
+    """The thread being debugged: once it has stopped, it waits, as
+    though at a prompt, while the others run."""
+    Mapi.debug_if_targeted()
+    ready.set()
+    done.wait()
+    Mapi.stop({'remove': True})
+    return
+
+
+def never_called():
+    return
+
+
+def run_threads(nthreads, iterations):
+    """Run `nthreads' threads next to a target thread. Return the time
+    the threads other than the target took."""
+    lock = threading.Lock()
+    counter = [0]
+    traced = []
+    ready, done = threading.Event(), threading.Event()
+    target = threading.Thread(target=target_function, name='target',
+                              args=(ready, done))
+    target.start()
+    ready.wait()
+    threads = [threading.Thread(target=myfunction,
+                                args=(iterations, lock, counter, traced))
+               for i in range(nthreads)]
+    start = time.time()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.time() - start
+    done.set()
+    target.join()
+    assert counter[0] == nthreads * iterations
+    assert not traced, 'traced threads: %s' % traced
+    return elapsed
+
+
+def run_plain(nthreads, iterations):
+    return run_threads(nthreads, iterations)
+
+
+def run_targeted(nthreads, iterations):
+    d_opts = {'input' : Mstringarray.StringArrayInput(['continue']),
+              'output': Mstringarray.StringArrayOutput()}
+    d = Mdebugger.Debugger(d_opts)
+    # A breakpoint that is never reached, so the target thread keeps
+    # being traced.
+    d.core.bpmgr.add_breakpoint(os.path.realpath(__file__),
+                                never_called.func_code.co_firstlineno + 1)
+    Mdebugger.debugger_obj = d
+    Mapi.debug_thread(predicate=lambda t: t.getName() == 'target')
+    try:
+        return run_threads(nthreads, iterations)
+    finally:
+        Mdebugger.debugger_obj = None
+        pass
+    return
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__)
+    parser.add_option('--iterations', type='int', default=20000,
+                      help='number of loop iterations per thread')
+    opts, args = parser.parse_args()
+
+    print('%-8s %14s  %14s  %8s' % ('threads', 'plain iter/s',
+                                     'others iter/s', 'slowdown'))
+    for nthreads in THREAD_COUNTS:
+        total = nthreads * opts.iterations
+        plain, targeted = Mbenchutil.best_of_each(opts.repeat,
+                                                  (run_plain, run_targeted),
+                                                  nthreads, opts.iterations)
+        print('%-8d %14.0f  %14.0f  %7.2fx' %
+              (nthreads, total / plain, total / targeted, targeted / plain))
+        pass
+    return
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Measure the throughput of several threads running under the
+debugger while it "continue"s, relative to running them untraced.
+
+The worker is that of example/tlock.py minus the sleeps: each thread
+loops taking a lock shared by all of them around a short critical
+section, while example/bgthread.py's main thread waits for them.
+
+Usage: bench-threads.py [--iterations N] [--repeat N]
+"""
+import os, threading, time
+
+import benchutil as Mbenchutil  # Before trepan
+from trepan import debugger as Mdebugger
+from trepan.inout import stringarray as Mstringarray
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def myfunction(iterations, lock, counter):
+    for i in range(iterations):
+        # entering critical section
+        lock.acquire()
+        counter[0] += 1
+        lock.release()
+        # exiting critical section
+        x = i * i
+        pass
+    return
+
+
+def never_called():
+    return
+
+
+def run_threads(nthreads, iterations):
+    lock = threading.Lock()
+    counter = [0]
+    threads = [threading.Thread(target=myfunction,
+                                args=(iterations, lock, counter))
+               for i in range(nthreads)]
+    start = time.time()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.time() - start
+    assert counter[0] == nthreads * iterations
+    return elapsed
+
+
+def run_plain(nthreads, iterations):
+    return run_threads(nthreads, iterations)
+
+
+def run_debugged(nthreads, iterations):
+    d_opts = {'input' : Mstringarray.StringArrayInput([]),
+              'output': Mstringarray.StringArrayOutput()}
+    d = Mdebugger.Debugger(d_opts)
+    # A breakpoint that is never reached, so each line gets looked up.
+    d.core.bpmgr.add_breakpoint(os.path.realpath(__file__),
+                                never_called.func_code.co_firstlineno + 1)
+    d.core.step_ignore = -1
+    d.core.start({'force': True, 'tracer_start': {'include_threads': True}})
+    try:
+        return run_threads(nthreads, iterations)
+    finally:
+        # join() returns before a thread is completely done running
+        # traced code. Give them a moment before removing our hook.
+        time.sleep(0.1)
+        d.core.stop()
+        threading.settrace(None)
+        pass
+    return
+
+
+def main():
+    parser = Mbenchutil.option_parser(__doc__)
+    parser.add_option('--iterations', type='int', default=2000,
+                      help='number of loop iterations per thread')
+    opts, args = parser.parse_args()
+
+    print('%-8s %14s  %14s  %8s' % ('threads', 'plain iter/s',
+                                     'traced iter/s', 'slowdown'))
+    for nthreads in THREAD_COUNTS:
+        total = nthreads * opts.iterations
+        plain  = Mbenchutil.best_of(opts.repeat, run_plain, nthreads,
+                                    opts.iterations)
+        traced = Mbenchutil.best_of(opts.repeat, run_debugged, nthreads,
+                                    opts.iterations)
+        print('%-8d %14.0f  %14.0f  %7.1fx' %
+              (nthreads, total / plain, total / traced, traced / plain))
+        pass
+    return
+
+if __name__ == '__main__':
+    main()
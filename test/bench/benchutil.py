@@ -0,0 +1,43 @@
+"""What the benchmarks in this directory share: finding the trepan of
+this tree, their command-line options, and timing runs.
+
+Import this before trepan, so that the trepan measured is the one in
+this tree rather than an installed one."""
+import os, sys
+from optparse import OptionParser
+
+srcdir = os.path.abspath(os.path.dirname(__file__))
+top_builddir = os.path.abspath(os.path.join(srcdir, '..', '..'))
+exampledir = os.path.join(srcdir, '..', 'example')
+
+if top_builddir not in sys.path:
+    sys.path.insert(0, top_builddir)
+    pass
+
+
+def option_parser(doc, repeat=3,
+                  repeat_help='number of runs to take the best time of'):
+    """Return an OptionParser for a benchmark whose docstring `doc'
+    ends with its "Usage:" paragraph, with a --repeat option that
+    defaults to `repeat'."""
+    parser = OptionParser(usage=doc[doc.index('Usage:'):].strip())
+    parser.add_option('--repeat', type='int', default=repeat,
+                      help=repeat_help)
+    return parser
+
+
+def best_of(repeat, fn, *args):
+    """Return the least of `repeat' results of fn(*args)."""
+    return min([fn(*args) for i in range(repeat)])
+
+
+def best_of_each(repeat, fns, *args):
+    """Return the best time of each of `fns' over `repeat' runs, taking
+    turns so that any drift in the machine's speed affects all alike."""
+    times = [[] for fn in fns]
+    for i in range(repeat):
+        for fn, fn_times in zip(fns, times):
+            fn_times.append(fn(*args))
+            pass
+        pass
+    return [min(fn_times) for fn_times in times]
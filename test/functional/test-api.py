@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+import os, signal, sys, threading, unittest
+from fn_helper import compare_output, strarray_setup
+
+from trepan import api as Mapi, debugger as Mdebugger
+
+
+@Mapi.traced
+def double(n):
+    m = n * 2
+    return m
+
+
+class TestAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_debugger = Mdebugger.debugger_obj
+        return
+
+    def tearDown(self):
+        Mdebugger.debugger_obj = self.saved_debugger
+        return
+
+    def test_debugging(self):
+        # We stop at the first statement of the block, and tracing is
+        # gone afterwards.
+        cmds = ['next', 'continue']
+        d = strarray_setup(cmds)
+        Mdebugger.debugger_obj = d
+        with Mapi.debugging() as dbg:
+            x = 5  # NOQA
+            y = 6  # NOQA
+            pass
+        self.assertTrue(dbg is d)
+        self.assertFalse(d.core.is_started())
+        self.assertEqual(None, sys.gettrace())
+        self.assertEqual(None, threading._trace_hook)
+        z = 7  # NOQA
+        out = ['-- x = 5  # NOQA',
+               '-- y = 6  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_debugging_threads(self):
+        # A block in another thread, entered while this one's is
+        # running, traces its own thread too.
+        cmds = ['continue', 'continue']
+        d = strarray_setup(cmds)
+        Mdebugger.debugger_obj = d
+        entered = threading.Event()
+        traces = {}
+
+        def block():
+            with Mapi.debugging():
+                x = 1  # NOQA
+                traces['in thread'] = sys.gettrace()
+                pass
+            traces['after thread'] = sys.gettrace()
+            return
+
+        with Mapi.debugging():
+            y = 2  # NOQA
+            t = threading.Thread(target=block)
+            t.start()
+            t.join()
+            traces['in main'] = sys.gettrace()
+            pass
+        self.assertNotEqual(None, traces['in thread'])
+        self.assertEqual(None, traces['after thread'])
+        self.assertNotEqual(None, traces['in main'])
+        self.assertFalse(d.core.is_started())
+        self.assertEqual(None, sys.gettrace())
+        out = ['-- y = 2  # NOQA',
+               '-- x = 1  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_debugging_other_tracer(self):
+        # The trace hook and frame trace functions of another tool,
+        # like coverage, are left as they were.
+        cmds = ['continue']
+        d = strarray_setup(cmds)
+        Mdebugger.debugger_obj = d
+        events = []
+
+        def other_trace(frame, event, arg):
+            events.append(event)
+            return other_trace
+
+        def run():
+            with Mapi.debugging():
+                x = 1  # NOQA
+                pass
+            return sys._getframe().f_trace, sys.gettrace()
+
+        sys.settrace(other_trace)
+        try:
+            frame_trace, hook = run()
+        finally:
+            sys.settrace(None)
+            pass
+        self.assertEqual(other_trace, hook)
+        self.assertEqual(other_trace, frame_trace)
+        self.assertFalse(d.core.is_started())
+        out = ['-- x = 1  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_traced(self):
+        # We stop on entering the function, and only then.
+        cmds = ['step', 'continue']
+        d = strarray_setup(cmds)
+        Mdebugger.debugger_obj = d
+        self.assertEqual(8, double(4))
+        self.assertFalse(d.core.is_started())
+        self.assertEqual('double', double.__name__)
+        out = ['-> @Mapi.traced',
+               '-- m = n * 2']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_debug_thread(self):
+        # Only the target thread is traced, even when another one
+        # comes to debug_if_targeted() first.
+        cmds = ['next', 'continue']
+        d = strarray_setup(cmds)
+        Mdebugger.debugger_obj = d
+        traces = {}
+
+        def work(name):
+            Mapi.debug_if_targeted()
+            x = 1  # NOQA
+            traces[name] = sys.gettrace()
+            return
+
+        other = threading.Thread(target=work, args=('other',))
+        other.start()
+        other.join()
+        Mapi.debug_thread(predicate=lambda t: t.getName() == 'target')
+        for name in ('other2', 'target'):
+            t = threading.Thread(target=work, args=(name,), name=name)
+            t.start()
+            t.join()
+            pass
+        d.core.stop({'remove': True})
+        self.assertEqual(None, traces['other'])
+        self.assertEqual(None, traces['other2'])
+        self.assertNotEqual(None, traces['target'])
+        self.assertEqual(None, sys.gettrace())
+        self.assertEqual(None, threading._trace_hook)
+        self.assertFalse(Mapi.debug_if_targeted())
+        out = ['-- x = 1  # NOQA',
+               '-- traces[name] = sys.gettrace()']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_debug_thread_on_signal(self):
+        saved_handler = signal.getsignal(signal.SIGUSR1)
+        try:
+            self.assertEqual(None,
+                             Mapi.debug_thread_on_signal('SIGNOTTHERE'))
+            self.assertEqual(signal.SIGUSR1,
+                             Mapi.debug_thread_on_signal('USR1',
+                                                         thread_id=-1))
+            os.kill(os.getpid(), signal.SIGUSR1)
+            target = Mapi._thread_target[0]
+            self.assertEqual(-1, target.thread_id)
+            # Not us, so nothing happens.
+            self.assertFalse(Mapi.debug_if_targeted())
+        finally:
+            Mapi._thread_target = None
+            signal.signal(signal.SIGUSR1, saved_handler)
+            pass
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
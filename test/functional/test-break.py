@@ -1,6 +1,6 @@
 #!/usr/bin/env python
-import unittest
-from fn_helper import compare_output, strarray_setup
+import sys, threading, unittest
+from fn_helper import compare_output, get_lineno, strarray_setup
 
 
 class TestBreak(unittest.TestCase):
@@ -46,6 +46,190 @@ class TestBreak(unittest.TestCase):
         compare_output(self, out, d, cmds)
         return
 
+    def test_break_on_function_profile_hook(self):
+        # With just a function breakpoint set, "continue" and "finish"
+        # need only call and return events, not line tracing.
+        def foo():
+            return sys.getprofile()
+
+        cmds = ['break foo()', 'continue', 'finish', 'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        ##############################
+        x = 5  # NOQA
+        hook = foo()
+        y = 6  # NOQA
+        ##############################
+        d.core.stop()
+        self.assertEqual(d.core._profile_dispatch, hook)
+        self.assertEqual(None, sys.getprofile())
+        out = ['-- x = 5  # NOQA',
+               'xx def foo():',
+               '<- return sys.getprofile()']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_break_code_rewrite(self):
+        # With "set codebreak", "continue" turns off tracing until the
+        # rewritten code of foo() gets to the breakpoint.
+        def foo():
+            x = 1  # NOQA
+            return sys.gettrace()
+        code = foo.func_code
+        line = code.co_firstlineno + 1
+
+        cmds = ['set codebreak on', 'break %d' % line, 'continue',
+                'delete 1', 'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        ##############################
+        x = 5  # NOQA
+        hook = foo()
+        ##############################
+        d.core.stop()
+        # The settings are shared with the debuggers of other tests.
+        d.settings['codebreak'] = False
+        self.assertEqual(None, hook)
+        self.assertEqual(code, foo.func_code)
+        out = ['-- x = 5  # NOQA',
+               'xx x = 1  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_break_code_running(self):
+        # With "set codebreak", a breakpoint in a function that is
+        # already running, which goes on with its old code, still
+        # stops every time round.
+        def loop():
+            total = 0
+            for i in range(3):
+                total += i
+                pass
+            return total
+        loop_line = get_lineno() - 3
+
+        cmds = ['set codebreak on', 'step', 'step', 'step',
+                'break %d' % loop_line, 'continue', 'continue', 'continue',
+                'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        ##############################
+        x = loop()  # NOQA
+        ##############################
+        d.core.stop()
+        # The settings are shared with the debuggers of other tests.
+        d.settings['codebreak'] = False
+        out = ['-- x = loop()  # NOQA',
+               '-> def loop():',
+               '-- total = 0',
+               '-- for i in range(3):',
+               'xx total += i',
+               'xx total += i',
+               'xx total += i']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_break_outer_loop(self):
+        # A loop in a caller that "continue" left untraced sees a
+        # breakpoint set in it from the prompt.
+        def inner(i):
+            return i  # NOQA
+        inner_line = get_lineno() - 1
+
+        def outer():
+            total = 0
+            for i in range(3):
+                total += inner(i)
+                pass
+            return total
+        loop_line = get_lineno() - 3
+
+        cmds = ['break %d' % inner_line, 'continue', 'delete 1',
+                'break %d' % loop_line, 'continue', 'delete 2', 'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        ##############################
+        x = outer()
+        ##############################
+        d.core.stop()
+        self.assertEqual(3, x)
+        out = ['-- x = outer()',
+               'xx return i  # NOQA',
+               'xx total += inner(i)']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_thread_hook(self):
+        # Only start({'threads': True}) traces new threads, and stop()
+        # leaves a threading.settrace() hook that isn't ours alone.
+        d = strarray_setup(['continue'])
+        d.core.start()
+        hook = threading._trace_hook
+        d.core.stop()
+        self.assertEqual(None, hook)
+
+        d.core.start({'threads': True})
+        hook = threading._trace_hook
+        d.core.stop()
+        self.assertEqual(d.core._fast_continue_dispatch, hook)
+        self.assertEqual(None, threading._trace_hook)
+
+        def other_hook(frame, event, arg):
+            return None
+        threading.settrace(other_hook)
+        try:
+            d.core.start()
+            d.core.stop()
+            self.assertEqual(other_hook, threading._trace_hook)
+        finally:
+            threading.settrace(None)
+            pass
+        return
+
+    def test_break_running_thread(self):
+        # A loop that is already running in another thread sees a
+        # breakpoint set from the prompt of this one.
+        started, stopped, done = (threading.Event(), threading.Event(),
+                                  threading.Event())
+
+        def spin():
+            started.set()
+            while not done.isSet():
+                x = 1  # NOQA
+                pass
+            return
+        spin_line = get_lineno() - 3
+
+        def stop_hook(proc):
+            if threading.currentThread() is not main_thread:
+                stopped.set()
+                pass
+            return False
+
+        main_thread = threading.currentThread()
+        wait_line = get_lineno() + 11
+        cmds = ['break %d' % wait_line, 'continue', 'delete 1',
+                'break %d' % spin_line, 'continue', 'delete 2',
+                'continue']
+        d = strarray_setup(cmds)
+        d.core.processor.add_preloop_hook(stop_hook)
+        d.core.start({'threads': True})
+        ##############################
+        t = threading.Thread(target=spin)
+        t.start()
+        started.wait()
+        stopped.wait(5)
+        ##############################
+        done.set()
+        t.join()
+        d.core.stop()
+        self.assertTrue(stopped.isSet())
+        out = ['-- t = threading.Thread(target=spin)',
+               'xx stopped.wait(5)',
+               'xx x = 1  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
     # def test_break_at_line_number(self):
     #     import inspect
     #     curframe = inspect.currentframe()
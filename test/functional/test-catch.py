@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+import unittest
+from fn_helper import compare_output, strarray_setup
+
+
+class TestCatch(unittest.TestCase):
+
+    def test_catch_raised(self):
+        # Only exceptions of the classes asked for stop us, and only
+        # where they are raised.
+        def lookup(d, k):
+            return d[k]
+
+        def safe_lookup(d, k):
+            try:
+                return lookup(d, k)
+            except KeyError:
+                return None
+            return
+
+        cmds = ['catch LookupError', 'continue', 'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        for i in iter(range(3)):
+            pass
+        x = safe_lookup({}, 'a')  # NOQA
+        try:
+            y = 1 / 0  # NOQA
+        except ZeroDivisionError:
+            pass
+        d.core.stop(options={'remove': True})
+        out = ['-- for i in iter(range(3)):',
+               '!! return d[k]']
+        compare_output(self, out, d, cmds)
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
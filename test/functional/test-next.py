@@ -81,6 +81,94 @@ class TestNext(unittest.TestCase):
         compare_output(self, out, d, cmds)
         return
 
+    def test_next_over_deep_recursion(self):
+        # Next over, and finish out of, a deep recursion. Stack levels
+        # are tracked from call and return events, so this shouldn't
+        # take a stack walk for each of the events in between.
+        old_limit = sys.getrecursionlimit()
+        try:
+            self.next_over_deep_recursion(True)
+            self.next_over_deep_recursion(False)
+        finally:
+            sys.setrecursionlimit(old_limit)
+            pass
+        return
+
+    def test_next_over_yield(self):
+        # "next" and "finish" at a yield go on to where the generator
+        # is resumed, which here is deeper in the stack.
+        for fastcontinue in (True, False):
+            self.next_over_yield(fastcontinue)
+            pass
+        return
+
+    def next_over_yield(self, fastcontinue):
+        def numbers(n):
+            i = 0
+            while i < n:
+                yield i
+                i += 1
+            return
+
+        def deep(gen, depth):
+            if depth == 0:
+                return next(gen)
+            return deep(gen, depth - 1)
+
+        cmds = ['next', 'step', 'next', 'next', 'next', 'next', 'next',
+                'next', 'next', 'next', 'finish', 'continue']
+        d = strarray_setup(cmds)
+        d.settings['fastcontinue'] = fastcontinue
+        d.core.start()
+        gen = numbers(3)
+        a = next(gen)
+        b = deep(gen, 5)
+        c = next(gen)
+        d.core.stop(options={'remove': True})
+        self.assertEqual((0, 1, 2), (a, b, c))
+        out = ['-- gen = numbers(3)',
+               '-- a = next(gen)',
+               '-> def numbers(n):',
+               '-- i = 0',
+               '-- while i < n:',
+               '-- yield i',
+               '<- yield i',
+               '-- i += 1',
+               '-- while i < n:',
+               '-- yield i',
+               '<- yield i',
+               '<- yield i']
+        compare_output(self, out, d, cmds)
+        return
+
+    def next_over_deep_recursion(self, fastcontinue):
+        def deep(n):
+            if n <= 0: return 0
+            return deep(n-1) + 1
+
+        def deep_finish(n):
+            if n <= 0:
+                return 0
+            return deep_finish(n-1) + 1
+
+        cmds = ['next', 'step', 'finish', 'next', 'continue']
+        d = strarray_setup(cmds)
+        d.settings['fastcontinue'] = fastcontinue
+        # Setting up the debugger may have lowered this.
+        sys.setrecursionlimit(20000)
+        d.core.start()
+        x = deep(5000)  # NOQA
+        y = deep_finish(5000)  # NOQA
+        z = 5  # NOQA
+        d.core.stop(options={'remove': True})
+        out = ['-- x = deep(5000)  # NOQA',
+               '-- y = deep_finish(5000)  # NOQA',
+               '-> def deep_finish(n):',
+               '<- return deep_finish(n-1) + 1',
+               '-- z = 5  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
     pass
 
 if __name__ == '__main__':
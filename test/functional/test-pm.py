@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+import os, shutil, subprocess, sys, tempfile, threading, unittest
+from fn_helper import strarray_setup
+
+from trepan import debugger as Mdebugger, post_mortem as Mpost_mortem
+from trepan.inout import stringarray as Mstringarray
+
+top_builddir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '..', '..')
+
+# A module that sets up a standby debugger and uses it as it is being
+# imported. See test_import_while_building().
+STANDBY_MODULE = """
+from trepan import post_mortem as Mpost_mortem
+from trepan.inout import stringarray as Mstringarray
+standby = Mpost_mortem.warm_standby(
+    {'input':  Mstringarray.StringArrayInput([]),
+     'output': Mstringarray.StringArrayOutput()})
+# Give the standby thread time to get going.
+import time
+time.sleep(0.5)
+dbg = standby.debugger()
+"""
+
+# Import it, and check the debugger it got once the standby thread
+# is done too.
+STANDBY_IMPORT = """
+import pm_standby_mod as Mmod
+from trepan import debugger as Mdebugger
+Mmod.standby.thread.join()
+if (isinstance(Mmod.dbg, Mdebugger.Debugger) and
+    Mmod.standby.debugger() is Mmod.dbg):
+    print('built')
+"""
+
+
+class TestPostMortem(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_excepthook = sys.excepthook
+        self.saved_standby = Mpost_mortem.standby
+        return
+
+    def tearDown(self):
+        sys.excepthook = self.saved_excepthook
+        Mpost_mortem.standby = self.saved_standby
+        return
+
+    def crash(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            return sys.exc_info()
+        return None
+
+    def test_warm_standby(self):
+        cmds = ['continue']
+        d_opts = {'input':  Mstringarray.StringArrayInput(cmds),
+                  'output': Mstringarray.StringArrayOutput()}
+        standby = Mpost_mortem.warm_standby(d_opts)
+        self.assertEqual(Mpost_mortem.post_mortem_excepthook, sys.excepthook)
+        standby.thread.join()
+        d = standby.dbg
+        self.assertTrue(isinstance(d, Mdebugger.Debugger))
+        self.assertNotEqual(None, standby.build_time)
+        self.assertEqual(None, standby.latency)
+        d.settings['highlight'] = 'plain'
+
+        exc_type, exc_value, exc_tb = self.crash()
+        sys.excepthook(exc_type, exc_value, exc_tb,
+                       tb_fn=lambda *args: None)
+        self.assertTrue(standby.debugger() is d)
+        self.assertNotEqual(None, standby.latency)
+        entered = [line for line in d.intf[-1].output.output
+                   if line.startswith('Post-mortem debugger entered')]
+        self.assertEqual(1, len(entered))
+        return
+
+    def test_on_demand(self):
+        # Without a background thread, the debugger is built when the
+        # exception comes.
+        standby = Mpost_mortem.Standby(background=False)
+        self.assertEqual(None, standby.thread)
+        self.assertEqual(None, standby.dbg)
+        d = standby.debugger()
+        self.assertTrue(isinstance(d, Mdebugger.Debugger))
+        self.assertTrue(standby.debugger() is d)
+        return
+
+    def test_import_while_building(self):
+        # A module that, as it is being imported, sets up a standby
+        # debugger and asks for it. Python 2 has a single import lock,
+        # which the importing thread holds while the standby thread
+        # builds the debugger and imports what that needs. This runs
+        # in a new process, where nothing has been imported yet, and
+        # which we can kill if it hangs.
+        tmpdir = tempfile.mkdtemp()
+        try:
+            module = open(os.path.join(tmpdir, 'pm_standby_mod.py'), 'w')
+            module.write(STANDBY_MODULE)
+            module.close()
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join([tmpdir, top_builddir,
+                                                 env.get('PYTHONPATH', '')])
+            proc = subprocess.Popen([sys.executable, '-c', STANDBY_IMPORT],
+                                    env=env, stdout=subprocess.PIPE)
+            watchdog = threading.Timer(60, proc.kill)
+            watchdog.start()
+            output = proc.communicate()[0]
+            watchdog.cancel()
+        finally:
+            shutil.rmtree(tmpdir)
+            pass
+        self.assertEqual('built\n', output)
+        self.assertEqual(0, proc.returncode)
+        return
+
+    def test_post_mortem(self):
+        cmds = ['continue']
+        d = strarray_setup(cmds)
+        Mpost_mortem.post_mortem(self.crash(), dbg=d)
+        self.assertTrue(d.core.execution_status.startswith(
+            'Terminated with unhandled exception'))
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
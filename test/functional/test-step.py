@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 import tracer
-from fn_helper import strarray_setup, compare_output
+from fn_helper import strarray_setup, compare_output, get_lineno
 import sys
 
 if (sys.version_info >= (2, 7, 0)):
@@ -194,6 +194,117 @@ class TestStep(unittest.TestCase):
         compare_output(self, out, d, cmds)
         return
 
+    def test_step_justmycode(self):
+        # Stepping skips the standard library, but not our code that
+        # it calls.
+        import json
+
+        def hook(obj):
+            return obj
+
+        cmds = ['set justmycode on', 'step', 'step', 'step', 'step',
+                'continue']
+        d = strarray_setup(cmds)
+        d.core.start()
+        ##############################
+        x = json.loads('{"a": 1}', object_hook=hook)
+        y = 6  # NOQA
+        ##############################
+        d.core.stop()
+        self.assertEqual({'a': 1}, x)
+        out = ["-- x = json.loads('{\"a\": 1}', object_hook=hook)",
+               '-> def hook(obj):',
+               '-- return obj',
+               '<- return obj',
+               '-- y = 6  # NOQA']
+        compare_output(self, out, d, cmds)
+        return
+
+    def test_step_justmycode_same_code(self):
+        # A function of ours whose code is the same as that of a
+        # library function is still ours, even after stepping has
+        # skipped the library one.
+        import imp, os, shutil, tempfile
+        tmpdir = tempfile.mkdtemp()
+        try:
+            helpers = []
+            for dirname in ('lib', 'user'):
+                os.mkdir(os.path.join(tmpdir, dirname))
+                filename = os.path.join(tmpdir, dirname,
+                                        'helper_%s.py' % dirname)
+                with open(filename, 'w') as f:
+                    f.write('def helper(obj):\n    return obj\n')
+                    pass
+                module = imp.load_source('helper_' + dirname, filename)
+                helpers.append(module.helper)
+                pass
+            lib_helper, user_helper = helpers
+            self.assertEqual(lib_helper.func_code, user_helper.func_code)
+            cmds = ['set justmycode on', 'step', 'step', 'step',
+                    'continue']
+            d = strarray_setup(cmds)
+            d.core.library_filter.add_prefix(os.path.join(tmpdir, 'lib'))
+            d.core.start()
+            ##############################
+            x = lib_helper(1)  # NOQA
+            y = user_helper(2)  # NOQA
+            ##############################
+            d.core.stop()
+        finally:
+            shutil.rmtree(tmpdir)
+            pass
+        out = ['-- x = lib_helper(1)  # NOQA',
+               '-- y = user_helper(2)  # NOQA']
+        compare_output(self, out, d, cmds)
+        locations = [line for line in d.intf[-1].output.output
+                     if line.startswith('(helper_')]
+        self.assertEqual(['(helper_user.py:1): helper',
+                          '(helper_user.py:2): helper'], locations)
+        return
+
+    def test_step_count(self):
+        # "step N" and "next N" count through events in a cut-down
+        # trace function; see that they stop where counting in
+        # trace_dispatch() would, and still stop at breakpoints.
+        def fib(n):
+            if n <= 1: return 1
+            return fib(n-1) + fib(n-2)
+
+        bp_line = get_lineno() - 2
+        for fast_forward in (True, False):
+            cmds = ['step 9', 'step 3', 'next 2', 'break %d' % bp_line,
+                    'step 1000', 'continue']
+            d = strarray_setup(cmds)
+            counts = []
+            if fast_forward:
+                start_counting = d.core._start_counting
+
+                def count_start(frame):
+                    counts.append(d.core.step_ignore)
+                    start_counting(frame)
+                    return
+                d.core._start_counting = count_start
+            else:
+                d.core._can_fast_forward = lambda: False
+                pass
+            d.core.start()
+            ##############################
+            x = fib(3)
+            y = 6  # NOQA
+            ##############################
+            d.core.stop()
+            self.assertEqual(3, x)
+            if fast_forward:
+                self.assertEqual([8, 2, 1, 999], counts)
+                pass
+            out = ['-- x = fib(3)',
+                   '<- if n <= 1: return 1',
+                   '<- if n <= 1: return 1',
+                   '-> def fib(n):',
+                   'xx return fib(n-1) + fib(n-2)']
+            compare_output(self, out, d, cmds)
+            pass
+        return
     pass
 
 if __name__ == '__main__':
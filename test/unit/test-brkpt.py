@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 'Unit test for the debugger lib breakpoint'
-import re, unittest
+import re, thread, unittest
 
 from trepan.lib import breakpoint as Mbreakpoint
 
@@ -75,5 +75,147 @@ class TestBreakpoint(unittest.TestCase):
         foo(bp2, bpmgr)
         return
 
+    def test_line_index(self):
+        'Test BreakpointManager line index maintenance'
+        bpmgr = Mbreakpoint.BreakpointManager()
+        canonic_calls = []
+
+        def canonic(filename):
+            canonic_calls.append(filename)
+            return bpmgr.bpbynumber[1].filename
+
+        bp1 = bpmgr.add_breakpoint('foo', 5)
+        bp2 = bpmgr.add_breakpoint('foo', 5)
+        lines = bpmgr.lines_for_co_filename('./foo', canonic)
+        self.assertEqual(set([5]), lines)
+        self.assertTrue(lines is bpmgr.lines_for_co_filename('./foo',
+                                                             canonic))
+        self.assertEqual(['./foo'], canonic_calls,
+                         "canonic() should be called only once")
+
+        bpmgr.add_breakpoint('foo', 7)
+        self.assertEqual(set([5, 7]), lines)
+
+        # A line stays in the index while any breakpoint there is enabled
+        bpmgr.en_disable_breakpoint_by_number(bp1.number, False)
+        self.assertEqual(set([5, 7]), lines)
+        bpmgr.en_disable_breakpoint_by_number(bp2.number, False)
+        self.assertEqual(set([7]), lines)
+        bpmgr.en_disable_all_breakpoints(do_enable=True)
+        self.assertEqual(set([5, 7]), lines)
+        bpmgr.en_disable_all_breakpoints(do_enable=False)
+        self.assertEqual(set(), lines)
+        bpmgr.en_disable_all_breakpoints(do_enable=True)
+
+        bpmgr.delete_breakpoint(bp1)
+        self.assertEqual(set([5, 7]), lines)
+        bpmgr.delete_breakpoint_by_number(bp2.number)
+        self.assertEqual(set([7]), lines)
+        bpmgr.delete_all_breakpoints()
+        self.assertEqual(set(), lines)
+
+        bpmgr.reset()
+        self.assertEqual({}, bpmgr.co_filename_lines)
+        return
+
+    def test_fn_breakpoints(self):
+        'Test function breakpoint index'
+        bpmgr = Mbreakpoint.BreakpointManager()
+
+        def foo(): return
+
+        def bar(): return
+
+        class Klass:
+            def foo(self): return
+            pass
+
+        code = foo.func_code
+        self.assertEqual(None, bpmgr.fn_breakpoints(code))
+        bp1 = bpmgr.add_breakpoint('foo', code.co_firstlineno, func=foo)
+        bp2 = bpmgr.add_breakpoint('foo', code.co_firstlineno, func=foo)
+        self.assertEqual([bp1, bp2], bpmgr.fn_breakpoints(code))
+
+        # Only the very same code matches, not just the same name
+        self.assertEqual(None,
+                         bpmgr.fn_breakpoints(Klass.foo.im_func.func_code))
+        self.assertEqual(None, bpmgr.fn_breakpoints(bar.func_code))
+        method = Klass().foo
+        bp3 = bpmgr.add_breakpoint('foo', 10, func=method)
+        self.assertEqual([bp3],
+                         bpmgr.fn_breakpoints(Klass.foo.im_func.func_code))
+
+        bpmgr.delete_breakpoint(bp1)
+        self.assertEqual([bp2], bpmgr.fn_breakpoints(code))
+        bpmgr.delete_breakpoint(bp2)
+        self.assertEqual(None, bpmgr.fn_breakpoints(code))
+        self.assertEqual([method], list(bpmgr.fnlist.keys()))
+        return
+
+    def test_condition(self):
+        'Test compiled breakpoint conditions'
+        bpmgr = Mbreakpoint.BreakpointManager()
+
+        class MockFrame:
+            f_lineno = 10
+            f_globals = {}
+            f_locals = {'x': 5}
+            pass
+        frame = MockFrame()
+        bp = bpmgr.add_breakpoint('foo', 10, condition='x > 10')
+        self.assertEqual('x > 10', bp.condition)
+        self.assertTrue(bp.condition_code is not None)
+        self.assertEqual((None, None), bpmgr.find_bp(bp.filename, 10, frame))
+        self.assertEqual(1, bp.hits)
+        self.assertTrue(bp.condition_time >= 0.0)
+
+        frame.f_locals = {'x': 20}
+        self.assertEqual((bp, True), bpmgr.find_bp(bp.filename, 10, frame))
+
+        # A bad condition is rejected and leaves the old one in place
+        self.assertRaises(SyntaxError, bp.set_condition, 'x >')
+        self.assertEqual('x > 10', bp.condition)
+        self.assertRaises(SyntaxError, bpmgr.add_breakpoint, 'foo', 11,
+                          False, 'x >')
+
+        bp.set_condition(None)
+        self.assertEqual(None, bp.condition_code)
+        frame.f_locals = {'x': 1}
+        self.assertEqual((bp, True), bpmgr.find_bp(bp.filename, 10, frame))
+        return
+
+    def test_thread_ids(self):
+        'Test breakpoints limited to some threads'
+        bpmgr = Mbreakpoint.BreakpointManager()
+
+        class MockFrame:
+            f_lineno = 10
+            f_globals = {}
+            f_locals = {}
+            pass
+        frame = MockFrame()
+        me = thread.get_ident()
+        bp = bpmgr.add_breakpoint('foo', 10, condition='1/0',
+                                  thread_ids=[me + 1])
+        self.assertEqual(frozenset([me + 1]), bp.thread_ids)
+        self.assertTrue(re.search('stop only in thread %d' % (me + 1),
+                                  str(bp)))
+        self.assertFalse(bpmgr.in_thread([bp]))
+
+        # Another thread's breakpoint is passed over without being
+        # counted or having its condition evaluated.
+        self.assertEqual((None, None), bpmgr.find_bp(bp.filename, 10, frame))
+        self.assertEqual(0, bp.hits)
+        self.assertEqual(0, bpmgr.condition_evals)
+
+        bp2 = bpmgr.add_breakpoint('foo', 10, thread_ids=[me, me + 1])
+        self.assertTrue(bpmgr.in_thread([bp, bp2]))
+        self.assertEqual((bp2, True), bpmgr.find_bp(bp.filename, 10, frame))
+        bp2.disable()
+        self.assertFalse(bpmgr.in_thread([bp, bp2]))
+        bp3 = bpmgr.add_breakpoint('foo', 10)
+        self.assertTrue(bpmgr.in_thread([bp, bp2, bp3]))
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 'Unit test for trepan.bytecode'
-import inspect, unittest
+import inspect, sys, unittest
 
 from trepan.lib import bytecode as Mcode
 from xdis import IS_PYPY, PYTHON_VERSION
@@ -36,5 +36,52 @@ class TestByteCode(unittest.TestCase):
         self.assertFalse(Mcode.is_def_stmt('foo(): pass', frame))
         return
 
+    def test_code_line_range(self):
+        def sqr(x):
+            y = x * x
+            return y
+        first = sqr.func_code.co_firstlineno
+        self.assertEqual((first, first+2), Mcode.code_line_range(sqr.func_code))
+        return
+
+    def test_insert_call(self):
+        def loop(n):
+            total = 0
+            for i in range(n):
+                if i % 2:
+                    total += i
+                    pass
+                pass
+            return total
+        first = loop.func_code.co_firstlineno
+        calls = []
+
+        def hook():
+            calls.append(sys._getframe(1).f_lineno)
+            return
+        code = loop.func_code
+        for lineno in (first+1, first+4, first+7):
+            offsets = Mcode.line_offsets(code, lineno)
+            self.assertEqual(1, len(offsets))
+            code = Mcode.insert_call(code, offsets[0], hook)
+            pass
+        loop.func_code = code
+        self.assertEqual(4, loop(5))
+        self.assertEqual([first+1, first+4, first+4, first+7], calls)
+        self.assertEqual((first, first+7), Mcode.code_line_range(code))
+        return
+
+    def test_is_yielding(self):
+        def numbers():
+            yield 1
+            return
+        gen = numbers()
+        frame = gen.gi_frame
+        self.assertFalse(Mcode.is_yielding(frame))
+        next(gen)
+        self.assertTrue(Mcode.is_yielding(frame))
+        self.assertFalse(Mcode.is_yielding(inspect.currentframe()))
+        return
+
 if __name__ == '__main__':
     unittest.main()
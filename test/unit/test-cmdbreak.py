@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 'Unit test for pydbgr.processor.cmdproc'
-import sys, unittest
+import sys, thread, threading, unittest
 import os.path as osp
 
 from trepan.processor import cmdproc as Mcmdproc
 from trepan.processor.command import mock as Mmock
-from trepan.processor.cmdbreak import parse_break_cmd
+from trepan.processor.cmdbreak import parse_break_cmd, parse_thread_clause
 
 def canonic_tuple(t):
     fname = t[1]
@@ -86,6 +86,34 @@ class TestCmdParse(unittest.TestCase):
         pass
         return
 
+    def test_thread_clause(self):
+        me = thread.get_ident()
+        name = threading.currentThread().getName()
+        for cmd, expect_cmd, expect_ids in (
+                ('break 10', 'break 10', None),
+                ('break 10 if thread', 'break 10 if thread', None),
+                ('break 10 thread %s' % name, 'break 10', set([me])),
+                ('break thread %d' % me, 'break', set([me])),
+                ('break 10 thread %s if x > thread' % name,
+                 'break 10 if x > thread', set([me])),
+                ):
+            args = cmd.split(' ')
+            self.cp.current_command = cmd
+            args, thread_ids = parse_thread_clause(self.cp, args)
+            self.assertEqual(expect_cmd.split(' '), args)
+            self.assertEqual(expect_cmd, self.cp.current_command)
+            self.assertEqual(expect_ids, thread_ids)
+            pass
+
+        cmd = 'break 10 thread no-such-thread'
+        self.cp.current_command = cmd
+        self.assertEqual((None, None),
+                         parse_thread_clause(self.cp, cmd.split(' ')))
+        self.assertEqual(1, len(self.errors))
+        self.assertTrue("Don't know about thread no-such-thread" in
+                        self.errors[0])
+        return
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -71,7 +71,7 @@ class TestCompletion(unittest.TestCase):
                      ['args', 'break', 'builtins', 'code', 'display', 'files', 'frame',
                       'globals', 'line',
                       'locals', 'macro', 'pc', 'program', 'return', 'signals', 'source',
-                      'threads']],
+                      'stops', 'threads', 'trace-stats']],
 
                     ['help sta', ['stack', 'status']],
                     [' unalias c',  ['c', 'chdir', 'cond']],
@@ -1,14 +1,25 @@
 #!/usr/bin/env python
 'Unit test for trepan.processor.cmdproc'
-import os, sys, unittest
+import json, os, sys, threading, unittest
 
-from trepan.lib import core as Mcore
+import tracefilter
+
+from trepan.lib import codefilter as Mcodefilter, core as Mcore
+from trepan.lib import default as Mdefault
+from trepan.lib import stack as Mstack
 
 
 class MockProcessor:
     pass
 
 
+class MockDebugger:
+    def __init__(self):
+        self.settings = dict(Mdefault.DEBUGGER_SETTINGS)
+        return
+    pass
+
+
 class TestCore(unittest.TestCase):
 
     def test_is_next_stop(self):
@@ -34,5 +45,266 @@ class TestCore(unittest.TestCase):
                              'canonic should produce an absolute file')
         return
 
+    def test_is_break_here(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(None, opts=opts)
+        dc.event = 'line'
+        frame = sys._getframe()
+        filename = dc.canonic_filename(frame)
+        self.assertFalse(dc.is_break_here(frame, None))
+
+        bp = dc.bpmgr.add_breakpoint(filename, frame.f_lineno + 1)
+        self.assertTrue(dc.is_break_here(frame, None))
+        self.assertEqual(bp, dc.current_bp)
+        self.assertEqual('brkpt', dc.event)
+
+        # The event and breakpoint are those of this thread only.
+        seen = []
+        thread = threading.Thread(
+            target=lambda: seen.append((dc.event, dc.current_bp)))
+        thread.start()
+        thread.join()
+        self.assertEqual([(None, None)], seen)
+
+        dc.event = 'line'
+        dc.bpmgr.en_disable_breakpoint_by_number(bp.number, False)
+        self.assertFalse(dc.is_break_here(frame, None))
+        return
+
+    def test_frame_may_stop(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+
+        def get_frame():
+            return sys._getframe()
+        frame = get_frame()
+
+        # Stepping: we might stop anywhere
+        dc.step_ignore = 0
+        self.assertTrue(dc._frame_may_stop(frame))
+
+        # Continuing without breakpoints
+        dc.step_ignore = -1
+        self.assertFalse(dc._frame_may_stop(frame))
+        dc.debugger.settings['trace'] = True
+        self.assertTrue(dc._frame_may_stop(frame))
+        dc.debugger.settings['trace'] = False
+
+        # A breakpoint outside of get_frame() doesn't matter...
+        filename = dc.canonic_filename(frame)
+        bp = dc.bpmgr.add_breakpoint(filename, sys._getframe().f_lineno)
+        self.assertFalse(dc._frame_may_stop(frame))
+
+        # ... but one inside it does.
+        dc.bpmgr.add_breakpoint(filename, frame.f_code.co_firstlineno + 1)
+        self.assertTrue(dc._frame_may_stop(frame))
+        dc.bpmgr.reset()
+
+        # "next": frames called from the "next" frame can't stop
+        dc.step_ignore = 0
+        dc.set_next(sys._getframe())
+        self.assertFalse(dc._frame_may_stop(frame))
+        # A traced caller we know nothing about: we might stop.
+        sys._getframe().f_trace = dc.trace_dispatch
+        dc.set_next(sys._getframe(1))
+        self.assertTrue(dc._frame_may_stop(frame))
+        sys._getframe().f_trace = None
+        return
+
+    def test_justmycode(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        dc.step_ignore = 0
+        frame = sys._getframe()
+        # A frame of the standard library's json decoder, calling us
+        library_frame = json.loads('{}', object_hook=lambda obj:
+                                   sys._getframe(1))
+        self.assertTrue(dc._frame_may_stop(library_frame))
+        dc.debugger.settings['justmycode'] = True
+        self.assertFalse(dc._frame_may_stop(library_frame))
+        self.assertTrue(dc._frame_may_stop(frame))
+        self.assertFalse(dc.is_stop_here(library_frame, 'line', None))
+        self.assertTrue(dc.is_stop_here(frame, 'line', None))
+        return
+
+    def test_frame_level(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        frame = sys._getframe()
+
+        def get_frame():
+            return sys._getframe()
+        called = get_frame()
+        self.assertEqual(Mstack.count_frames(frame), dc.frame_level(frame))
+        self.assertEqual({}, dc.thread_state.frame_levels)
+
+        # Levels are remembered from call to return, and only the way
+        # up to the nearest remembered frame is walked.
+        dc.thread_state.frame_levels[id(frame)] = (frame.f_code, 100)
+        dc.is_stop_here(called, 'call', None)
+        self.assertEqual(101, dc.frame_level(called))
+        dc.is_stop_here(called, 'return', None)
+        self.assertFalse(id(called) in dc.thread_state.frame_levels)
+
+        # A level remembered for a frame of other code, as an id
+        # that has been reused would have, doesn't count.
+        dc.thread_state.frame_levels[id(called)] = (frame.f_code, 5)
+        self.assertEqual(101, dc.frame_level(called))
+
+        dc.set_next(frame)
+        self.assertEqual(100, dc.stop_level)
+        return
+
+    def test_ignore_prefix(self):
+        opts = {'processor': MockProcessor(),
+                'ignore_filter': tracefilter.TraceFilter()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        self.assertRaises(TypeError, dc.add_ignore_prefix, '/tmp')
+        self.assertRaises(TypeError, dc.remove_ignore_prefix, '/tmp')
+
+        opts['ignore_filter'] = Mcodefilter.CodeFilter()
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        self.assertFalse(dc.add_ignore_prefix())
+        self.assertTrue(dc.add_ignore_prefix('/tmp'))
+        self.assertFalse(dc.add_ignore_prefix('/tmp'))
+        self.assertTrue(dc.remove_ignore_prefix('/tmp'))
+        return
+
+    def test_library_filter(self):
+        # The library directories are only looked for under "set
+        # justmycode".
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        frame = sys._getframe()
+        self.assertFalse(dc._is_library_frame(frame))
+        self.assertEqual(None, dc._library_filter)
+        dc.debugger.settings['justmycode'] = True
+        self.assertFalse(dc._is_library_frame(frame))
+        self.assertTrue(isinstance(dc._library_filter,
+                                   Mcodefilter.CodeFilter))
+        self.assertTrue(dc.library_filter is dc._library_filter)
+        return
+
+    def test_until_condition(self):
+        """until_condition is compiled once, even if it doesn't
+        compile."""
+        frame = sys._getframe()
+        for condition, matches in (('frame is not None', True),
+                                   ('frame is >', False)):
+            opts = {'processor': MockProcessor(),
+                    'until_condition': condition}
+            dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+            self.assertEqual(matches, dc.matches_condition(frame))
+            code = dc.until_condition_code
+            self.assertNotEqual(None, code)
+            self.assertEqual(matches, dc.matches_condition(frame))
+            self.assertTrue(code is dc.until_condition_code)
+            pass
+        return
+
+    def test_stop_frame_levels(self):
+        """stop() forgets the frame levels of every thread."""
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        remembered = threading.Event()
+        done = threading.Event()
+        thread_levels = []
+
+        def remember():
+            dc._remember_frame_level(sys._getframe())
+            thread_levels.append(dc.thread_state.frame_levels)
+            remembered.set()
+            done.wait(5)
+            return
+        thread = threading.Thread(target=remember)
+        thread.start()
+        remembered.wait(5)
+        dc._remember_frame_level(sys._getframe())
+        self.assertEqual(1, len(thread_levels[0]))
+        self.assertEqual(1, len(dc.thread_state.frame_levels))
+        dc.stop()
+        self.assertEqual({}, thread_levels[0])
+        self.assertEqual({}, dc.thread_state.frame_levels)
+        done.set()
+        thread.join()
+        return
+
+    def test_thread_state(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        self.assertEqual(0, dc.step_ignore)
+        dc.set_next(sys._getframe())
+        self.assertEqual(sys._getframe(), dc.last_frame)
+
+        # Another thread has stepping state of its own
+        seen = []
+
+        def thread_fn():
+            seen.append((dc.step_ignore, dc.stop_level, dc.last_frame))
+            dc.step_ignore = 5
+            return
+        t = threading.Thread(target=thread_fn)
+        t.start()
+        t.join()
+        self.assertEqual([(-1, None, None)], seen)
+        self.assertEqual(0, dc.step_ignore)
+        self.assertEqual(sys._getframe(), dc.last_frame)
+        return
+
+    def test_trace_statistics(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        dc.step_ignore = -1
+
+        def get_frame():
+            return sys._getframe()
+        frame = get_frame()
+        dc.debugger.settings['events'] = frozenset(['call'])
+        dc.settings_changed('events')
+        dc.trace_dispatch(frame, 'line', None)
+        dc.trace_dispatch(frame, 'call', None)
+
+        # A breakpoint whose condition is false
+        filename = dc.canonic_filename(frame)
+        dc.bpmgr.add_breakpoint(filename, frame.f_lineno, condition='0')
+        dc.trace_dispatch(frame, 'call', None)
+        stats = dc.trace_statistics()
+        self.assertEqual(3, stats['total_events'])
+        self.assertEqual(1, stats['events']['line'])
+        self.assertEqual(2, stats['events']['call'])
+        self.assertEqual(1, stats['rejected'])
+        self.assertEqual(1, stats['bp_probes'])
+        self.assertEqual(1, stats['condition_evals'])
+        self.assertTrue(stats['overhead_time'] > 0)
+
+        dc.reset_trace_statistics()
+        stats = dc.trace_statistics()
+        self.assertEqual(0, stats['total_events'])
+        self.assertEqual(0, stats['condition_evals'])
+        return
+
+    def test_event_actions(self):
+        opts = {'processor': MockProcessor()}
+        dc = Mcore.DebuggerCore(MockDebugger(), opts=opts)
+        settings = dc.debugger.settings
+        settings['events'] = frozenset(['line', 'call'])
+        settings['printset'] = frozenset(['call', 'return'])
+        # Not an event setting: nothing gets compiled.
+        dc.settings_changed('width')
+        self.assertEqual(Mcore.STOP_EVENT, dc.event_actions['return'])
+
+        dc.settings_changed('events', 'printset')
+        self.assertEqual(Mcore.STOP_EVENT, dc.event_actions['line'])
+        self.assertEqual(0, dc.event_actions['return'])
+
+        settings['trace'] = True
+        dc.settings_changed('trace')
+        self.assertEqual(Mcore.STOP_EVENT, dc.event_actions['line'])
+        self.assertEqual(Mcore.STOP_EVENT | Mcore.PRINT_EVENT,
+                         dc.event_actions['call'])
+        self.assertEqual(Mcore.PRINT_EVENT, dc.event_actions['return'])
+        self.assertEqual(0, dc.event_actions['exception'])
+        return
+
 if __name__ == '__main__':
     unittest.main()
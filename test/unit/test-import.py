@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+'Unit test for how much importing trepan.api costs'
+import json, os, subprocess, sys, unittest
+
+# Importing trepan.api should be cheap enough that a program can do it
+# just to be ready for post-mortem debugging. This is well above what
+# it takes, so that a loaded machine doesn't make the test fail.
+IMPORT_BUDGET = 0.1
+
+# Modules that are only needed once there is something to debug.
+HEAVY_MODULES = ('columnize', 'coverage', 'pkg_resources', 'pyficache',
+                 'pygments', 'uncompyle6', 'xdis')
+
+# Python 2 has no "python -X importtime", so do roughly what it does:
+# time each import that loads a module, including what it imports in
+# turn, and report the modules loaded along with the total time.
+IMPORT_TIMER = r'''
+import __builtin__, json, sys, time
+times = {}
+builtin_import = __builtin__.__import__
+def timed_import(name, *args, **kwargs):
+    if name in sys.modules:
+        return builtin_import(name, *args, **kwargs)
+    start = time.time()
+    try:
+        return builtin_import(name, *args, **kwargs)
+    finally:
+        times.setdefault(name, time.time() - start)
+        pass
+    pass
+__builtin__.__import__ = timed_import
+start = time.time()
+import trepan.api
+total = time.time() - start
+__builtin__.__import__ = builtin_import
+modules = [name for name, module in sys.modules.items() if module]
+print(json.dumps({'total': total, 'times': times, 'modules': modules}))
+'''
+
+top_builddir = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def import_times():
+    """Import trepan.api in a fresh interpreter, and return what
+    IMPORT_TIMER reports."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.abspath(top_builddir),
+                                         env.get('PYTHONPATH', '')])
+    output = subprocess.Popen([sys.executable, '-c', IMPORT_TIMER],
+                              stdout=subprocess.PIPE,
+                              env=env).communicate()[0]
+    return json.loads(output)
+
+
+class TestImport(unittest.TestCase):
+
+    def test_budget(self):
+        """Importing trepan.api stays under IMPORT_BUDGET."""
+        # Take the best of a few runs so that a hiccup doesn't count.
+        runs = [import_times() for i in range(3)]
+        best = min(runs, key=lambda run: run['total'])
+        slowest = sorted(best['times'].items(), key=lambda item: -item[1])
+        self.assertTrue(best['total'] < IMPORT_BUDGET,
+                        'importing trepan.api took %.3fs; slowest: %s' %
+                        (best['total'],
+                         ', '.join(['%s %.3fs' % item
+                                    for item in slowest[:5]])))
+        return
+
+    def test_deferred(self):
+        """Importing trepan.api doesn't load modules that are needed
+        only for debugging."""
+        modules = import_times()['modules']
+        loaded = [name for name in modules
+                  if name.split('.')[0] in HEAVY_MODULES]
+        self.assertEqual([], loaded)
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+'Unit test for trepan.lib.catchpoint'
+import sys, unittest
+
+from trepan.lib import catchpoint as Mcatchpoint
+
+
+class OldStyle:
+    pass
+
+
+def raise_key_error():
+    raise KeyError('a')
+
+
+class TestCatchpoint(unittest.TestCase):
+
+    def test_catchpoints(self):
+        catchpoints = Mcatchpoint.Catchpoints()
+        self.assertEqual(0, len(catchpoints))
+        self.assertFalse(catchpoints.is_raised_caught(KeyError))
+        self.assertTrue(catchpoints.add(LookupError))
+        self.assertFalse(catchpoints.add(LookupError))
+        self.assertTrue(catchpoints.add(ValueError, uncaught=True))
+        self.assertEqual(2, len(catchpoints))
+
+        # Subclasses are caught too.
+        self.assertTrue(catchpoints.is_raised_caught(KeyError))
+        self.assertFalse(catchpoints.is_raised_caught(ValueError))
+        self.assertTrue(catchpoints.is_uncaught_caught(UnicodeError))
+        self.assertFalse(catchpoints.is_uncaught_caught(KeyError))
+
+        self.assertTrue(catchpoints.remove(LookupError))
+        self.assertFalse(catchpoints.remove(LookupError))
+        self.assertFalse(catchpoints.is_raised_caught(KeyError))
+        catchpoints.clear()
+        self.assertEqual(0, len(catchpoints))
+        self.assertFalse(catchpoints.is_uncaught_caught(ValueError))
+        return
+
+    def test_is_exception_class(self):
+        self.assertTrue(Mcatchpoint.is_exception_class(KeyError))
+        self.assertTrue(Mcatchpoint.is_exception_class(OldStyle))
+        self.assertFalse(Mcatchpoint.is_exception_class(int))
+        self.assertFalse(Mcatchpoint.is_exception_class(KeyError('a')))
+        self.assertEqual('KeyError', Mcatchpoint.type_name(KeyError))
+        self.assertEqual('%s.OldStyle' % __name__,
+                         Mcatchpoint.type_name(OldStyle))
+        return
+
+    def test_is_raise(self):
+        try:
+            raise_key_error()
+        except KeyError:
+            exc_info = sys.exc_info()
+            pass
+        # The traceback has gone through this frame as well.
+        self.assertFalse(Mcatchpoint.is_raise(exc_info))
+        self.assertTrue(Mcatchpoint.is_raise((exc_info[0], exc_info[1],
+                                              exc_info[2].tb_next)))
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+'Unit test for trepan.lib.codebreak'
+import os.path, sys, unittest
+
+from trepan.lib import bytecode as Mbytecode, codebreak as Mcodebreak
+
+
+def sqr(x):
+    y = x * x
+    return y
+
+
+def rewrite_self(codebreaks, filename):
+    """Have `codebreaks' rewrite this function while it runs, and
+    return what is_running_original() says before and after."""
+    running = [codebreaks.is_running_original()]
+    first = sys._getframe().f_code.co_firstlineno
+    codebreaks.add_line(filename, first+6)  # The next line
+    running.append(codebreaks.is_running_original())
+    return running
+
+
+class TestCodeBreak(unittest.TestCase):
+
+    def setUp(self):
+        self.hits = []
+        self.filename = os.path.realpath(__file__.replace('.pyc', '.py'))
+        self.codebreaks = Mcodebreak.CodeBreakpoints(os.path.realpath,
+                                                     self.hit)
+        return
+
+    def hit(self, frame, lineno):
+        self.hits.append((frame.f_code.co_name, lineno, frame.f_lineno))
+        return
+
+    def test_add_remove(self):
+        code = sqr.func_code
+        first = code.co_firstlineno
+        self.assertTrue(self.codebreaks.add_line(self.filename, first+1))
+        self.assertTrue(self.codebreaks.add_line(self.filename, first+2))
+        self.assertTrue(self.codebreaks.is_set(self.filename, first+2))
+        self.assertEqual(9, sqr(3))
+        self.assertEqual([('sqr', first+1, first+1),
+                          ('sqr', first+2, first+2)], self.hits)
+
+        self.codebreaks.remove_line(self.filename, first+1)
+        self.assertFalse(self.codebreaks.is_set(self.filename, first+1))
+        self.hits = []
+        self.assertEqual(4, sqr(2))
+        self.assertEqual([('sqr', first+2, first+2)], self.hits)
+
+        self.codebreaks.remove_line(self.filename, first+2)
+        self.assertEqual(code, sqr.func_code)
+        return
+
+    def test_nested(self):
+        def outer():
+            def inner():
+                return 5
+            return inner
+        first = outer.func_code.co_firstlineno
+        self.assertTrue(self.codebreaks.add_line(self.filename, first+2))
+        self.assertEqual(5, outer()())
+        self.assertEqual([('inner', first+2, first+2)], self.hits)
+        self.codebreaks.remove_all()
+        self.hits = []
+        self.assertEqual(5, outer()())
+        self.assertEqual([], self.hits)
+
+        # Module-level code can't be rewritten.
+        self.assertFalse(self.codebreaks.add_line(self.filename, 1))
+        return
+
+    def test_cant_rewrite(self):
+        # A line in code that insert_call() can't rewrite isn't set.
+        code = sqr.func_code
+        first = code.co_firstlineno
+        self.assertTrue(self.codebreaks.add_line(self.filename, first+1))
+        insert_call = Mbytecode.insert_call
+        Mbytecode.insert_call = lambda co, offset, fn: None
+        try:
+            self.assertFalse(self.codebreaks.add_line(self.filename,
+                                                      first+2))
+        finally:
+            Mbytecode.insert_call = insert_call
+            pass
+        self.assertFalse(self.codebreaks.is_set(self.filename, first+2))
+        self.assertTrue(self.codebreaks.is_set(self.filename, first+1))
+        self.assertEqual(9, sqr(3))
+        self.assertEqual([('sqr', first+1, first+1)], self.hits)
+        self.codebreaks.remove_all()
+        self.assertEqual(code, sqr.func_code)
+        return
+
+    def test_running_original(self):
+        # A function running when it gets rewritten goes on with its
+        # original code.
+        self.assertEqual([False, True],
+                         rewrite_self(self.codebreaks, self.filename))
+        self.assertFalse(self.codebreaks.is_running_original())
+        self.codebreaks.remove_all()
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+'Unit test for trepan.lib.codefilter'
+import inspect, os.path, sys, unittest
+
+from trepan.lib import codefilter as Mcodefilter
+
+
+def foo():
+    return sys._getframe()
+
+
+class TestCodeFilter(unittest.TestCase):
+
+    def test_include(self):
+        code_filter = Mcodefilter.CodeFilter([foo])
+        frame = foo()
+        self.assertTrue(code_filter.is_included(foo))
+        self.assertTrue(code_filter.is_included(frame))
+        self.assertFalse(code_filter.is_included(inspect.currentframe()))
+        self.assertEqual((foo.func_code, True),
+                         code_filter.decisions[id(foo.func_code)])
+
+        # Changes are seen right away.
+        code_filter.remove_include(foo)
+        self.assertFalse(code_filter.is_included(frame))
+        code_filter.add_include(frame)
+        self.assertTrue(code_filter.is_included(foo))
+        code_filter.clear_include()
+        self.assertFalse(code_filter.is_included(foo))
+        return
+
+    def test_prefix(self):
+        code_filter = Mcodefilter.CodeFilter()
+        self.assertFalse(code_filter.is_included(inspect.getmembers))
+        self.assertTrue(code_filter.add_prefix('stdlib'))
+        self.assertFalse(code_filter.add_prefix('stdlib'))
+        self.assertTrue(code_filter.is_included(inspect.getmembers))
+        self.assertFalse(code_filter.is_included(foo))
+
+        # Our directory, given as a pattern
+        mydir = os.path.dirname(os.path.realpath(__file__))
+        code_filter.add_prefix(mydir + '/*')
+        self.assertTrue(code_filter.is_included(foo))
+        self.assertTrue(code_filter.remove_prefix('stdlib'))
+        self.assertFalse(code_filter.is_included(inspect.getmembers))
+        self.assertFalse(code_filter.remove_prefix('stdlib'))
+        return
+
+    def test_same_code(self):
+        # Functions with the same body in different files have code
+        # objects that compare equal, but each file gets its own answer.
+        source = 'def helper(self):\n    return self\n'
+        libdir = os.path.join(os.sep, 'tmp', 'cf', 'lib')
+        lib_ns, user_ns = {}, {}
+        exec(compile(source, os.path.join(libdir, 'a.py'), 'exec'), lib_ns)
+        exec(compile(source, os.path.join(os.sep, 'tmp', 'cf', 'user',
+                                          'b.py'), 'exec'), user_ns)
+        lib_helper, user_helper = lib_ns['helper'], user_ns['helper']
+        self.assertEqual(lib_helper.func_code, user_helper.func_code)
+        for first in (lib_helper, user_helper):
+            code_filter = Mcodefilter.CodeFilter([], [libdir])
+            code_filter.is_included(first)
+            self.assertTrue(code_filter.is_included(lib_helper))
+            self.assertFalse(code_filter.is_included(user_helper))
+            pass
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+'Unit test for trepan.lib.stops'
+import sys, threading, time, unittest
+
+from trepan.lib import stops as Mstops
+
+
+class TestStops(unittest.TestCase):
+
+    def wait_for_queued(self, stops, n):
+        for i in range(200):
+            if len(stops) == n:
+                return
+            time.sleep(0.01)
+            pass
+        self.fail('%d stops never got queued' % n)
+        return
+
+    def test_stop_queue(self):
+        stops = Mstops.StopQueue()
+        frame = sys._getframe()
+        stop1 = stops.enter(frame, 'line', None)
+        self.assertTrue(stops.active is stop1)
+        self.assertEqual(1, stop1.number)
+
+        # Another thread that stops waits for its turn.
+        events = []
+
+        def worker():
+            stop = stops.enter(sys._getframe(), 'brkpt', None)
+            events.append(stops.active is stop)
+            stops.leave(stop)
+            return
+        thread = threading.Thread(target=worker, name='Worker-1')
+        thread.start()
+        self.wait_for_queued(stops, 2)
+        self.assertEqual([], events)
+        stop2 = stops.queued()[1]
+        self.assertTrue(stops.find('2') is stop2)
+        self.assertTrue(stops.find('Worker-1') is stop2)
+        self.assertEqual(None, stops.find('3'))
+
+        # Switching gives it the prompt. When it leaves, we get it back.
+        stop1.switch_to = stop2
+        stops.switch(stop1)
+        thread.join()
+        self.assertEqual([True], events)
+        self.assertTrue(stops.active is stop1)
+        self.assertEqual(None, stop1.switch_to)
+
+        stops.leave(stop1)
+        self.assertEqual(0, len(stops))
+        self.assertEqual(None, stops.active)
+        return
+
+    def test_resume_at_breakpoint(self):
+        stops = Mstops.StopQueue()
+        frame = sys._getframe()
+        stop1 = stops.enter(frame, 'brkpt', None, 'at line breakpoint 1', 1,
+                            limit=3)
+        self.assertEqual('at line breakpoint 1', stop1.reason)
+        self.assertEqual(1, stop1.bp_number)
+        self.assertTrue(stop1.time <= time.time())
+
+        # A herd of threads stops at breakpoints 1 and 2. Those past
+        # the limit don't wait.
+        resumed = []
+
+        def worker(bp_number):
+            stop = stops.enter(sys._getframe(), 'brkpt', None, '', bp_number,
+                               limit=3)
+            if stop is not None:
+                resumed.append((bp_number, stop.resume))
+                stops.leave(stop)
+                pass
+            return
+        threads = [threading.Thread(target=worker, args=(bp_number,))
+                   for bp_number in (1, 2)]
+        for i, thread in enumerate(threads):
+            thread.start()
+            self.wait_for_queued(stops, i + 2)
+            pass
+        worker(1)
+        self.assertEqual(1, stops.dropped)
+        self.assertEqual([], resumed)
+
+        # Those at our breakpoint go on without getting the prompt.
+        self.assertEqual(1, stops.resume_at_breakpoint(1))
+        threads[0].join()
+        self.assertEqual([(1, True)], resumed)
+        self.assertTrue(stops.active is stop1)
+
+        # When we leave, the stop at breakpoint 2 gets the prompt.
+        stops.leave(stop1)
+        threads[1].join()
+        self.assertEqual([(1, True), (2, False)], resumed)
+        self.assertEqual(0, len(stops))
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
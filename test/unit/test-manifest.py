@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+'Unit test for trepan.processor.manifest'
+import unittest
+
+from trepan.processor import manifest as Mmanifest
+
+from cmdhelper import dbg_setup
+
+
+class TestManifest(unittest.TestCase):
+
+    def test_commands(self):
+        """The manifest describes the command modules as they are."""
+        entries = Mmanifest.command_entries()
+        for entry in entries:
+            self.assertEqual(entry[1:], Mmanifest.COMMANDS.get(entry[0]),
+                             'manifest entry for %s should be: %r' %
+                             (entry[0], entry[1:]))
+            pass
+        found = set([entry[0] for entry in entries])
+        missing = set(Mmanifest.COMMANDS.keys()) - found
+        self.assertEqual(set(), missing - set(Mmanifest.OPTIONAL_COMMANDS),
+                         'no command modules for %s' % missing)
+        return
+
+    def test_subcommands(self):
+        """The manifest describes the subcommand modules as they are."""
+        self.assertEqual(['info', 'set', 'show'],
+                         sorted(Mmanifest.SUBCOMMANDS.keys()))
+        for cmd_name, manifest in Mmanifest.SUBCOMMANDS.items():
+            entries = Mmanifest.subcommand_entries(cmd_name)
+            expected = dict([(entry[0], entry[1:]) for entry in entries])
+            self.assertEqual(expected, manifest,
+                             'SUBCOMMANDS[%r] is not up to date' % cmd_name)
+            pass
+        return
+
+    def test_aliases(self):
+        aliases = Mmanifest.aliases()
+        self.assertEqual('quit', aliases['q'])
+        # Both eval and help have '?'.
+        self.assertEqual('eval', aliases['?'])
+        categories = Mmanifest.categories()
+        self.assertTrue('step' in categories['running'])
+        self.assertEqual(sorted(categories['running']),
+                         categories['running'])
+        return
+
+    def test_lazy_commands(self):
+        """Commands are created when first looked up, and unavailable
+        optional commands are not there."""
+        d, cp = dbg_setup()
+        commands = cp.commands
+        self.assertFalse('step' in commands.created())
+        self.assertTrue('step' in commands)
+        self.assertFalse('step' in commands.created())
+        step = commands['step']
+        self.assertTrue('step' in commands.created())
+        self.assertTrue(step is commands['step'])
+        self.assertFalse('nosuchcommand' in commands)
+        self.assertRaises(KeyError, lambda: commands['nosuchcommand'])
+        self.assertEqual(len(commands.keys()), len(cp.cmd_instances))
+        for name in Mmanifest.OPTIONAL_COMMANDS:
+            self.assertEqual(name in commands, name in commands.keys())
+            pass
+        return
+
+    def test_short_help(self):
+        """Short help comes from the manifest without creating the
+        command, and agrees with the command's."""
+        d, cp = dbg_setup()
+        commands = cp.commands
+        short_help = commands.short_help('next')
+        self.assertFalse('next' in commands.created())
+        self.assertEqual(commands['next'].short_help, short_help)
+        self.assertEqual(short_help, commands.short_help('next'))
+        return
+
+    def test_load_error(self):
+        """A command that can't be loaded is reported through errmsg,
+        or without one the error is raised."""
+        manifest = {'nosuch': ('nosuch', 'NoSuchCommand', (), 'support',
+                               'No such command')}
+        errors = []
+        commands = Mmanifest.CommandMap(manifest, 'trepan.processor.command',
+                                        lambda cls: cls(), (),
+                                        errors.append)
+        self.assertEqual(None, commands.get('nosuch'))
+        self.assertFalse('nosuch' in commands)
+        self.assertEqual(1, len(errors))
+        self.assertTrue(errors[0].startswith('Error loading NoSuchCommand'))
+        commands = Mmanifest.CommandMap(manifest, 'trepan.processor.command',
+                                        lambda cls: cls())
+        self.assertRaises(ImportError, lambda: commands['nosuch'])
+        return
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,6 +70,34 @@ class TestSubcommand(unittest.TestCase):
         self.mycmdMgr.add(testsub2)
         self.assertEqual(['foobar', 'testing'], self.mycmdMgr.list())
 
+    def test_manifest(self):
+        """Subcommands from a manifest are created on first lookup"""
+        manifest = {'width': ('width', 'ShowWidth', 2, 'Show width'),
+                    'events': ('events', 'ShowEvents', 2, 'Show events'),
+                    'eval': ('width', 'ShowWidth', 2, 'Show eval')}
+        d, cp = Mmock.dbg_setup()
+        show_mgr = cp.commands['show']
+        mgr = Msubcmd.Subcmd('show', show_mgr,
+                             'trepan.processor.command.show_subcmd',
+                             manifest)
+        self.assertEqual(['eval', 'events', 'width'], mgr.list())
+        self.assertEqual((2, 'Show width'), mgr.summary('width'))
+        self.assertEqual([], mgr.subcmds.created())
+        for prefix, expected in (
+            ('w',      None),      # Too few chars
+            ('wi',     'width'),
+            ('width',  'width'),
+            ('ev',     'eval'),    # Shared; the first by name gets it
+            ('eve',    'events'),
+            ('eval',   'eval'),
+            ('widths', None)):
+            self.assertEqual(expected, mgr.abbrevs.get(prefix),
+                             'prefix %s' % prefix)
+            pass
+        self.assertEqual(None, mgr.lookup('w'))
+        self.assertEqual('width', mgr.lookup('wid').name)
+        self.assertEqual(['width'], mgr.subcmds.created())
+        return
     pass
 
 if __name__ == '__main__':
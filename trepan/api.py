@@ -32,13 +32,27 @@ if necessary, first.
 # functions below.  (It also doesn't work once we add the exception handling
 # we see below. So for now, we'll live with the code duplication.
 
-import sys
+import functools, sys, threading
+import tracer
 
 from trepan import debugger as Mdebugger, post_mortem as Mpost_mortem
+from trepan.lib import sighandler as Msighandler, thred as Mthred
 
-def debugger_on_post_mortem():
-    '''Call debugger on an exeception that terminates a program'''
-    sys.excepthook = Mpost_mortem.post_mortem_excepthook
+# What debug_thread() has asked for: a ThreadTarget and the debug()
+# options to use once it is claimed, or None.
+_thread_target = None
+
+def debugger_on_post_mortem(standby=False, dbg_opts=None):
+    '''Call debugger on an exeception that terminates a program.
+
+    With `standby' True, the debugger is built now, from `dbg_opts',
+    in a background thread, so that there is less to do once the
+    program has crashed; see trepan.post_mortem.Standby.'''
+    if standby:
+        Mpost_mortem.warm_standby(dbg_opts)
+    else:
+        sys.excepthook = Mpost_mortem.post_mortem_excepthook
+        pass
     return
 
 
@@ -185,11 +199,7 @@ trepan.debugger::
   >>> dbgr
   <trepan.debugger.Debugger instance at 0x2e25320>
 """
-    if Mdebugger.Debugger != type(Mdebugger.debugger_obj):
-        Mdebugger.debugger_obj = Mdebugger.Debugger(dbg_opts)
-        Mdebugger.debugger_obj.core.add_ignore(debug, stop)
-        pass
-    core = Mdebugger.debugger_obj.core
+    core = _debugger(dbg_opts).core
     frame = sys._getframe(0+level)
     core.set_next(frame)
     if start_opts and 'startup-profile' in start_opts and start_opts['startup-profile']:
@@ -218,15 +228,345 @@ trepan.debugger::
     return
 
 
+class debugging:
+    """
+Debug the code in a "with" block, stopping at its first statement.
+
+Tracing is started for the current thread only, and is removed
+again when the block is left, however that happens. So the rest of
+the program, and the other threads, run without any debugger
+overhead. Blocks in several threads can be active at once. If the
+debugger was already tracing the thread, as after debug() or in an
+enclosing block, it is left that way.
+
+`dbg_opts' and `start_opts' are as for debug(). The value of the
+"with" statement is the debugger object.
+
+Use like this:
+
+.. code-block:: python
+
+    import trepan.api
+    ...
+    with trepan.api.debugging():
+        x = compute()   # Stop will be here.
+        ...
+    # No more tracing from here on.
+
+See also traced(), to debug each call of a function.
+"""
+
+    # The number of blocks, in any thread, that gave their thread a
+    # trace hook and haven't been left yet, and whether the first of
+    # them started the debugger. The last of them to be left stops it
+    # again.
+    lock    = threading.Lock()
+    armed   = 0
+    started = False
+
+    def __init__(self, dbg_opts=None, start_opts=None):
+        self.dbg_opts   = dbg_opts
+        self.start_opts = start_opts
+        self.core       = None
+        # For the block in the current thread, the frames it may give
+        # a trace function, with the one each had, and the trace hook
+        # it found; frames is None if the thread was being debugged
+        # already.
+        self.local      = threading.local()
+        return
+
+    def __enter__(self):
+        dbg = _debugger(self.dbg_opts)
+        self.core = dbg.core
+        _ignore_api(self.core)
+        frame = sys._getframe(1)
+        self.local.frames = None
+        if not self.core.is_tracing_thread():
+            # We need this frame, and any caller that has no trace
+            # function, to be traced. Callers that have one, say of
+            # another tool, keep it, and when we are done the rest get
+            # back what they had.
+            frames = [(frame, frame.f_trace)]
+            f = frame.f_back
+            while f is not None:
+                if f.f_trace is None:
+                    frames.append((f, None))
+                    pass
+                f = f.f_back
+                pass
+            self.local.frames = frames
+            self.local.trace  = sys.gettrace()
+            pass
+        self.stop_at(frame)
+        if self.local.frames is not None:
+            start_opts = {'threads': False}
+            if self.start_opts:
+                start_opts.update(self.start_opts)
+                pass
+            debugging.lock.acquire()
+            try:
+                if debugging.armed == 0:
+                    debugging.started = not self.core.is_started()
+                    pass
+                debugging.armed += 1
+                # Gives this thread our trace hook, whether or not
+                # the debugger had been started.
+                self.core.start(start_opts)
+            finally:
+                debugging.lock.release()
+                pass
+            # If the debugger was started already, in another thread,
+            # frames that are running here have no trace function yet.
+            frame.f_trace = tracer._tracer_func
+            for f, trace_fn in self.local.frames:
+                if f.f_trace is None:
+                    f.f_trace = tracer._tracer_func
+                    pass
+                pass
+            pass
+        return dbg
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        frames = self.local.frames
+        if frames is not None:
+            self.local.frames = None
+            debugging.lock.acquire()
+            try:
+                debugging.armed -= 1
+                if debugging.armed == 0 and debugging.started:
+                    self.core.stop({'remove': True})
+                    pass
+                sys.settrace(self.local.trace)
+            finally:
+                debugging.lock.release()
+                pass
+            # A frame keeps reporting the line it was last traced at
+            # for as long as it has a trace function.
+            for frame, trace_fn in frames:
+                frame.f_trace = trace_fn
+                pass
+            pass
+        return False
+
+    def stop_at(self, frame):
+        """Arrange to stop at the next event of `frame', which runs the
+        "with" statement."""
+        self.core.set_next(frame)
+        return
+    pass
+
+
+class _stepping_into(debugging):
+    """debugging() for traced(): stop at the first event of the
+    function called from the "with" block rather than in the block."""
+
+    def stop_at(self, frame):
+        # Our caller, traced()'s wrapper, isn't of interest.
+        core = self.core
+        if not core.ignore_filter.is_included(frame):
+            core.add_ignore(frame)
+            pass
+        core.step_events    = None
+        core.step_ignore    = 0
+        core.stop_level     = None
+        core.last_frame     = None
+        core.stop_on_finish = False
+        return
+    pass
+
+
+def traced(func):
+    """
+Decorator to debug each call of function `func', stopping when it is
+entered. As with debugging(), only the calling thread is traced, and
+only until the call returns.
+
+Use like this:
+
+.. code-block:: python
+
+    import trepan.api
+
+    @trepan.api.traced
+    def handle(request):
+        ...   # Each call stops here.
+"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _stepping_into():
+            return func(*args, **kwargs)
+        pass
+    return wrapper
+
+
+def debug_thread(thread_id=None, predicate=None, dbg_opts=None,
+                 start_opts=None):
+    """
+Debug a single thread of a program with many, such as a WSGI server
+or a Celery worker handling one request per thread. The thread is
+the one with ident `thread_id', or one for which predicate(thread) is
+true, or, with neither, whichever thread comes first.
+
+Python can give a trace function only to the thread it is running
+in. So debugging starts when the target thread next calls
+debug_if_targeted(), which the program calls where a thread starts a
+new piece of work, and we stop after that call. If the thread calling
+debug_thread() is the target, debugging starts right away, as with
+debug().
+
+No other thread is ever traced, not even threads started later, and
+the threads that aren't the target pay only for the call to
+debug_if_targeted(). Only the first thread that turns out to be the
+target is debugged; call debug_thread() again for another one.
+
+`dbg_opts' and `start_opts' are as for debug().
+
+Use like this:
+
+.. code-block:: python
+
+    import threading, trepan.api
+
+    def handle(environ, start_response):
+        trepan.api.debug_if_targeted()
+        ...  # Stop will be here in the target thread.
+
+    # Debug the next request that a thread named "Worker-3" handles.
+    trepan.api.debug_thread(predicate=lambda t: t.getName() == 'Worker-3')
+
+See also debug_thread_on_signal().
+"""
+    global _thread_target
+    target = Mthred.ThreadTarget(thread_id, predicate)
+    _thread_target = (target, dbg_opts, start_opts)
+    if target.claim():
+        _thread_target = None
+        _debug_current_thread(sys._getframe(1), dbg_opts, start_opts)
+        pass
+    return
+
+
+def debug_if_targeted():
+    """If the calling thread is the one debug_thread() asked for,
+    start debugging it, stopping after this call, and return True.
+    Otherwise return False; unless a target is pending this costs no
+    more than a global lookup."""
+    global _thread_target
+    pending = _thread_target
+    if pending is None:
+        return False
+    target, dbg_opts, start_opts = pending
+    if not target.claim():
+        return False
+    if _thread_target is pending:
+        _thread_target = None
+        pass
+    _debug_current_thread(sys._getframe(1), dbg_opts, start_opts)
+    return True
+
+
+def debug_thread_on_signal(signame='SIGUSR1', thread_id=None,
+                           predicate=None, dbg_opts=None, start_opts=None):
+    """Arrange for signal `signame' to call debug_thread() with the
+    remaining parameters, so that for example::
+
+        kill -USR1 <pid>
+
+    debugs the next request of a long-running server. The thread that
+    gets the signal isn't debugged. As with signal.signal(), this has
+    to be called from the main thread; a handler the program had for
+    the signal is still called. Return the signal number, or None if
+    there is no signal `signame'."""
+    def arm():
+        global _thread_target
+        _thread_target = (Mthred.ThreadTarget(thread_id, predicate),
+                          dbg_opts, start_opts)
+        return
+    return Msighandler.chain_handler(signame, arm)
+
+
+def _debug_current_thread(frame, dbg_opts, start_opts):
+    """Trace the current thread only, stopping at the next event of
+    `frame'."""
+    core = _debugger(dbg_opts).core
+    _ignore_api(core)
+    core.set_next(frame)
+    opts = {'threads': False}
+    if start_opts:
+        opts.update(start_opts)
+        pass
+    core.start(opts)
+    # If the debugger was started already, in another thread, frames
+    # that are running here have no trace function yet.
+    while frame is not None:
+        if frame.f_trace is None:
+            frame.f_trace = tracer._tracer_func
+            pass
+        frame = frame.f_back
+        pass
+    return
+
+
+def trace_stats(reset=False):
+    """Return a dictionary of statistics on the trace events that the
+    debugger used by debug() has handled and the time it took. Key
+    'overhead_time' is an estimate of the number of seconds the trace
+    hook has cost the program, not counting time stopped in the
+    debugger. See
+    trepan.lib.tracestats for the other keys. If `reset' is True, the
+    statistics start over afterwards.
+
+    None is returned if there is no debugger yet.
+
+    For example, to complain when the debugger takes more than a
+    second::
+
+        import trepan.api
+        ...
+        stats = trepan.api.trace_stats()
+        if stats and stats['overhead_time'] > 1.0:
+            log.warning("debugger overhead %.2fs over %d events" %
+                        (stats['overhead_time'], stats['total_events']))
+    """
+    if not isinstance(Mdebugger.debugger_obj, Mdebugger.Debugger):
+        return None
+    core = Mdebugger.debugger_obj.core
+    stats = core.trace_statistics()
+    if reset:
+        core.reset_trace_statistics()
+        pass
+    return stats
+
+
 def stop(opts=None):
-    if isinstance(Mdebugger.Debugger, Mdebugger.debugger_obj):
-        return Mdebugger.debugger_obj.stop(opts)
+    if isinstance(Mdebugger.debugger_obj, Mdebugger.Debugger):
+        return Mdebugger.debugger_obj.core.stop(opts)
     return None
 
+
+def _debugger(dbg_opts=None):
+    """Return the debugger used by debug() and debugging(), creating
+    it if necessary with `dbg_opts'."""
+    if not isinstance(Mdebugger.debugger_obj, Mdebugger.Debugger):
+        Mdebugger.debugger_obj = Mdebugger.Debugger(dbg_opts)
+        Mdebugger.debugger_obj.core.add_ignore(debug, stop)
+        pass
+    return Mdebugger.debugger_obj
+
+
+def _ignore_api(core):
+    """Have `core' ignore the code of debugging() and traced()."""
+    for fn in (debugging.__enter__, debugging.__exit__, debugging.stop_at,
+               _stepping_into.stop_at, debug_thread, debug_if_targeted,
+               _debug_current_thread):
+        if not core.ignore_filter.is_included(fn):
+            core.add_ignore(fn)
+            pass
+        pass
+    return
+
 # Demo it
 if __name__=='__main__':
-    import tracer
-
     def foo(n):
         y = n
         for i in range(n):
@@ -11,5 +11,5 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """ Copyright (C) 2013 Rocky Bernstein <rocky@gnu.org> """
-__import__('pkg_resources').declare_namespace(__name__)
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
 __all__ = ['main', 'msg']
@@ -122,7 +122,8 @@ class MockDebugger:
     def __init__(self):
         self.intf             = [MockUserInterface()]
         self.core             = MockDebuggerCore(self)
-        self.settings         = default.DEBUGGER_SETTINGS
+        self.settings         = default.probe_terminal(
+            default.DEBUGGER_SETTINGS)
         self.orig_sys_argv    = None
         self.program_sys_argv = []
         return
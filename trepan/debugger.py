@@ -36,12 +36,13 @@ import trepan.lib.default as Mdefault
 import trepan.interfaces.user as Muser
 from trepan.misc import option_set
 import trepan.lib.sighandler as Msig
+import trepan.lib.codefilter as Mcodefilter
 
 # Common Python packages
 import sys, types
 
 # External Egg packages
-import tracer, tracefilter, pyficache
+import tracer
 
 debugger_obj = None
 
@@ -172,6 +173,7 @@ class Debugger:
         except DebuggerQuit:
             pass
         finally:
+            import pyficache
             pyficache.remove_remap_file('<string>')
             self.core.stop()
         return retval
@@ -225,6 +227,11 @@ class Debugger:
         except DebuggerRestart:
             self.core.execution_status = 'Restart requested'
             raise DebuggerRestart
+        except:
+            # Don't trace the debugger's own handling of an
+            # exception the program didn't catch.
+            self.core.stop(options={'remove': True})
+            raise
         self.core.stop(options={'remove': True})
         return retval
 
@@ -235,7 +242,7 @@ class Debugger:
     # Note: has to come after functions listed in ignore_filter.
     DEFAULT_INIT_OPTS = {
         # What routines will we not trace into?
-        'ignore_filter': tracefilter.TraceFilter(
+        'ignore_filter': Mcodefilter.CodeFilter(
             [tracer.start, tracer.stop,
              run_eval, run_call, run_eval, run_script]),
 
@@ -291,6 +298,7 @@ class Debugger:
         for opt in ('settings', 'orig_sys_argv', 'from_ipython'):
             setattr(self, opt, get_option(opt))
             pass
+        Mdefault.probe_terminal(self.settings)
 
         core_opts = {}
         for opt in ('ignore_filter', 'proc_opts', 'processor', 'step_ignore',
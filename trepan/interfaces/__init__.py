@@ -12,5 +12,5 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """ Copyright (C) 2008, 2013, 2014 Rocky Bernstein <rocky@gnu.org> """
 __package__ = 'trepan.interfaces'
-__import__('pkg_resources').declare_namespace(__name__)
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
 __all__ = ['comcodes', 'script', 'server', 'client', 'user']
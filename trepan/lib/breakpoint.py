@@ -4,9 +4,17 @@
 
 This code is a rewrite of the stock python bdb.Breakpoint"""
 
-__all__ = ["BreakpointManager", "Breakpoint"]
+__all__ = ["BreakpointManager", "Breakpoint", "compile_condition"]
 
-import os.path
+import os.path, time
+from thread import get_ident
+
+
+def compile_condition(condition):
+    """Compile breakpoint condition string `condition' into a code
+    object suitable for eval(). SyntaxError is raised if `condition'
+    is not a valid expression."""
+    return compile(condition, '<condition>', 'eval')
 
 
 class BreakpointManager:
@@ -17,8 +25,33 @@ class BreakpointManager:
     dictionary. If the breakpoint is a function it is in `fnlist' as
     well.  Note there may be more than one breakpoint per line which
     may have different conditions associated with them.
+
+    So that a trace event can quickly rule out a breakpoint, we also
+    keep in `file_lines' the set of line numbers in each file that have
+    an enabled line breakpoint. `co_filename_lines' shares those sets but is
+    indexed by the co_filename of a code object, which is what a trace
+    event hands us.
+
+    Likewise, function breakpoints are indexed in `fn_codes' by the
+    id() of the function's code object, or in `fn_names' by name when
+    there is no code object to go by. See fn_breakpoints().
+
+    A breakpoint can be limited to some threads by giving the idents
+    of those threads. Other threads rule such a breakpoint out with a
+    set membership test, before its condition is looked at. See
+    in_thread().
+
+    If `code_breakpoints' is set, the lines in `file_lines' are also
+    added to it, so that the code there calls into the debugger
+    without a trace hook. See set_code_breakpoints().
+
+    Each function in `line_added_hooks' is called with the filename
+    and line number whenever a line gets an enabled breakpoint, by
+    adding or by enabling one.
     """
     def __init__(self):
+        self.code_breakpoints = None
+        self.line_added_hooks = []
         self.reset()
         return
 
@@ -46,12 +79,12 @@ class BreakpointManager:
         return (True, None, bp)
 
     def add_breakpoint(self, filename, lineno, temporary=False, condition=None,
-                       func=None):
+                       func=None, thread_ids=None):
 
         bpnum = len(self.bpbynumber)
         if filename: filename  = os.path.realpath(filename)
         brkpt = Breakpoint(bpnum, filename, lineno, temporary, condition,
-                           func)
+                           func, thread_ids)
         # Build the internal lists of breakpoints
         self.bpbynumber.append(brkpt)
         if (filename, lineno) in self.bplist:
@@ -59,12 +92,20 @@ class BreakpointManager:
         else:
             self.bplist[filename, lineno] = [brkpt]
             pass
+        self._update_line_index(filename, lineno)
         if func:
             if func in self.fnlist:
                 self.fnlist[func].append(brkpt)
             else:
                 self.fnlist[func] = [brkpt]
                 pass
+            code = func_code(func)
+            if code:
+                self.fn_codes.setdefault(id(code), []).append(brkpt)
+            elif hasattr(func, '__name__'):
+                self.fn_names.setdefault(func.__name__, []).append(brkpt)
+                pass
+            pass
         return brkpt
 
     def delete_all_breakpoints(self):
@@ -90,6 +131,20 @@ class BreakpointManager:
         if not self.bplist[index]:
             # No more breakpoints for this file:line combo
             del self.bplist[index]
+        self._update_line_index(bp.filename, bp.line)
+        func = bp.funcname
+        if func in self.fnlist:
+            self.fnlist[func].remove(bp)
+            if not self.fnlist[func]:
+                del self.fnlist[func]
+                pass
+            code = func_code(func)
+            if code:
+                self._remove_fn_bp(self.fn_codes, id(code), bp)
+            elif hasattr(func, '__name__'):
+                self._remove_fn_bp(self.fn_names, func.__name__, bp)
+                pass
+            pass
         return True
 
     def delete_breakpoint_by_number(self, bpnum):
@@ -113,6 +168,7 @@ class BreakpointManager:
             return "No breakpoints to %sable" % endis
         for bp in bp_list:
             bp.enabled = do_enable
+            self._update_line_index(bp.filename, bp.line)
             bp_nums.append(str(bp.number))
             pass
         return ("Breakpoints %sabled: %s" % (endis, ", ".join(bp_nums)))
@@ -131,6 +187,7 @@ class BreakpointManager:
             return (False, ('Breakpoint (%r) previously %sabled' %
                             (str(bpnum), endis,)))
         bp.enabled = do_enable
+        self._update_line_index(bp.filename, bp.line)
         return (True, '')
 
     def delete_breakpoints_by_lineno(self, filename, lineno):
@@ -160,6 +217,8 @@ class BreakpointManager:
                 continue
             if not checkfuncname(b, frame):
                 continue
+            if b.thread_ids is not None and get_ident() not in b.thread_ids:
+                continue
             # Count every hit when bp is enabled
             b.hits += 1
             if not b.condition:
@@ -176,8 +235,12 @@ class BreakpointManager:
                 # Conditional bp.
                 # Ignore count applies only to those bpt hits where the
                 # condition evaluates to true.
+                self.condition_evals += 1
+                start_time = time.time()
                 try:
-                    val = eval(b.condition, frame.f_globals, frame.f_locals)
+                    val = eval(b.condition_code, frame.f_globals,
+                               frame.f_locals)
+                    b.condition_time += time.time() - start_time
                     if val:
                         if b.ignore > 0:
                             b.ignore = b.ignore -1
@@ -187,6 +250,7 @@ class BreakpointManager:
                     # else:
                     #   continue
                 except:
+                    b.condition_time += time.time() - start_time
                     # if eval fails, most conservative thing is to
                     # stop on breakpoint regardless of ignore count.
                     # Don't delete temporary, as another hint to user.
@@ -195,9 +259,91 @@ class BreakpointManager:
             pass
         return (None, None)
 
+    def fn_breakpoints(self, code):
+        """Return the list of function breakpoints for a call of code
+        object `code', or None if there are none. Functions that were
+        resolved when the breakpoint was set match on `code' itself;
+        otherwise we go by name."""
+        bps = self.fn_codes.get(id(code))
+        if bps is None and self.fn_names:
+            bps = self.fn_names.get(code.co_name)
+            pass
+        return bps
+
+    def in_thread(self, bps):
+        """Return True if one of the breakpoints in `bps' is enabled
+        and not limited to threads other than the current one."""
+        ident = None
+        for bp in bps:
+            if not bp.enabled:
+                continue
+            if bp.thread_ids is None:
+                return True
+            if ident is None:
+                ident = get_ident()
+                pass
+            if ident in bp.thread_ids:
+                return True
+            pass
+        return False
+
+    def has_line_breakpoints(self):
+        """Return True if there is any enabled line breakpoint."""
+        for lines in self.file_lines.values():
+            if lines:
+                return True
+            pass
+        return False
+
     def last(self):
         return len(self.bpbynumber)-1
 
+    def line_breakpoints_rewritten(self):
+        """Return True if every enabled line breakpoint has had its
+        code rewritten by `code_breakpoints'."""
+        if self.code_breakpoints is None:
+            return not self.has_line_breakpoints()
+        for filename, lines in self.file_lines.items():
+            for lineno in lines:
+                if not self.code_breakpoints.is_set(filename, lineno):
+                    return False
+                pass
+            pass
+        return True
+
+    def set_code_breakpoints(self, code_breakpoints):
+        """Use `code_breakpoints', a CodeBreakpoints object or None, to
+        rewrite the code at enabled line breakpoints. Code rewritten by
+        a previous one is restored."""
+        if self.code_breakpoints is not None:
+            self.code_breakpoints.remove_all()
+            pass
+        self.code_breakpoints = code_breakpoints
+        if code_breakpoints is not None:
+            for filename, lines in self.file_lines.items():
+                for lineno in lines:
+                    code_breakpoints.add_line(filename, lineno)
+                    pass
+                pass
+            pass
+        return
+
+    def lines_for_co_filename(self, co_filename, canonic):
+        """Return the set of line numbers having an enabled breakpoint
+        in the file named by code-object filename `co_filename'.
+
+        `canonic' is a function that turns `co_filename' into the
+        filename breakpoints are recorded under. It is called only the
+        first time `co_filename' is seen; after that, this is a single
+        dictionary lookup.
+        """
+        lines = self.co_filename_lines.get(co_filename)
+        if lines is None:
+            lines = self.file_lines.setdefault(canonic(co_filename), set())
+            self.co_filename_lines[co_filename] = lines
+            pass
+        return lines
+
     def reset(self):
         """ A list of breakpoints by breakpoint number.  Each entry is
         None or an instance of Breakpoint.  Index 0 is unused, except
@@ -208,6 +354,56 @@ class BreakpointManager:
         self.bplist = {}
         self.fnlist  = {}
 
+        # Function breakpoints by code object id and by name. See
+        # fn_breakpoints().
+        self.fn_codes = {}
+        self.fn_names = {}
+
+        # Sets of line numbers with an enabled breakpoint, indexed by
+        # filename and by code-object filename. See lines_for_co_filename().
+        self.file_lines = {}
+        self.co_filename_lines = {}
+
+        # Number of breakpoint conditions evaluated
+        self.condition_evals = 0
+
+        if self.code_breakpoints is not None:
+            self.code_breakpoints.remove_all()
+            pass
+        return
+
+    def _remove_fn_bp(self, index, key, bp):
+        bps = index.get(key)
+        if bps and bp in bps:
+            bps.remove(bp)
+            if not bps:
+                del index[key]
+                pass
+            pass
+        return
+
+    def _update_line_index(self, filename, lineno):
+        """Add or remove `lineno' from the set of breakpoint lines of
+        `filename' depending on whether any line breakpoint there is
+        still enabled. Function breakpoints, which stop only on a call,
+        don't count. The set is updated in place since code-object
+        filenames may share it."""
+        lines = self.file_lines.setdefault(filename, set())
+        for bp in self.bplist.get((filename, lineno), []):
+            if bp.enabled and not bp.funcname:
+                lines.add(lineno)
+                if self.code_breakpoints is not None:
+                    self.code_breakpoints.add_line(filename, lineno)
+                    pass
+                for hook in self.line_added_hooks:
+                    hook(filename, lineno)
+                    pass
+                return
+            pass
+        lines.discard(lineno)
+        if self.code_breakpoints is not None:
+            self.code_breakpoints.remove_line(filename, lineno)
+            pass
         return
 
     pass  # BreakpointManager
@@ -221,9 +417,13 @@ class Breakpoint:
     """
 
     def __init__(self, number, filename, line, temporary=False,
-                 condition=None, funcname=None):
+                 condition=None, funcname=None, thread_ids=None):
+
+        self.set_condition(condition)
+
+        # Total number of seconds spent evaluating the condition
+        self.condition_time = 0.0
 
-        self.condition = condition
         self.enabled   = True
 
         self.filename  = filename
@@ -244,6 +444,12 @@ class Breakpoint:
 
         # Delete breakpoint after hitting it.
         self.temporary = temporary
+
+        # If not None, the set of idents of the only threads to stop.
+        if thread_ids is not None:
+            thread_ids = frozenset(thread_ids)
+            pass
+        self.thread_ids = thread_ids
         return
 
     def __str__(self):
@@ -259,6 +465,9 @@ class Breakpoint:
                                                 self.filename, self.line)
         if self.condition:
             msg += '\n\tstop only if %s' % self.condition
+        if self.thread_ids is not None:
+            msg += ('\n\tstop only in thread %s' %
+                    ', '.join([str(i) for i in sorted(self.thread_ids)]))
         if self.ignore:
             msg += msg('\n\tignore next %d hits' % self.ignore)
         if self.hits:
@@ -267,6 +476,20 @@ class Breakpoint:
             msg +='\n\tbreakpoint already hit %d time%s' % self.hits, ss
         return msg
 
+    def set_condition(self, condition):
+        """Set the breakpoint condition to the expression string
+        `condition', or remove it if `condition' is None. The
+        condition is compiled here rather than on each hit; a
+        SyntaxError is raised, and the condition left unchanged, if
+        it is not a valid expression."""
+        if condition:
+            self.condition_code = compile_condition(condition)
+        else:
+            self.condition_code = None
+            pass
+        self.condition = condition
+        return
+
     def enable(self):
         self.enabled = True
         return self.enabled
@@ -289,6 +512,13 @@ class Breakpoint:
     pass  # end of Breakpoint class
 
 
+def func_code(func):
+    """Return the code object of function or method `func', or None if
+    it doesn't have one."""
+    func = getattr(func, 'im_func', func)
+    return getattr(func, 'func_code', None)
+
+
 def checkfuncname(b, frame):
     """Check whether we should break here because of `b.funcname`."""
     if not b.funcname:
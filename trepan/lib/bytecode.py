@@ -15,8 +15,9 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 '''Bytecode instruction routines'''
 
-import dis, re
-from opcode import opname, HAVE_ARGUMENT
+import dis, re, types
+from opcode import opmap, opname, hasjabs, hasjrel, HAVE_ARGUMENT
+from inspect import CO_GENERATOR
 
 
 def op_at_code_loc(code, loc):
@@ -33,6 +34,14 @@ def op_at_frame(frame, loc=None):
     return op_at_code_loc(code, loc)
 
 
+def is_yielding(frame):
+    """Return True if `frame' is that of a generator and is at a
+    'yield'. At a 'return' event, this tells a generator that yields
+    from one that is done."""
+    return bool(frame.f_code.co_flags & CO_GENERATOR and
+                op_at_frame(frame) == 'YIELD_VALUE')
+
+
 def next_opcode(code, offset):
     '''Return the next opcode and offset as a tuple. Tuple (-100,
     -1000) is returned when reaching the end.'''
@@ -85,6 +94,132 @@ def stmt_contains_opcode(co, lineno, query_opcode):
         pass
     return False
 
+def code_line_range(co):
+    """Return a tuple (first, last) of the range of line numbers
+    spanned by code object `co'. first is the line of a "def" for
+    function code."""
+    last = co.co_firstlineno
+    for offset, lineno in dis.findlinestarts(co):
+        if lineno > last:
+            last = lineno
+            pass
+        pass
+    return (co.co_firstlineno, last)
+
+
+
+def line_offsets(co, lineno):
+    """Return the list of offsets in code object `co' where a line
+    event for `lineno' starts. Code nested in `co', such as that of an
+    inner function, isn't included."""
+    return [offset for offset, line in dis.findlinestarts(co)
+            if line == lineno]
+
+
+def _decode_lnotab(co):
+    """Return the line number table of code object `co' as a list of
+    (offset, lineno) pairs."""
+    table = []
+    offset, lineno = 0, co.co_firstlineno
+    lnotab = co.co_lnotab
+    for i in range(0, len(lnotab), 2):
+        offset += ord(lnotab[i])
+        lineno += ord(lnotab[i+1])
+        table.append((offset, lineno))
+        pass
+    return table
+
+
+def _encode_lnotab(firstlineno, table):
+    """The inverse of _decode_lnotab()."""
+    lnotab = []
+    last_offset, last_lineno = 0, firstlineno
+    for offset, lineno in table:
+        offset_incr = offset - last_offset
+        line_incr = lineno - last_lineno
+        while offset_incr > 255:
+            lnotab += [255, 0]
+            offset_incr -= 255
+            pass
+        while line_incr > 255:
+            lnotab += [offset_incr, 255]
+            offset_incr = 0
+            line_incr -= 255
+            pass
+        if offset_incr or line_incr:
+            lnotab += [offset_incr, line_incr]
+            pass
+        last_offset, last_lineno = offset, lineno
+        pass
+    return ''.join([chr(b) for b in lnotab])
+
+
+def insert_call(co, offset, fn):
+    """Return a copy of code object `co' which calls `fn' with no
+    arguments, discarding the result, before running the instruction
+    at `offset'. Jumps to `offset' run the call too. Return None if we
+    can't rewrite `co', e.g. because it uses EXTENDED_ARG."""
+    code = co.co_code
+    consts = co.co_consts + (fn,)
+    fn_index = len(consts) - 1
+    if (fn_index > 0xFFFF or
+        opmap['EXTENDED_ARG'] in [op for op, i in next_opcode(code, 0)]):
+        return None
+    call = [opmap['LOAD_CONST'], fn_index & 0xFF, fn_index >> 8,
+            opmap['CALL_FUNCTION'], 0, 0,
+            opmap['POP_TOP']]
+    size = len(call)
+
+    def new_target(target):
+        if target > offset: return target + size
+        return target
+
+    new_code = []
+    i, n = 0, len(code)
+    while i < n:
+        if i == offset:
+            new_code += call
+            pass
+        op = ord(code[i])
+        new_code.append(op)
+        if op >= HAVE_ARGUMENT:
+            arg = ord(code[i+1]) + (ord(code[i+2]) << 8)
+            if op in hasjabs:
+                arg = new_target(arg)
+            elif op in hasjrel:
+                # Relative to the end of the instruction, which moves
+                # if it comes after the call.
+                end = i + 3
+                if i >= offset: end += size
+                arg = new_target(i + 3 + arg) - end
+                pass
+            if arg > 0xFFFF:
+                return None
+            new_code += [arg & 0xFF, arg >> 8]
+            i += 3
+        else:
+            i += 1
+            pass
+        pass
+
+    table = [(new_target(o), lineno) for o, lineno in _decode_lnotab(co)]
+    return types.CodeType(co.co_argcount, co.co_nlocals,
+                          co.co_stacksize + 1, co.co_flags,
+                          ''.join([chr(b) for b in new_code]), consts,
+                          co.co_names, co.co_varnames, co.co_filename,
+                          co.co_name, co.co_firstlineno,
+                          _encode_lnotab(co.co_firstlineno, table),
+                          co.co_freevars, co.co_cellvars)
+
+
+def replace_consts(co, consts):
+    """Return a copy of code object `co' with constants `consts'."""
+    return types.CodeType(co.co_argcount, co.co_nlocals, co.co_stacksize,
+                          co.co_flags, co.co_code, tuple(consts),
+                          co.co_names, co.co_varnames, co.co_filename,
+                          co.co_name, co.co_firstlineno, co.co_lnotab,
+                          co.co_freevars, co.co_cellvars)
+
 _re_def_str = r'^\s*def\s'
 _re_def = re.compile(_re_def_str)
 
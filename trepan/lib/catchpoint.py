@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Catchpoints: stopping when exceptions of given types are raised, or
+when they are about to go uncaught."""
+
+import types
+
+from trepan.lib import bytecode as Mbytecode
+
+
+def is_exception_class(obj):
+    """Return True if `obj' is a class that can be raised. Python 2
+    still has old-style classes, which can be raised too."""
+    if isinstance(obj, types.ClassType):
+        return True
+    return isinstance(obj, type) and issubclass(obj, BaseException)
+
+
+def type_name(exc_type):
+    if exc_type.__module__ in ('exceptions', '__builtin__'):
+        return exc_type.__name__
+    return '%s.%s' % (exc_type.__module__, exc_type.__name__)
+
+
+def is_raise(exc_info):
+    """Return True if `exc_info', the argument of an 'exception' event,
+    is for where the exception was raised rather than a frame it passes
+    through afterwards. The traceback of an exception gets an entry
+    for each frame it leaves, so at the raise it has just one."""
+    return exc_info[2] is None or exc_info[2].tb_next is None
+
+
+def is_unwinding(frame):
+    """At a 'return' event, return True if `frame' is being left
+    because of an exception rather than by a return or a yield."""
+    return Mbytecode.op_at_frame(frame) not in ('RETURN_VALUE',
+                                                'YIELD_VALUE')
+
+
+class Catchpoints:
+    """The exception classes to stop on, kept both as a set, to add and
+    remove from, and as a tuple that issubclass() takes.
+
+    Those in `raised' stop where an exception of that class is
+    raised. Those in `uncaught' stop only when an exception is leaving
+    the debugged program's outermost frame, as by then nothing in the
+    program can catch it anymore."""
+
+    def __init__(self):
+        self.clear()
+        return
+
+    def clear(self):
+        self.raised         = set()
+        self.uncaught       = set()
+        self.raised_types   = ()
+        self.uncaught_types = ()
+        return
+
+    def add(self, exc_type, uncaught=False):
+        """Stop on exceptions of class `exc_type'. Return False if we
+        already did."""
+        if uncaught:
+            types_set = self.uncaught
+        else:
+            types_set = self.raised
+            pass
+        if exc_type in types_set:
+            return False
+        types_set.add(exc_type)
+        self._update()
+        return True
+
+    def remove(self, exc_type):
+        """Stop no longer on exceptions of class `exc_type'. Return
+        False if we didn't."""
+        found = exc_type in self.raised or exc_type in self.uncaught
+        self.raised.discard(exc_type)
+        self.uncaught.discard(exc_type)
+        self._update()
+        return found
+
+    def is_raised_caught(self, exc_type):
+        return (self.raised_types != () and
+                issubclass(exc_type, self.raised_types))
+
+    def is_uncaught_caught(self, exc_type):
+        return (self.uncaught_types != () and
+                issubclass(exc_type, self.uncaught_types))
+
+    def _update(self):
+        self.raised_types   = tuple(self.raised)
+        self.uncaught_types = tuple(self.uncaught)
+        return
+
+    def __len__(self):
+        return len(self.raised) + len(self.uncaught)
+    pass
+
+# Demo it
+if __name__=='__main__':
+    catchpoints = Catchpoints()
+    catchpoints.add(LookupError)
+    catchpoints.add(ZeroDivisionError, uncaught=True)
+    print(catchpoints.is_raised_caught(KeyError))
+    print(catchpoints.is_raised_caught(ZeroDivisionError))
+    print(catchpoints.is_uncaught_caught(ZeroDivisionError))
+    print(type_name(KeyError), is_exception_class(KeyError),
+          is_exception_class(int))
+    pass
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Breakpoints that need no trace hook.
+
+Rather than checking each line event for a breakpoint, we rewrite the
+code of the functions containing a breakpoint line so that they make a
+call at the start of that line. Until such a call happens, nothing is
+traced and the program runs at full speed."""
+
+import functools, gc, sys, types, weakref
+
+from trepan.lib import bytecode as Mbytecode
+
+
+class CodeBreakpoints:
+    """Keeps the set of lines, per file, that we have rewritten
+    functions to call `hit_fn' on. `hit_fn' is called with the frame
+    that reached the line and its line number.
+
+    For each rewritten function, `originals' has its original code so
+    we can rewrite it again when the set of lines changes, or restore
+    it. Filenames are those of the breakpoint manager; `canonic' turns
+    a code object's co_filename into one of them.
+    """
+
+    def __init__(self, canonic, hit_fn):
+        self.canonic   = canonic
+        self.hit_fn    = hit_fn
+        self.lines     = {}  # filename -> set of line numbers
+        self.originals = weakref.WeakKeyDictionary()
+        return
+
+    def add_line(self, filename, lineno):
+        """Rewrite the functions that contain `lineno' in `filename'.
+        Return True if there is at least one and all of them could be
+        rewritten. Code that isn't inside a function, or whose function
+        we can't find, can't be rewritten, and neither can some code
+        objects; see Mbytecode.insert_call(). If any can't, `lineno' is
+        left as it was."""
+        lines = self.lines.get(filename, set())
+        if lineno in lines:
+            return True
+        funcs = [func for func in self._file_functions(filename)
+                 if self._contains_line(func.func_code, lineno)]
+        if not funcs:
+            return False
+        for func in funcs:
+            if func not in self.originals:
+                self.originals[func] = func.func_code
+                pass
+            pass
+        self.lines[filename] = lines | set([lineno])
+        if not self._rewrite_file(filename):
+            self.lines[filename] = lines
+            if not lines:
+                del self.lines[filename]
+                pass
+            self._rewrite_file(filename)
+            return False
+        return True
+
+    def remove_line(self, filename, lineno):
+        """Undo add_line(). Functions left without a line to call
+        `hit_fn' on get their original code back."""
+        lines = self.lines.get(filename)
+        if not lines or lineno not in lines:
+            return
+        lines.remove(lineno)
+        if not lines:
+            del self.lines[filename]
+            pass
+        self._rewrite_file(filename)
+        return
+
+    def is_set(self, filename, lineno):
+        """Return True if `lineno' of `filename' calls `hit_fn'."""
+        return lineno in self.lines.get(filename, ())
+
+    def remove_all(self):
+        """Give every function we rewrote back its original code."""
+        for filename in list(self.lines.keys()):
+            del self.lines[filename]
+            self._rewrite_file(filename)
+            pass
+        return
+
+    def is_running_original(self):
+        """Return True if some thread is running the code a function
+        had before we rewrote it, or code nested in that. Such a frame
+        goes on running that code, which doesn't call `hit_fn'."""
+        codes = {}
+        pending = list(self.originals.values())
+        while pending:
+            co = pending.pop()
+            if id(co) not in codes:
+                codes[id(co)] = co
+                pending += [const for const in co.co_consts
+                            if isinstance(const, types.CodeType)]
+                pass
+            pass
+        if not codes:
+            return False
+        for frame in sys._current_frames().values():
+            while frame is not None:
+                if id(frame.f_code) in codes:
+                    return True
+                frame = frame.f_back
+                pass
+            pass
+        return False
+
+    def _hit(self, lineno):
+        # The frame calling us is the one that reached `lineno'.
+        self.hit_fn(sys._getframe(1), lineno)
+        return
+
+    def _contains_line(self, co, lineno):
+        first, last = Mbytecode.code_line_range(co)
+        if first <= lineno <= last:
+            if Mbytecode.line_offsets(co, lineno):
+                return True
+            for const in co.co_consts:
+                if (isinstance(const, types.CodeType) and
+                    self._contains_line(const, lineno)):
+                    return True
+                pass
+            pass
+        return False
+
+    def _file_functions(self, filename):
+        """Return the functions whose code comes from `filename'."""
+        canonic = {}
+        funcs = []
+        for obj in gc.get_objects():
+            if isinstance(obj, types.FunctionType):
+                co_filename = obj.func_code.co_filename
+                if co_filename not in canonic:
+                    canonic[co_filename] = self.canonic(co_filename)
+                    pass
+                if canonic[co_filename] == filename:
+                    funcs.append(obj)
+                    pass
+                pass
+            pass
+        return funcs
+
+    def _rewrite_file(self, filename):
+        """Bring the code of the rewritten functions of `filename' in
+        line with self.lines. Return False if some function couldn't
+        be rewritten; it is left with the code it had."""
+        lines = self.lines.get(filename, set())
+        rewritten = True
+        for func, code in list(self.originals.items()):
+            if self.canonic(code.co_filename) != filename:
+                continue
+            new_code = self._rewrite_code(code, lines)
+            if new_code is None:
+                rewritten = False
+                continue
+            if new_code is code:
+                del self.originals[func]
+                pass
+            func.func_code = new_code
+            pass
+        return rewritten
+
+    def _rewrite_code(self, co, lines):
+        """Return code object `co' with a call to self._hit() at the
+        start of each of `lines' in it or in code nested in it, such
+        as that of an inner function. `co' itself is returned if there
+        is nothing to change, and None if we can't change it."""
+        consts = []
+        for const in co.co_consts:
+            if isinstance(const, types.CodeType):
+                const = self._rewrite_code(const, lines)
+                if const is None:
+                    return None
+                pass
+            consts.append(const)
+            pass
+        new_co = co
+        if [c for c, old in zip(consts, co.co_consts) if c is not old]:
+            new_co = Mbytecode.replace_consts(co, consts)
+            pass
+        offsets = []
+        for lineno in lines:
+            offsets += [(offset, lineno) for offset in
+                        Mbytecode.line_offsets(co, lineno)]
+            pass
+        # Going from the end, an insertion doesn't move the offsets
+        # still to be done.
+        offsets.sort(reverse=True)
+        for offset, lineno in offsets:
+            patched = Mbytecode.insert_call(new_co, offset,
+                                            functools.partial(self._hit,
+                                                              lineno))
+            if patched is None:
+                return None
+            new_co = patched
+            pass
+        return new_co
+    pass
+
+# Demo it
+if __name__=='__main__':
+    import os.path
+
+    def sqr(x):
+        y = x * x
+        return y
+
+    def hit(frame, lineno):
+        print("hit line %d of %s" % (lineno, frame.f_code.co_name))
+        return
+
+    filename = os.path.realpath(__file__)
+    codebreaks = CodeBreakpoints(os.path.realpath, hit)
+    print(codebreaks.add_line(filename, sqr.func_code.co_firstlineno + 2))
+    print(sqr(3))
+    codebreaks.remove_all()
+    print(sqr(4))
+    pass
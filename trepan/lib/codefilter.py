@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A trace filter that remembers its decision for each code object."""
+
+import os.path, site, sysconfig
+
+import tracefilter
+
+# Past this many code objects, we start remembering decisions afresh.
+MAX_DECISIONS = 100000
+
+
+def stdlib_dirs():
+    """Return the directories of the Python standard library."""
+    paths = sysconfig.get_paths()
+    return unique_realpaths([paths['stdlib'], paths['platstdlib']])
+
+
+def site_packages_dirs():
+    """Return the directories packages get installed in."""
+    paths = sysconfig.get_paths()
+    dirs = [paths['purelib'], paths['platlib']]
+    # Not all versions of site have these.
+    if hasattr(site, 'getsitepackages'):
+        dirs += site.getsitepackages()
+        pass
+    if hasattr(site, 'getusersitepackages'):
+        dirs.append(site.getusersitepackages())
+        pass
+    return unique_realpaths(dirs)
+
+
+def unique_realpaths(paths):
+    result = []
+    for path in paths:
+        path = os.path.realpath(path)
+        if path not in result:
+            result.append(path)
+            pass
+        pass
+    return result
+
+
+def in_dirs(filename, dirs):
+    """Return True if `filename' is somewhere under one of `dirs'."""
+    for dirname in dirs:
+        if filename.startswith(dirname + os.sep):
+            return True
+        pass
+    return False
+
+
+class CodeFilter(tracefilter.TraceFilter):
+    """A tracefilter.TraceFilter that also includes all code from the
+    files under some directories, given by prefix rules.
+
+    A prefix rule is 'stdlib' for the Python standard library,
+    'site-packages' for installed packages, or the path of a
+    directory, optionally followed by '/*'. Note that 'stdlib' doesn't
+    take in the site-packages directories inside the standard library
+    directory.
+
+    Whether a code object is included is worked out once and kept in
+    `decisions', by the id of the code object; frames and functions
+    with that code then cost a single dictionary lookup. Code objects
+    are not used as keys themselves, since two functions with the same
+    body in different files compare equal. Changing what is included
+    forgets all decisions.
+    """
+
+    def __init__(self, include_fns=[], prefixes=[]):
+        tracefilter.TraceFilter.__init__(self, include_fns)
+        self.decisions = {}
+        self.prefixes = []
+        for prefix in prefixes:
+            self.add_prefix(prefix)
+            pass
+        return
+
+    def is_included(self, frame_or_fn):
+        """Return True if `frame_or_fn' is in the list of functions to
+        include, or comes from a file under an included prefix."""
+        try:
+            f_code = frame_or_fn.f_code
+        except AttributeError:
+            try:
+                f_code = tracefilter.to_f_code(frame_or_fn)
+            except:
+                return False
+            pass
+        entry = self.decisions.get(id(f_code))
+        if entry is not None and entry[0] is f_code:
+            return entry[1]
+        if len(self.decisions) >= MAX_DECISIONS:
+            self.decisions.clear()
+            pass
+        try:
+            included = (f_code in self.include_f_codes or
+                        (f_code is not None and self.prefixes != [] and
+                         self._in_prefixes(f_code.co_filename)))
+        except TypeError:
+            # Not hashable
+            return False
+        # Keeping f_code keeps its id from being reused for other code.
+        self.decisions[id(f_code)] = (f_code, included)
+        return included
+
+    def clear_include(self):
+        tracefilter.TraceFilter.clear_include(self)
+        self.decisions.clear()
+        return
+
+    def add_include(self, frame_or_fn):
+        self.decisions.clear()
+        return tracefilter.TraceFilter.add_include(self, frame_or_fn)
+
+    def remove_include(self, frame_or_fn):
+        self.decisions.clear()
+        return tracefilter.TraceFilter.remove_include(self, frame_or_fn)
+
+    def add_prefix(self, prefix):
+        """Include code from the files under prefix rule `prefix'.
+        Return False if the rule was already there."""
+        if prefix in [rule[0] for rule in self.prefixes]:
+            return False
+        if 'stdlib' == prefix:
+            dirs, exclude_dirs = stdlib_dirs(), site_packages_dirs()
+        elif 'site-packages' == prefix:
+            dirs, exclude_dirs = site_packages_dirs(), []
+        else:
+            path = prefix
+            if path.endswith('/*'):
+                path = path[:-2]
+                pass
+            dirs = [os.path.realpath(os.path.expanduser(path))]
+            exclude_dirs = []
+            pass
+        self.prefixes.append((prefix, dirs, exclude_dirs))
+        self.decisions.clear()
+        return True
+
+    def remove_prefix(self, prefix):
+        """Remove prefix rule `prefix'. Return False if it wasn't
+        there."""
+        for i, rule in enumerate(self.prefixes):
+            if rule[0] == prefix:
+                del self.prefixes[i]
+                self.decisions.clear()
+                return True
+            pass
+        return False
+
+    def _in_prefixes(self, co_filename):
+        if co_filename.startswith('<'):
+            # Something like <string>
+            return False
+        filename = os.path.realpath(co_filename)
+        for prefix, dirs, exclude_dirs in self.prefixes:
+            if in_dirs(filename, dirs) and not in_dirs(filename,
+                                                       exclude_dirs):
+                return True
+            pass
+        return False
+    pass
+
+# Demo it
+if __name__ == '__main__':
+    import inspect
+    code_filter = CodeFilter([in_dirs], ['stdlib'])
+    print("in_dirs included?: %s" % code_filter.is_included(in_dirs))
+    print("inspect.getmembers included?: %s" %
+          code_filter.is_included(inspect.getmembers))
+    print("This frame included?: %s" %
+          code_filter.is_included(inspect.currentframe()))
+    pass
@@ -23,19 +23,133 @@ handling what to do when an event is triggered."""
 
 
 # Common Python packages
-import os, sys, threading
+import os, sys, threading, time, weakref
 
 # External Egg packages
 import tracer
 
 # Our local modules
 from trepan.lib import breakpoint, default, stack as Mstack
+from trepan.lib import bytecode as Mbytecode, codebreak as Mcodebreak
+from trepan.lib import catchpoint as Mcatchpoint, stops as Mstops
+from trepan.lib import codefilter as Mcodefilter, tracestats as Mtracestats
 from trepan import misc as Mmisc
 from trepan import clifns as Mclifns
 from trepan.processor import trace as Mtrace, cmdproc as Mcmdproc
 
 
-class DebuggerCore:
+class FrameLevels(dict):
+    """ThreadState.frame_levels: (code, stack depth) by frame id. See
+    DebuggerCore.frame_level(). Unlike a dict, it can be weakly
+    referenced, so that DebuggerCore can find those of all threads
+    without keeping them past their thread."""
+    pass
+
+
+class ThreadState(threading.local):
+    """Stepping state of a thread. Each thread that runs traced code
+    "next"s, "step"s or "finish"es on its own, and this keeps
+    trace_dispatch() from having to lock anything to decide whether a
+    thread stops. A thread starts out running to the next breakpoint.
+
+    If `all_frame_levels' is given, the frame_levels of each thread
+    are added to it."""
+
+    def __init__(self, all_frame_levels=None):
+        # What events are considered in stepping. Note: 'None' means *all*.
+        self.step_events     = None
+        # How many line events to skip before entering event processor?
+        # If stop_level is None all breaks are counted otherwise just
+        # those which less than or equal to stop_level.
+        self.step_ignore     = -1
+
+        # If stop_level is not None, then we are next'ing or
+        # finish'ing and will ignore frames greater than stop_level.
+        # We also will cache the last frame encountered so we don't
+        # have to compute the current level all the time.
+        self.last_frame      = None
+        self.last_level      = 10000
+        self.stop_level      = None
+        self.stop_on_finish  = False
+
+        # The generator frame of a "next" given at one of its yields.
+        # Its caller may resume it from any depth, if at all, so we
+        # go by the frame itself; see set_next().
+        self.resume_frame    = None
+
+        # The outermost frame of the program and the exception that
+        # is passing through it, if it is one that an "uncaught"
+        # catchpoint is for. See DebuggerCore._caught_exception().
+        self.uncaught        = None
+        # The traceback of the last uncaught exception we stopped for.
+        # Past the program, it may go through more outermost frames,
+        # like those of the debugger's command-line script.
+        self.uncaught_tb     = None
+
+        # Stack depths of frames we have seen called but not yet
+        # return. See DebuggerCore.frame_level().
+        self.frame_levels    = FrameLevels()
+        if all_frame_levels is not None:
+            all_frame_levels[id(self.frame_levels)] = self.frame_levels
+            pass
+
+        self.last_lineno     = None
+        self.last_filename   = None
+        self.different_line  = None
+
+        # The reason we have stopped, e.g. 'breakpoint hit', 'next',
+        # 'finish', 'step', or 'exception'.
+        self.stop_reason     = ''
+
+        # Initially the event parameter of the event hook.
+        # We can however modify it, such as for breakpoints
+        self.event           = None
+        # The breakpoint we have stopped at, if any.
+        self.current_bp      = None
+
+        # Set while _count_dispatch() fast-forwards through a "step N"
+        # or "next N". See DebuggerCore._start_counting().
+        self.counting        = False
+        self.count_events    = ()
+        self.count_untrace   = False
+        self.count_library   = False
+        return
+
+    pass
+
+
+# What trace_dispatch() does with an event; see
+# DebuggerCore.event_actions.
+PRINT_EVENT = 1  # Show it, under "set trace"
+STOP_EVENT  = 2  # Consider stopping at it
+CATCH_EVENT = 4  # A catchpoint may want it
+
+# The settings that event_actions is compiled from.
+EVENT_SETTINGS = ('events', 'printset', 'trace')
+
+
+# Code that calls the function a thread runs; see
+# DebuggerCore._is_outermost_frame().
+THREAD_RUN_CODES = frozenset([threading.Thread.run.im_func.func_code,
+                              threading.Thread._Thread__bootstrap_inner
+                              .im_func.func_code])
+
+# Bound on the size of ThreadState.frame_levels. Frames whose return
+# we never see, say because we stopped tracing them, would otherwise
+# stay there forever. Only their ids are kept, not the frames and
+# their locals.
+MAX_FRAME_LEVELS = 100000
+
+
+def thread_state_property(name):
+    """Make DebuggerCore attribute `name' refer to the ThreadState of
+    the current thread."""
+    return property(lambda self: getattr(self.thread_state, name),
+                    lambda self, value: setattr(self.thread_state, name,
+                                                value))
+
+
+class DebuggerCore(object):
 
     DEFAULT_INIT_OPTS = {
         'processor'   : None,
@@ -61,19 +175,45 @@ class DebuggerCore:
                                                         self.DEFAULT_INIT_OPTS)
 
         self.bpmgr           = breakpoint.BreakpointManager()
-        self.current_bp      = None
+        self.bpmgr.line_added_hooks.append(self._retrace_threads)
         self.debugger        = debugger
 
-        # Threading lock ensures that we don't have other traced threads
-        # running when we enter the debugger. Later we may want to have
-        # a switch to control.
+        # Threading lock ensures that only one thread at a time enters
+        # the event processor. Threads that don't stop never take it.
         self.debugger_lock   = threading.Lock()
 
+        # Set once traced frames may have run without line events:
+        # under a sys.setprofile() hook, or with no hook at all after
+        # code breakpoints let us stop tracing. See
+        # _untrace_stale_frames().
+        self.ran_untraced    = False
+
+        # Line breakpoints done by rewriting code rather than by
+        # tracing, when the "codebreak" setting is on. See
+        # use_code_breakpoints().
+        self.code_breakpoints = Mcodebreak.CodeBreakpoints(
+            self.canonic, self._code_breakpoint_hit)
+
+        # Exception classes to stop on. See add_catchpoint().
+        self.catchpoints     = Mcatchpoint.Catchpoints()
+
+        # Threads stopped under "set nonstop". See _dispatch_nonstop().
+        self.stops           = Mstops.StopQueue()
+
+        # What trace_dispatch() has done. See trace_statistics().
+        self.trace_stats     = Mtracestats.TraceStats()
+
+        # Stepping state. This is per thread; see ThreadState.
+        # all_frame_levels has the frame_levels of every thread that
+        # has any; see stop().
+        self.all_frame_levels = weakref.WeakValueDictionary()
+        self.thread_state    = ThreadState(self.all_frame_levels)
+
         self.filename_cache  = {}
 
-        # Initially the event parameter of the event hook.
-        # We can however modify it, such as for breakpoints
-        self.event           = None
+        # True if start() has had threading.settrace() trace the
+        # threads started since.
+        self.traces_threads  = False
 
         # Is debugged program currently under execution?
         self.execution_status = 'Pre-execution'
@@ -90,36 +230,21 @@ class DebuggerCore:
         elif self.processor == 'bullwinkle':
             self.processor   = Mbwproc.BWProcessor(self, opts=proc_opts)
             pass
-        # What events are considered in stepping. Note: 'None' means *all*.
-        self.step_events     = None
-        # How many line events to skip before entering event processor?
-        # If stop_level is None all breaks are counted otherwise just
-        # those which less than or equal to stop_level.
+        # How many line events to skip before entering event processor
+        # in the thread creating us. Other threads start out with -1.
         self.step_ignore     = get_option('step_ignore')
 
-        # If stop_level is not None, then we are next'ing or
-        # finish'ing and will ignore frames greater than stop_level.
-        # We also will cache the last frame and thread number encountered
-        # so we don't have to compute the current level all the time.
-        self.last_frame      = None
-        self.last_level      = 10000
-        self.last_thread     = None
-        self.stop_level      = None
-        self.stop_on_finish  = False
-
-        self.last_lineno     = None
-        self.last_filename   = None
-        self.different_line  = None
-
-        # The reason we have stopped, e.g. 'breakpoint hit', 'next',
-        # 'finish', 'step', or 'exception'.
-        self.stop_reason     = ''
-
         self.trace_processor = Mtrace.PrintProcessor(self)
 
         # What routines (keyed by f_code) will we not trace into?
         self.ignore_filter = get_option('ignore_filter')
 
+        # Code that isn't the user's own, which stepping skips under
+        # "set justmycode". Finding the library directories takes a
+        # while, so this is created when first used; see
+        # library_filter and _is_library_frame().
+        self._library_filter = None
+
         self.search_path     = sys.path  # Source filename search path
 
         # When trace_hook_suspend is set True, we'll suspend
@@ -127,9 +252,40 @@ class DebuggerCore:
         self.trace_hook_suspend = False
 
         self.until_condition = get_option('until_condition')
+        # until_condition compiled; see matches_condition().
+        self.until_condition_code = None
+
+        # Line-number ranges of code objects, keyed by id(). The code
+        # object is stored alongside so its id can't get reused.
+        # See _frame_may_stop().
+        self.code_line_ranges = {}
+
+        # For each event name, a mask of PRINT_EVENT, STOP_EVENT and
+        # CATCH_EVENT saying what trace_dispatch() does with it. This
+        # is compiled from the settings in EVENT_SETTINGS and from the
+        # catchpoints when debugging starts or they change; see
+        # settings_changed(). Until then, we act as with the default
+        # settings.
+        self.event_actions = dict.fromkeys(tracer.ALL_EVENT_NAMES,
+                                           STOP_EVENT)
 
         return
 
+    # Stepping state of the current thread.
+    step_events    = thread_state_property('step_events')
+    step_ignore    = thread_state_property('step_ignore')
+    last_frame     = thread_state_property('last_frame')
+    last_level     = thread_state_property('last_level')
+    stop_level     = thread_state_property('stop_level')
+    stop_on_finish = thread_state_property('stop_on_finish')
+    resume_frame   = thread_state_property('resume_frame')
+    last_lineno    = thread_state_property('last_lineno')
+    last_filename  = thread_state_property('last_filename')
+    different_line = thread_state_property('different_line')
+    stop_reason    = thread_state_property('stop_reason')
+    event          = thread_state_property('event')
+    current_bp     = thread_state_property('current_bp')
+
     def add_ignore(self, *frames_or_fns):
         """Add `frame_or_fn' to the list of functions that are not to
         be debugged"""
@@ -202,13 +358,107 @@ class DebuggerCore:
         '''Return True if debugging is in progress.'''
         return (tracer.is_started() and
                 not self.trace_hook_suspend
-                and tracer.find_hook(self.trace_dispatch))
+                and tracer.find_hook(self.trace_dispatch) is not None)
+
+    @property
+    def library_filter(self):
+        """The CodeFilter of code that isn't the user's own."""
+        if self._library_filter is None:
+            self._library_filter = Mcodefilter.CodeFilter(
+                [], ['stdlib', 'site-packages'])
+            pass
+        return self._library_filter
 
     def remove_ignore(self, frame_or_fn):
         """Remove `frame_or_fn' to the list of functions that are not to
         be debugged"""
         return self.ignore_filter.remove_include(frame_or_fn)
 
+    def add_ignore_prefix(self, *prefixes):
+        """Don't debug code from files under any of `prefixes'. A
+        prefix is 'stdlib', 'site-packages' or a directory; see
+        trepan.lib.codefilter.CodeFilter. Return False if the last of
+        them was there already, or if there are none. TypeError is
+        raised if ignore_filter, say a plain tracefilter.TraceFilter,
+        can't take prefixes."""
+        self._check_ignore_prefixes()
+        rc = False
+        for prefix in prefixes:
+            rc = self.ignore_filter.add_prefix(prefix)
+            pass
+        return rc
+
+    def remove_ignore_prefix(self, prefix):
+        """Undo add_ignore_prefix() for `prefix'."""
+        self._check_ignore_prefixes()
+        return self.ignore_filter.remove_prefix(prefix)
+
+    def _check_ignore_prefixes(self):
+        if not hasattr(self.ignore_filter, 'add_prefix'):
+            raise TypeError('ignore_filter %s does not take file prefixes; '
+                            'use a trepan.lib.codefilter.CodeFilter'
+                            % self.ignore_filter.__class__.__name__)
+        return
+
+    def settings_changed(self, *names):
+        """Debugger settings `names' have been changed. Those, like
+        "set events" and "set trace", that trace_dispatch() needs for
+        every event are not looked up there but compiled into
+        self.event_actions, so it has to be told."""
+        for name in names:
+            if name in EVENT_SETTINGS:
+                self._compile_event_actions()
+                break
+            pass
+        return
+
+    def _compile_event_actions(self):
+        settings = self.debugger.settings
+        stop_events = settings['events'] or ()
+        if settings['trace']:
+            print_events = settings['printset'] or ()
+        else:
+            print_events = ()
+            pass
+        actions = {}
+        for event in tracer.ALL_EVENT_NAMES:
+            action = 0
+            if event in print_events:
+                action |= PRINT_EVENT
+                pass
+            if event in stop_events:
+                action |= STOP_EVENT
+                pass
+            if ((self.catchpoints.raised and 'exception' == event) or
+                (self.catchpoints.uncaught and
+                 event in ('exception', 'return'))):
+                action |= CATCH_EVENT
+                pass
+            actions[event] = action
+            pass
+        self.event_actions = actions
+        return
+
+    def add_catchpoint(self, exc_type, uncaught=False):
+        """Stop when an exception of class `exc_type' is raised or,
+        if `uncaught', when nothing in the program caught it. Return
+        False if there already was such a catchpoint."""
+        added = self.catchpoints.add(exc_type, uncaught)
+        self._compile_event_actions()
+        return added
+
+    def remove_catchpoint(self, exc_type):
+        """Remove the catchpoints for `exc_type'. Return False if there
+        were none."""
+        removed = self.catchpoints.remove(exc_type)
+        self._compile_event_actions()
+        return removed
+
+    def clear_catchpoints(self):
+        self.catchpoints.clear()
+        self._compile_event_actions()
+        return
+
     def start(self, opts=None):
         """ We've already created a debugger object, but here we start
         debugging in earnest. We can also turn off debugging (but have
@@ -217,9 +467,12 @@ class DebuggerCore:
         'opts' is a hash of every known value you might want to set when
         starting the debugger. See START_OPTS of module default.
         """
+        # Settings may have been changed directly, as by command-line
+        # options.
+        self._compile_event_actions()
 
         # The below is our fancy equivalent of:
-        #    sys.settrace(self._trace_dispatch)
+        #    sys.settrace(self.trace_dispatch)
         try:
             self.trace_hook_suspend = True
             get_option = lambda key: Mmisc.option_set(opts, key,
@@ -237,9 +490,20 @@ class DebuggerCore:
                 tracer_start_opts['trace_fn'] = self.trace_dispatch
                 tracer_start_opts['add_hook_opts'] = add_hook_opts
                 tracer.start(tracer_start_opts)
-            elif not tracer.find_hook(self.trace_dispatch):
+            elif tracer.find_hook(self.trace_dispatch) is None:
                 tracer.add_hook(self.trace_dispatch, add_hook_opts)
                 pass
+            # Frames get their local trace function from the
+            # sys.settrace() hook. Interpose ours so that frames which
+            # can't stop don't get one. See _fast_continue_dispatch().
+            sys.settrace(self._fast_continue_dispatch)
+            # If asked, threads started from here on are traced too,
+            # starting out running to the next breakpoint. See
+            # ThreadState.
+            if get_option('threads'):
+                threading.settrace(self._fast_continue_dispatch)
+                self.traces_threads = True
+                pass
             self.execution_status = 'Running'
         finally:
             self.trace_hook_suspend = False
@@ -252,12 +516,30 @@ class DebuggerCore:
             self.trace_hook_suspend = True
             get_option = lambda key: Mmisc.option_set(options, key,
                                                       default.STOP_OPTS)
+            # We won't see the remaining frames return, in any thread.
+            for levels in self.all_frame_levels.values():
+                levels.clear()
+                pass
             args = [self.trace_dispatch]
             remove = get_option('remove')
             if remove:
                 args.append(remove)
                 pass
+            if self.traces_threads:
+                # Only undo a threading.settrace() of ours.
+                threading.settrace(None)
+                self.traces_threads = False
+                pass
             if tracer.is_started():
+                if self.is_profile_mode():
+                    sys.setprofile(None)
+                    sys.settrace(tracer._tracer_func)
+                elif self.is_counting():
+                    self.thread_state.counting = False
+                    sys.settrace(tracer._tracer_func)
+                elif self.is_fast_continue():
+                    sys.settrace(tracer._tracer_func)
+                    pass
                 try:
                     tracer.remove_hook(*args)
                 except LookupError:
@@ -267,31 +549,523 @@ class DebuggerCore:
             self.trace_hook_suspend = False
         return
 
-    def is_break_here(self, frame, arg):
-        filename = self.canonic(frame.f_code.co_filename)
-        if 'call' == self.event:
-            find_name  = frame.f_code.co_name
-            # Could check code object or decide not to
-            # The below could be done as a list comprehension, but
-            # I'm feeling in Fortran mood right now.
-            for fn in self.bpmgr.fnlist:
-                if fn.func_name == find_name:
-                    self.current_bp = bp = self.bpmgr.fnlist[fn][0]
-                    if bp.temporary:
-                        msg = 'temporary '
-                        self.bpmgr.delete_breakpoint(bp)
+    def is_fast_continue(self):
+        """Return True if our sys.settrace() hook, rather than tracer's,
+        is the one deciding whether new frames get traced."""
+        return sys.gettrace() == self._fast_continue_dispatch
+
+    def is_tracing_thread(self):
+        """Return True if the current thread has one of our hooks."""
+        return self.is_started() and (
+            sys.gettrace() in (self._fast_continue_dispatch,
+                               self._count_dispatch, tracer._tracer_func) or
+            self.is_profile_mode())
+
+    def is_profile_mode(self):
+        """Return True if, rather than tracing, we are getting just call
+        and return events through a sys.setprofile() hook."""
+        return sys.getprofile() == self._profile_dispatch
+
+    def is_counting(self):
+        """Return True if the current thread is fast-forwarding through
+        a "step N" or "next N". See _start_counting()."""
+        return sys.gettrace() == self._count_dispatch
+
+    def _can_use_profile_hook(self):
+        """Return True if nothing but a call or a return can make the
+        current thread stop: we are continuing with only function
+        breakpoints set, or doing "finish" or "step return"."""
+        state = self.thread_state
+        if (not self.debugger.settings['fastcontinue'] or
+            tracer.size() != 1 or self.until_condition or
+            self.trace_hook_suspend or self.debugger.settings['trace'] or
+            self.catchpoints):
+            # A profile hook doesn't see exceptions.
+            return False
+        if state.step_ignore >= 0 or state.stop_level is not None:
+            if not state.step_events:
+                return False
+            for event in state.step_events:
+                if event not in ('call', 'return'):
+                    return False
+                pass
+            pass
+        return not self.bpmgr.has_line_breakpoints()
+
+    def _choose_trace_hook(self, frame):
+        """We are about to resume execution in `frame'. Switch between
+        a sys.setprofile() hook and full tracing of the current thread,
+        depending on what might make us stop next."""
+        if tracer.find_hook(self.trace_dispatch) is None:
+            # Debugging was stopped.
+            return
+        if self._can_drop_trace_hook():
+            self.ran_untraced = True
+            self.stop({'remove': True})
+            return
+        if self._can_use_profile_hook():
+            if not self.is_profile_mode():
+                self.ran_untraced = True
+                sys.settrace(None)
+                sys.setprofile(self._profile_dispatch)
+                pass
+            return
+        if self.is_profile_mode():
+            sys.setprofile(None)
+            sys.settrace(self._fast_continue_dispatch)
+            self._retrace_stack(frame)
+            pass
+        if self._can_fast_forward():
+            self._start_counting(frame)
+            pass
+        return
+
+    def _can_fast_forward(self):
+        """Return True if we have a stepping count to get through and
+        nothing but stepping and breakpoints can make the current thread
+        stop or print on the way, so that _count_dispatch() can do the
+        counting."""
+        return (self.thread_state.step_ignore > 0 and tracer.size() == 1 and
+                not self.until_condition and not self.trace_hook_suspend and
+                not self.debugger.settings['trace'] and
+                not self.catchpoints)
+
+    def _start_counting(self, frame):
+        """Have events of the current thread go to _count_dispatch()
+        rather than through tracer and the full trace_dispatch(). This
+        covers frames called from now on, and those in the stack of
+        `frame' which are traced. `frame' itself gets its trace function
+        reset by Python when we return from its event; its events
+        reach _count_dispatch() through trace_dispatch()."""
+        state = self.thread_state
+        settings = self.debugger.settings
+        state.counting      = True
+        state.count_events  = settings['events'] or ()
+        state.count_library = settings['justmycode']
+        # Under "step" every new frame can stop, unless it is library
+        # code under "set justmycode". Under "next" deeper frames can't.
+        state.count_untrace = (settings['fastcontinue'] and
+                               (state.stop_level is not None or
+                                state.resume_frame is not None or
+                                settings['justmycode']))
+        sys.settrace(self._count_dispatch)
+        while frame is not None:
+            if (frame.f_trace is not None and
+                not (self.ignore_filter and
+                     self.ignore_filter.is_included(frame))):
+                frame.f_trace = self._count_dispatch
+                pass
+            frame = frame.f_back
+            pass
+        return
+
+    def _stop_counting(self, frame):
+        """Undo _start_counting() for the current thread and the stack
+        of `frame'."""
+        self.thread_state.counting = False
+        if self.debugger.settings['fastcontinue']:
+            sys.settrace(self._fast_continue_dispatch)
+        else:
+            sys.settrace(tracer._tracer_func)
+            pass
+        while frame is not None:
+            if frame.f_trace == self._count_dispatch:
+                frame.f_trace = tracer._tracer_func
+                pass
+            frame = frame.f_back
+            pass
+        return
+
+    def _count_dispatch(self, frame, event, arg):
+        """The trace function used while fast-forwarding through a
+        "step N" or "next N". For "step N" it does no more than count
+        down the stepping count as is_stop_here() would, and look up the
+        line in the breakpoint index. Once the count is reached or a
+        breakpoint may be hit, we go back to full tracing and stop as
+        trace_dispatch() would have."""
+        state = self.thread_state
+        if not state.counting:
+            # A frame, say of a suspended generator, that kept this as
+            # its trace function after we stopped counting.
+            return tracer._tracer_func(frame, event, arg)
+        self.trace_stats.events[Mtracestats.EVENT_INDEX[event]] += 1
+        f_code = frame.f_code
+        if 'call' == event:
+            # Frames that can't count or stop don't get traced. Frames
+            # in the stack when we started counting that are to be
+            # ignored were left alone by _start_counting().
+            if self.ignore_filter and self.ignore_filter.is_included(frame):
+                self.trace_stats.ignored += 1
+                frame.f_trace = None
+                return None
+            if (state.count_untrace and not self._frame_may_stop(frame) and
+                not self.bpmgr.fn_breakpoints(f_code)):
+                frame.f_trace = None
+                return None
+            pass
+        if event not in state.count_events:
+            self.trace_stats.rejected += 1
+            return self._count_dispatch
+
+        if state.stop_level is not None or state.resume_frame is not None:
+            # "next N": frames come and go less often here.
+            stop_here = self.is_stop_here(frame, event, arg)
+            if stop_here or self._may_break_here(frame, event):
+                return self._resume_dispatch(frame, event, arg, stop_here)
+            return self._count_dispatch
+
+        # "step N": is_stop_here() cut down to what stepping needs. We
+        # don't remember the levels of frames called while counting;
+        # frame_level() works them out from those of their callers.
+        stop_here = False
+        lineno = frame.f_lineno
+        co_filename = f_code.co_filename
+        if not (state.different_line and 'line' == event and
+                state.last_lineno == lineno and
+                state.last_filename == co_filename):
+            state.last_lineno   = lineno
+            state.last_filename = co_filename
+            if 'return' == event:
+                state.frame_levels.pop(id(frame), None)
+                pass
+            if ((not state.step_events or event in state.step_events) and
+                not (state.count_library and
+                     self.library_filter.is_included(frame))):
+                if state.step_ignore == 0:
+                    state.stop_reason = 'at a stepping statement'
+                    stop_here = True
+                else:
+                    state.step_ignore -= 1
+                    pass
+                pass
+            pass
+        lines = self.bpmgr.co_filename_lines.get(co_filename)
+        if lines is None:
+            lines = self.bpmgr.lines_for_co_filename(co_filename,
+                                                     self.canonic)
+            pass
+        if (stop_here or lineno in lines or
+            ('call' == event and self.bpmgr.fn_breakpoints(f_code))):
+            return self._resume_dispatch(frame, event, arg, stop_here)
+        return self._count_dispatch
+
+    def _resume_dispatch(self, frame, event, arg, stop_here):
+        """Stop counting, and handle `event' as trace_dispatch() would
+        after is_stop_here() said `stop_here'. If we didn't stop after
+        all, say because a breakpoint condition was false, or we did
+        and got another "step N" or "next N", we are counting again."""
+        self._stop_counting(frame)
+        self._dispatch_stop(frame, event, arg, stop_here)
+        if not self.thread_state.counting and self._can_fast_forward():
+            self._start_counting(frame)
+            pass
+        if self.thread_state.counting:
+            return self._count_dispatch
+        return tracer._tracer_func
+
+    def _can_drop_trace_hook(self):
+        """Return True if we can stop tracing altogether because the
+        only way the program can stop next is at a line breakpoint
+        whose code has been rewritten to call us. A function that was
+        running when it was rewritten, like the one we are stopped
+        in, goes on with its old code, so not while there is one. See
+        use_code_breakpoints()."""
+        state = self.thread_state
+        return (self.debugger.settings['codebreak'] and
+                state.step_ignore < 0 and state.stop_level is None and
+                tracer.size() == 1 and not self.until_condition and
+                not self.trace_hook_suspend and
+                not self.debugger.settings['trace'] and
+                not self.catchpoints and not self.bpmgr.fnlist and
+                self.bpmgr.line_breakpoints_rewritten() and
+                not self.code_breakpoints.is_running_original())
+
+    def use_code_breakpoints(self, on):
+        """Turn on or off rewriting the code of functions containing
+        line breakpoints so that they call _code_breakpoint_hit() when
+        they get to the breakpoint line. With only such breakpoints,
+        "continue" runs without any trace hook."""
+        if on:
+            self.bpmgr.set_code_breakpoints(self.code_breakpoints)
+        else:
+            self.bpmgr.set_code_breakpoints(None)
+            pass
+        return
+
+    def _code_breakpoint_hit(self, frame, lineno):
+        """Called from code rewritten by self.code_breakpoints when
+        `frame' gets to breakpoint line `lineno'. If we are tracing
+        the thread of `frame', its line event takes care of the breakpoint.
+        Otherwise start tracing, and stop if the breakpoint says to."""
+        if (sys.gettrace() in (self._fast_continue_dispatch,
+                               self._count_dispatch,
+                               tracer._tracer_func) and self.is_started()):
+            return
+        if not self.debugger.settings['codebreak']:
+            return
+        self.start()
+        self.trace_dispatch(frame, 'line', None)
+        if self.is_started():
+            self._choose_trace_hook(frame)
+            pass
+        return
+
+    def _profile_dispatch(self, frame, event, arg):
+        """The sys.setprofile() hook used instead of tracing when only
+        calls and returns matter. See _can_use_profile_hook()."""
+        state = self.thread_state
+        if state.step_ignore >= 0 or state.stop_level is not None:
+            if event in ('call', 'return'):
+                self.trace_dispatch(frame, event, arg)
+                pass
+        elif 'call' == event and self.bpmgr.fn_breakpoints(frame.f_code):
+            self.trace_dispatch(frame, event, arg)
+            pass
+        return
+
+    def _fast_continue_dispatch(self, frame, event, arg):
+        """The sys.settrace() hook used in place of tracer's. It sees
+        only 'call' events. Frames that could never stop are given no
+        local trace function, so that when continuing with only a few
+        breakpoints set, we don't pay for line events in code that
+        can't have any effect."""
+        trace_fn = tracer._tracer_func
+        if (not self.debugger.settings['fastcontinue'] or
+            tracer.size() != 1 or self._frame_may_stop(frame)):
+            return trace_fn(frame, event, arg)
+        if self.bpmgr.fn_breakpoints(frame.f_code):
+            # There is a breakpoint on this call. If we stop, the
+            # stepping state may change from under us.
+            trace_fn(frame, event, arg)
+            if self._frame_may_stop(frame):
+                return trace_fn
+            pass
+        # A resumed generator may still have a trace function
+        # set from a previous call.
+        frame.f_trace = None
+        return None
+
+    def _frame_may_stop(self, frame):
+        """Return True if the stepping state, breakpoints or settings
+        are such that we could possibly stop in `frame'. When in doubt,
+        we say yes."""
+        if (self.until_condition or self.trace_hook_suspend or
+            self.debugger.settings['trace']):
+            return True
+        if self.catchpoints:
+            # An exception event is only seen by a frame that is
+            # traced. Uncaught exceptions are only looked for in
+            # the outermost frame.
+            if self.catchpoints.raised or self._is_outermost_frame(frame):
+                return True
+            pass
+        state = self.thread_state
+        if self._is_library_frame(frame):
+            # Stepping doesn't stop here, only breakpoints can.
+            pass
+        elif state.resume_frame is not None:
+            # "next" at a yield: only the generator can stop.
+            if frame is state.resume_frame:
+                return True
+        elif state.stop_level is None:
+            if state.step_ignore >= 0:
+                return True
+        else:
+            # "next" or "finish": we stop only at or above stop_level.
+            back = frame.f_back
+            if back is state.last_frame:
+                if state.last_level + 1 <= state.stop_level:
+                    return True
+            elif back is None or back.f_trace is not None:
+                # Not known to be below stop_level. Note that a caller
+                # without a trace function was found too deep to stop in
+                # under the same state we have now; see _retrace_stack().
+                return True
+            pass
+        return self._code_has_breakpoints(frame.f_code)
+
+    def _code_has_breakpoints(self, f_code):
+        """Return True if there is an enabled line breakpoint within
+        the range of lines of code object `f_code'."""
+        lines = self.bpmgr.lines_for_co_filename(f_code.co_filename,
+                                                 self.canonic)
+        if not lines:
+            return False
+        entry = self.code_line_ranges.get(id(f_code))
+        if entry is None or entry[0] is not f_code:
+            entry = (f_code,) + Mbytecode.code_line_range(f_code)
+            self.code_line_ranges[id(f_code)] = entry
+            pass
+        first, last = entry[1:]
+        for lineno in lines:
+            if first <= lineno <= last:
+                return True
+            pass
+        return False
+
+    def _retrace_stack(self, frame):
+        """Give `frame' and its callers back a local trace function
+        if _fast_continue_dispatch() left them without one. We do this
+        whenever we stop since afterwards stepping can take us into any
+        of them. Callers that are library code without breakpoints are
+        left out under "set justmycode": stepping doesn't stop there."""
+        if frame is None:
+            return
+        if frame.f_trace is None:
+            frame.f_trace = tracer._tracer_func
+            pass
+        frame = frame.f_back
+        while frame is not None:
+            if (frame.f_trace is None and
+                not (self._is_library_frame(frame) and
+                     not self._code_has_breakpoints(frame.f_code))):
+                frame.f_trace = tracer._tracer_func
+                pass
+            frame = frame.f_back
+            pass
+        return
+
+    def _retrace_threads(self, filename, lineno):
+        """A line breakpoint was added or enabled. Give back a local
+        trace function to the frames, in every thread, that
+        _fast_continue_dispatch() left without one and whose code has
+        a breakpoint now. Otherwise a loop that is already running,
+        in another thread or in a caller that _retrace_stack() left
+        alone, wouldn't see the breakpoint until it is called again."""
+        if not self.is_started():
+            return
+        for frame in sys._current_frames().values():
+            while frame is not None:
+                if (frame.f_trace is None and
+                    self._code_has_breakpoints(frame.f_code)):
+                    frame.f_trace = tracer._tracer_func
+                    pass
+                frame = frame.f_back
+                pass
+            pass
+        return
+
+    def _is_outermost_frame(self, frame):
+        """Return True if `frame' is the outermost one of the debugged
+        program, or of one of its threads: the one that an exception
+        leaves when nothing in the program catches it."""
+        back = frame.f_back
+        return (back is None or back.f_code in THREAD_RUN_CODES or
+                bool(self.ignore_filter and
+                     self.ignore_filter.is_included(back)))
+
+    def _caught_exception(self, frame, event, arg):
+        """For an event of CATCH_EVENT, return the exception info
+        (type, value, traceback) to stop for, or None. This is an
+        'exception' event where an exception that a catchpoint is for
+        gets raised, or an exception that an "uncaught" catchpoint is
+        for leaving the outermost frame. We see that from its
+        'exception' event in that frame, followed by a 'return' event
+        while unwinding."""
+        catchpoints = self.catchpoints
+        state = self.thread_state
+        if 'exception' == event:
+            exc_type = arg[0]
+            try:
+                if (Mcatchpoint.is_raise(arg) and
+                    catchpoints.is_raised_caught(exc_type)):
+                    state.stop_reason = ('at catchpoint for %s' %
+                                         Mcatchpoint.type_name(exc_type))
+                    return arg
+                if (catchpoints.uncaught and
+                    self._is_outermost_frame(frame)):
+                    if (catchpoints.is_uncaught_caught(exc_type) and
+                        not self._was_reported(arg[2])):
+                        state.uncaught = (frame, arg)
                     else:
-                        msg = ''
+                        state.uncaught = None
                         pass
-                    self.stop_reason = ("at %scall breakpoint %d" %
-                                        (msg, bp.number))
-                    self.event = 'brkpt'
-                    return True
+                    pass
+            except TypeError:
+                # Not a class
+                pass
+            return None
+        uncaught = state.uncaught
+        if uncaught is not None and uncaught[0] is frame:
+            state.uncaught = None
+            if Mcatchpoint.is_unwinding(frame):
+                state.frame_levels.pop(id(frame), None)
+                exc_info = uncaught[1]
+                state.uncaught_tb = exc_info[2]
+                state.stop_reason = ('at uncaught exception %s' %
+                                     Mcatchpoint.type_name(exc_info[0]))
+                return exc_info
+            pass
+        return None
+
+    def _was_reported(self, tb):
+        """Return True if traceback `tb' is that of the last uncaught
+        exception we stopped for, as it goes on."""
+        reported = self.thread_state.uncaught_tb
+        while tb is not None and reported is not None:
+            if tb is reported:
+                return True
+            tb = tb.tb_next
+            pass
+        return False
+
+    def _is_library_frame(self, frame):
+        """Return True if "set justmycode" is on and `frame' runs code
+        that library_filter says isn't the user's. The answer for a
+        given code object is worked out just once."""
+        return (self.debugger.settings['justmycode'] and
+                self.library_filter.is_included(frame))
+
+    def _untrace_stale_frames(self, frame):
+        """While a frame has a local trace function, its f_lineno is
+        the line of its last line event. Under a sys.setprofile() hook
+        there are no line events, so a frame may not be at that line
+        anymore; without a trace function f_lineno is computed from
+        where the frame really is. So take away the trace function of
+        such frames in the stack of `frame', and return the (frame, trace
+        function) pairs that have to be put back before resuming."""
+        stale = []
+        while frame is not None:
+            trace_fn = frame.f_trace
+            if trace_fn is not None:
+                lineno = frame.f_lineno
+                frame.f_trace = None
+                if frame.f_lineno == lineno:
+                    frame.f_trace = trace_fn
+                else:
+                    stale.append((frame, trace_fn))
+                    pass
                 pass
+            frame = frame.f_back
+            pass
+        return stale
+
+    def is_break_here(self, frame, arg):
+        if 'call' == self.event:
+            for bp in self.bpmgr.fn_breakpoints(frame.f_code) or []:
+                if not self.bpmgr.in_thread((bp,)):
+                    continue
+                bp.hits += 1
+                self.current_bp = bp
+                if bp.temporary:
+                    msg = 'temporary '
+                    self.bpmgr.delete_breakpoint(bp)
+                else:
+                    msg = ''
+                    pass
+                self.stop_reason = ("at %scall breakpoint %d" %
+                                    (msg, bp.number))
+                self.event = 'brkpt'
+                return True
             pass
-        if (filename, frame.f_lineno) in list(self.bpmgr.bplist.keys()):
-            (bp, clear_bp) = self.bpmgr.find_bp(filename, frame.f_lineno,
-                                                frame)
+        # Most events are on lines without a breakpoint. Rule those
+        # out with a single lookup in the breakpoint manager's line index.
+        co_filename = frame.f_code.co_filename
+        lineno = frame.f_lineno
+        if lineno in self.bpmgr.lines_for_co_filename(co_filename,
+                                                      self.canonic):
+            filename = self.canonic(co_filename)
+            (bp, clear_bp) = self.bpmgr.find_bp(filename, lineno, frame)
             if bp:
                 self.current_bp = bp
                 if (clear_bp and bp.temporary):
@@ -313,8 +1087,20 @@ class DebuggerCore:
         # Conditional bp.
         # Ignore count applies only to those bpt hits where the
         # condition evaluates to true.
+        if self.until_condition_code is None:
+            try:
+                self.until_condition_code = \
+                  breakpoint.compile_condition(self.until_condition)
+            except SyntaxError:
+                # It never matches. Remember that, rather than trying
+                # to compile it again on every event.
+                self.until_condition_code = \
+                  breakpoint.compile_condition('False')
+                pass
+            pass
         try:
-            val = eval(self.until_condition, frame.f_globals, frame.f_locals)
+            val = eval(self.until_condition_code, frame.f_globals,
+                       frame.f_locals)
         except:
             # if eval fails, most conservative thing is to
             # stop on breakpoint regardless of ignore count.
@@ -322,6 +1108,42 @@ class DebuggerCore:
             return False
         return val
 
+    def frame_level(self, frame):
+        """Return the stack depth of `frame', the same number as
+        Mstack.count_frames(frame) gives.
+
+        Levels are remembered for the frames of the current thread
+        from their 'call' event, or from set_next(), to their 'return'
+        event. So usually this is a dictionary lookup of `frame' or its
+        caller rather than a walk of the whole stack. They are kept by
+        frame id, with the code of the frame: a frame whose return we
+        didn't see may be gone and its id reused, and the code tells
+        most such frames apart."""
+        levels = self.thread_state.frame_levels
+        level = 0
+        steps = 0
+        f = frame
+        while f is not None:
+            entry = levels.get(id(f))
+            if entry is not None and entry[0] is f.f_code:
+                level = entry[1]
+                break
+            steps += 1
+            f = f.f_back
+            pass
+        return level + steps
+
+    def _remember_frame_level(self, frame):
+        """Compute the level of `frame' and keep it until we see
+        `frame' return."""
+        levels = self.thread_state.frame_levels
+        level = self.frame_level(frame)
+        if len(levels) >= MAX_FRAME_LEVELS:
+            levels.clear()
+            pass
+        levels[id(frame)] = (frame.f_code, level)
+        return level
+
     def is_stop_here(self, frame, event, arg):
         """ Does the magic to determine if we stop here and run a
         command processor or not. If so, return True and set
@@ -331,6 +1153,21 @@ class DebuggerCore:
         encountered, whether we are stepping, next'ing, finish'ing,
         and, if so, whether there is an ignore counter.
         """
+        # Keep track of frame levels as frames come and go so that
+        # "next" and "finish" never need to walk the stack.
+        if 'call' == event:
+            self._remember_frame_level(frame)
+            pass
+        try:
+            return self._is_stop_here(frame, event, arg)
+        finally:
+            if 'return' == event:
+                self.thread_state.frame_levels.pop(id(frame), None)
+                pass
+            pass
+        return
+
+    def _is_stop_here(self, frame, event, arg):
 
         # Add an generic event filter here?
         # FIXME TODO: Check for
@@ -340,63 +1177,109 @@ class DebuggerCore:
 
         # Do we want a different line and if so,
         # do we have one?
+        # All of the state below is that of the current thread, so
+        # nothing here needs debugger_lock.
+        state = self.thread_state
+        if state.resume_frame is not None:
+            if frame is not state.resume_frame:
+                return False
+            # The generator is back. Go on as "next" in it, at the
+            # depth it now has. Its 'call' event is at the yield it
+            # resumes from, which isn't worth stopping at.
+            state.resume_frame = None
+            state.stop_level   = self.frame_level(frame)
+            state.last_level   = state.stop_level
+            state.last_frame   = frame
+            if 'call' == event:
+                return False
+            pass
+
         lineno = frame.f_lineno
         filename = frame.f_code.co_filename
-        if self.different_line and event == 'line':
-            if self.last_lineno == lineno and self.last_filename == filename:
+        if state.different_line and event == 'line':
+            if state.last_lineno == lineno and state.last_filename == filename:
                 return False
             pass
-        self.last_lineno   = lineno
-        self.last_filename = filename
+        state.last_lineno   = lineno
+        state.last_filename = filename
 
-        if self.stop_level is not None:
-            if frame != self.last_frame:
+        if state.stop_level is not None:
+            if frame is not state.last_frame:
                 # Recompute stack_depth:
-                if self.last_frame:
-                    if frame.f_back == self.last_frame:
-                        self.last_level += 1
-                    elif self.last_frame.f_back == frame:
-                        self.last_level -= 1
-                    else:
-                        self.last_level = Mstack.count_frames(frame)
+                if state.last_frame and frame.f_back is state.last_frame:
+                    state.last_level += 1
                 else:
-                    self.last_level = Mstack.count_frames(frame)
-                self.last_frame = frame
+                    state.last_level = self.frame_level(frame)
+                state.last_frame = frame
                 pass
-            if self.last_level > self.stop_level:
+            if state.last_level > state.stop_level:
                 return False
-            elif self.last_level == self.stop_level and \
-                    self.stop_on_finish and event in ['return', 'c_return']:
-                self.stop_level = None
-                self.stop_reason = "in return for 'finish' command"
+            elif state.last_level == state.stop_level and \
+                    state.stop_on_finish and event in ['return', 'c_return']:
+                state.stop_level = None
+                state.stop_reason = "in return for 'finish' command"
                 return True
             pass
 
         # Check for stepping
+        if self._is_library_frame(frame):
+            return False
         if self._is_step_next_stop(event):
-            self.stop_reason = 'at a stepping statement'
+            state.stop_reason = 'at a stepping statement'
             return True
 
         return False
 
     def _is_step_next_stop(self, event):
-        if self.step_events and event not in self.step_events:
+        state = self.thread_state
+        if state.step_events and event not in state.step_events:
             return False
-        if self.step_ignore == 0:
+        if state.step_ignore == 0:
             return True
-        elif self.step_ignore > 0:
-            self.step_ignore -= 1
+        elif state.step_ignore > 0:
+            state.step_ignore -= 1
             pass
         return False
 
+    def is_at_yield(self, frame):
+        """Return True if we are stopped at a yield of generator frame
+        `frame'."""
+        return 'return' == self.event and Mbytecode.is_yielding(frame)
+
     def set_next(self, frame, step_ignore=0, step_events=None):
-        "Sets to stop on the next event that happens in frame 'frame'."
+        """Sets to stop on the next event that happens in frame 'frame'.
+
+        If we are stopped at a yield of generator frame 'frame', the
+        next event in it is when it gets resumed. That may be from a
+        different depth, so rather than by depth we go by the frame
+        itself until then."""
         self.step_events      = None  # Consider all events
-        self.stop_level       = Mstack.count_frames(frame)
-        self.last_level       = self.stop_level
-        self.last_frame       = frame
+        if self.is_at_yield(frame):
+            self.resume_frame = frame
+            self.stop_level   = None
+            self.last_frame   = None
+        else:
+            self.resume_frame = None
+            self.stop_level   = self._remember_frame_level(frame)
+            self.last_level   = self.stop_level
+            self.last_frame   = frame
+            pass
         self.stop_on_finish   = False
         self.step_ignore      = step_ignore
+        if self.is_fast_continue():
+            self._retrace_stack(frame)
+            pass
+        return
+
+    def trace_statistics(self):
+        """Return a dictionary of statistics on trace events and the
+        time spent handling them. See TraceStats.as_dict() in
+        trepan.lib.tracestats for the keys."""
+        return self.trace_stats.as_dict(self.bpmgr.condition_evals)
+
+    def reset_trace_statistics(self):
+        self.trace_stats.reset()
+        self.bpmgr.condition_evals = 0
         return
 
     def trace_dispatch(self, frame, event, arg):
@@ -404,53 +1287,115 @@ class DebuggerCore:
         specialized event processor. Note that there may be more filtering
         that goes on in the command processor (e.g. to force a
         different line). We could put that here, but since that seems
-        processor-specific I think it best to distribute the checks.'''
+        processor-specific I think it best to distribute the checks.
+
+        Every event is counted, but only one in
+        tracestats.SAMPLE_INTERVAL is timed; see _sample_dispatch().'''
+        if (self.thread_state.counting and
+            not (self.ignore_filter and
+                 self.ignore_filter.is_included(frame))):
+            # An event of the frame we started counting in.
+            return self._count_dispatch(frame, event, arg)
+        stats = self.trace_stats
+        stats.events[Mtracestats.EVENT_INDEX[event]] += 1
+        stats.sample_countdown -= 1
+        if stats.sample_countdown <= 0:
+            return self._sample_dispatch(frame, event, arg)
+
+        if self.trace_hook_suspend:
+            return None
+
+        # FIXME: Understand what's going on here better.
+        # When None gets returned, the frame's f_trace seems to get set
+        # to None. Somehow this is changing other frames when get passed
+        # to this routine which also have their f_trace set to None.
+        # This will disallow a command like "jump" from working properly,
+        # which will give a cryptic the message on setting f_lineno:
+        #   f_lineno can only be set by a trace function
+        if self.ignore_filter and self.ignore_filter.is_included(frame):
+            self.trace_stats.ignored += 1
+            return True
 
-        # For now we only allow one instance in a process
-        # In Python 2.6 and beyond one can use "with threading.Lock():"
+        actions = self.event_actions[event]
+        if actions & PRINT_EVENT:
+            self.debugger_lock.acquire()
+            try:
+                self.event = event
+                self.trace_processor.event_processor(frame, event, arg)
+            finally:
+                self.debugger_lock.release()
+                pass
+            pass
+
+        if actions & CATCH_EVENT:
+            exc_info = self._caught_exception(frame, event, arg)
+            if exc_info is not None:
+                return self._dispatch_stop(frame, 'exception', exc_info,
+                                           True)
+            pass
+
+        if self.until_condition:
+            if not self.matches_condition(frame): return True
+            pass
+
+        if not actions & STOP_EVENT:
+            self.trace_stats.rejected += 1
+            return True
+
+        # I think we *have* to run is_stop_here() before
+        # is_break_here() because is_stop_here() sets various
+        # stepping counts. But it might be more desirable from the
+        # user's standpoint to test for breaks before steps. In
+        # this case we will need to factor out the counting
+        # updates.
+        #
+        # Up to here we have looked only at the current thread's
+        # state and at things that don't change while code runs. Only
+        # a thread that is likely to stop takes debugger_lock.
+        stop_here = self.is_stop_here(frame, event, arg)
+        if not (stop_here or self._may_break_here(frame, event)):
+            return True
+        return self._dispatch_stop(frame, event, arg, stop_here)
+
+    def _sample_dispatch(self, frame, event, arg):
+        """trace_dispatch() an event, timing it. Time spent stopped
+        in the command loop doesn't count."""
+        stats = self.trace_stats
+        # trace_dispatch() counts the event again, and counts down.
+        stats.events[Mtracestats.EVENT_INDEX[event]] -= 1
+        stats.sample_countdown = Mtracestats.SAMPLE_INTERVAL + 1
+        stopped_time = stats.stopped_time
+        start_time = time.time()
+        try:
+            return self.trace_dispatch(frame, event, arg)
+        finally:
+            stats.samples += 1
+            stats.sample_time += (time.time() - start_time -
+                                  (stats.stopped_time - stopped_time))
+            pass
+        pass
+
+    def _dispatch_stop(self, frame, event, arg, stop_here):
+        """The current thread stops at `event' of `frame' if `stop_here'
+        or if it hits a breakpoint. If so, run the event processor."""
+        if self.debugger.settings['nonstop']:
+            return self._dispatch_nonstop(frame, event, arg, stop_here)
+        # For now we only allow one thread at a time in the event
+        # processor. In Python 2.6 and beyond one can use "with
+        # threading.Lock():"
         try:
             self.debugger_lock.acquire()
 
+            # Debugging may have been suspended while we were waiting.
             if self.trace_hook_suspend:
                 return None
 
             self.event = event
-            # FIXME: Understand what's going on here better.
-            # When None gets returned, the frame's f_trace seems to get set
-            # to None. Somehow this is changing other frames when get passed
-            # to this routine which also have their f_trace set to None.
-            # This will disallow a command like "jump" from working properly,
-            # which will give a cryptic the message on setting f_lineno:
-            #   f_lineno can only be set by a trace function
-            if self.ignore_filter and self.ignore_filter.is_included(frame):
-                return True
-
-            if self.debugger.settings['trace']:
-                print_event_set = self.debugger.settings['printset']
-                if self.event in print_event_set:
-                    self.trace_processor.event_processor(frame,
-                                                         self.event, arg)
-                    pass
-                pass
-
-            if self.until_condition:
-                if not self.matches_condition(frame): return True
+            if not stop_here:
+                self.trace_stats.bp_probes += 1
                 pass
-
-            trace_event_set = self.debugger.settings['events']
-            if trace_event_set is None or self.event not in trace_event_set:
-                return True
-
-            # I think we *have* to run is_stop_here() before
-            # is_break_here() because is_stop_here() sets various
-            # stepping counts. But it might be more desirable from the
-            # user's standpoint to test for breaks before steps. In
-            # this case we will need to factor out the counting
-            # updates.
-            if ( self.is_stop_here(frame, event, arg) or
-                 self.is_break_here(frame, arg) ):
-                # Run the event processor
-                return self.processor.event_processor(frame, self.event, arg)
+            if stop_here or self.is_break_here(frame, arg):
+                return self._stop(frame, self.event, arg)
             return True
         finally:
             try:
@@ -459,6 +1404,106 @@ class DebuggerCore:
                 pass
             pass
         pass
+
+    def _dispatch_nonstop(self, frame, event, arg, stop_here):
+        """_dispatch_stop() in non-stop mode. debugger_lock is held
+        only while looking for a breakpoint. A thread that stops then
+        waits in `stops' for its turn at the prompt, and other threads
+        go on running."""
+        try:
+            self.debugger_lock.acquire()
+            if self.trace_hook_suspend:
+                return None
+            self.event = event
+            if not stop_here:
+                self.trace_stats.bp_probes += 1
+                pass
+            if not (stop_here or self.is_break_here(frame, arg)):
+                return True
+            event = self.event
+            if 'brkpt' == event:
+                bp_number = self.current_bp.number
+            else:
+                bp_number = None
+                pass
+        finally:
+            self.debugger_lock.release()
+            pass
+
+        stop = self.stops.enter(frame, event, arg, self.stop_reason,
+                                bp_number, self.debugger.settings['maxstops'])
+        if stop is None:
+            # Too many threads are stopped already. Go on running.
+            return True
+        try:
+            if stop.resume:
+                # Continued along with the other threads at its
+                # breakpoint, as by "continue -b".
+                self.step_events = None
+                self.step_ignore = -1
+                return True
+            return self._stop(frame, event, arg, stop)
+        finally:
+            self.stops.leave(stop)
+            pass
+        pass
+
+    def _stop(self, frame, event, arg, stop=None):
+        """Stop the current thread at `event' of `frame': run the event
+        processor, and then pick the trace hook to go on with.
+
+        In non-stop mode, `stop' is our entry in `stops'. The user may
+        switch from it to another stop and back, after which we run
+        the event processor again."""
+        if self.is_profile_mode():
+            # Commands like "step" need line events.
+            sys.setprofile(None)
+            sys.settrace(self._fast_continue_dispatch)
+            self._retrace_stack(frame)
+        elif self.is_fast_continue():
+            self._retrace_stack(frame)
+            pass
+        if self.ran_untraced:
+            stale = self._untrace_stale_frames(frame)
+        else:
+            stale = []
+            pass
+        # A new stop; any "next" at a yield is over with.
+        self.thread_state.resume_frame = None
+        stop_time = time.time()
+        try:
+            # Run the event processor
+            result = self.processor.event_processor(frame, event, arg)
+            while stop is not None and stop.switch_to is not None:
+                self.stops.switch(stop)
+                result = self.processor.event_processor(frame, event, arg)
+                pass
+        finally:
+            for stale_frame, trace_fn in stale:
+                stale_frame.f_trace = trace_fn
+                pass
+            self.trace_stats.stopped_time += time.time() - stop_time
+            pass
+        self._choose_trace_hook(frame)
+        return result
+
+    def _may_break_here(self, frame, event):
+        """A quick check, not needing debugger_lock, for whether
+        is_break_here() could find a breakpoint for `frame'. Other
+        threads rule out a breakpoint limited to some threads here."""
+        bpmgr = self.bpmgr
+        if 'call' == event:
+            bps = bpmgr.fn_breakpoints(frame.f_code)
+            if bps and bpmgr.in_thread(bps):
+                return True
+            pass
+        co_filename = frame.f_code.co_filename
+        lineno = frame.f_lineno
+        if lineno not in bpmgr.lines_for_co_filename(co_filename,
+                                                     self.canonic):
+            return False
+        return bpmgr.in_thread(bpmgr.bplist.get((self.canonic(co_filename),
+                                                 lineno), ()))
     pass
 
 # Demo it
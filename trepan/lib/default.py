@@ -17,11 +17,6 @@
 
 # External Egg packages
 import os, tracer
-from columnize import computed_displaywidth
-
-from trepan.lib.term_background import is_dark_background
-
-width = computed_displaywidth()
 
 # Below are the default debugger settings. The debugger object version
 # of this may change. A setting is something a user may want to
@@ -86,7 +81,8 @@ DEBUGGER_SETTINGS = {
     #  'plain'   : no highlighting
     #  'dark'    : terminal highlighting for a dark background
     #  'light'   : terminal highlighting for a light background
-    'highlight'     : is_dark_background(),
+    # None means to find out from the terminal; see probe_terminal().
+    'highlight'     : None,
 
     # Save debugger history?
     'hist_save'     : True,
@@ -94,6 +90,27 @@ DEBUGGER_SETTINGS = {
     # Show function calls/returns?
     'fntrace'       : False,
 
+    # When continuing, don't trace lines of frames that we can
+    # determine can never stop, e.g. because they have no breakpoints.
+    'fastcontinue'  : True,
+
+    # Don't stop stepping in code from the standard library or from
+    # installed packages, and don't trace it unless it has breakpoints.
+    'justmycode'    : False,
+
+    # When a thread stops, let other threads go on running. Stops of
+    # other threads wait their turn at the prompt; see "info stops".
+    'nonstop'       : False,
+
+    # In non-stop mode, the most threads that can wait to be stopped.
+    # Threads that would stop beyond that go on running.
+    'maxstops'      : 100,
+
+    # Stop at line breakpoints by rewriting the code of the functions
+    # containing them, rather than by tracing, so that while
+    # continuing no trace hook is needed at all.
+    'codebreak'     : False,
+
     # Number of lines to show by default in a 'list' command.
     'listsize'      : 10,
 
@@ -122,8 +139,9 @@ DEBUGGER_SETTINGS = {
     'trace'         : False,
 
     # The target maximum print length. Used for example in listing
-    # arrays which are columnized.
-    'width'         : width
+    # arrays which are columnized. None means to use the terminal
+    # width; see probe_terminal().
+    'width'         : None
 }
 
 CLIENT_SOCKET_OPTS = {
@@ -146,6 +164,7 @@ START_OPTS = {
     'event_set'     : tracer.ALL_EVENTS,
     'force'         : False,  # Force a new event handler?
     'start'         : False,
+    'threads'       : False,  # trace threads started from now on too
     }
 
 # Default settings. on the Debugger#stop() method call.
@@ -153,9 +172,27 @@ STOP_OPTS = {
     'remove': False
     }
 
+
+def probe_terminal(settings):
+    """Fill in those of the 'highlight' and 'width' settings of
+    `settings' that are None from what the terminal tells us, and
+    return `settings'. This is done when a debugger is created rather
+    than when this module is imported, so that programs which import
+    trepan but never debug don't pay for it."""
+    if settings.get('highlight') is None:
+        from trepan.lib.term_background import is_dark_background
+        settings['highlight'] = is_dark_background()
+        pass
+    if settings.get('width') is None:
+        from columnize import computed_displaywidth
+        settings['width'] = computed_displaywidth()
+        pass
+    return settings
+
 # Show it:
 if __name__=='__main__':
     import pprint
+    probe_terminal(DEBUGGER_SETTINGS)
     for val in ['DEBUGGER_SETTINGS',
                 'START_OPTS',
                 'STOP_OPTS']:
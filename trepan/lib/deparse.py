@@ -4,16 +4,16 @@
 import sys, tempfile
 from StringIO import StringIO
 from hashlib import sha1
-from uncompyle6.semantics.linemap import code_deparse_with_map
-from uncompyle6.semantics.fragments import (
-    deparsed_find, code_deparse)
 import pyficache
+# uncompyle6 is imported in the functions that use it: it is big, and
+# most debugger sessions never deparse anything.
 # FIXME remap filename to a short name.
 
 deparse_cache = {}
 
 def deparse_and_cache(co, errmsg_fn):
     # co = proc_obj.curframe.f_code
+    from uncompyle6.semantics.linemap import code_deparse_with_map
     out = StringIO()
     deparsed = deparse_cache.get(co, None)
     if not deparsed or not hasattr(deparsed, "source_linemap"):
@@ -47,6 +47,7 @@ def deparse_and_cache(co, errmsg_fn):
     return remapped_file, name_for_code
 
 def deparse_offset(co, name, last_i, errmsg_fn):
+    from uncompyle6.semantics.fragments import deparsed_find, code_deparse
     nodeInfo = None
     deparsed = deparse_cache.get(co, None)
     if not deparsed or not hasattr(deparsed, 'offsets'):
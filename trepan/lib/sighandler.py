@@ -22,6 +22,9 @@
 #
 import signal
 
+# SignalManager replaces signal.signal; chain_handler() wants the real one.
+_set_signal = signal.signal
+
 
 def YN(b):
     """Return 'Yes' for True and 'No' for False, and ?? for anything
@@ -131,6 +134,30 @@ signal_description = {
   }
 
 
+def chain_handler(signame, fn):
+    """Have signal `signame', e.g. SIGUSR1 or USR1, call fn() and then
+    the handler the program had for it, if it had one. As Python runs
+    signal handlers in the main thread only, this has to be called
+    from there. Return the signal number, or None if there is no such
+    signal."""
+    signum = lookup_signum(signame)
+    if signum is None:
+        return None
+    old_handler = signal.getsignal(signum)
+    if old_handler in (signal.SIG_IGN, signal.SIG_DFL):
+        old_handler = None
+        pass
+
+    def handle(signum, frame):
+        fn()
+        if old_handler:
+            old_handler(signum, frame)
+            pass
+        return
+    _set_signal(signum, handle)
+    return signum
+
+
 class SignalManager:
     """Manages Signal Handling information for the debugger
 
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Threads stopped in the debugger in non-stop mode.
+
+Each thread that stops gets a Stop in a StopQueue. One of them, the
+active one, has the command prompt; the others wait their turn without
+keeping threads that don't stop from running.
+
+When many threads hit the same breakpoint at about the same time, they
+queue up in order of arrival, and can be sent on their way together
+with resume_at_breakpoint() rather than one prompt at a time."""
+
+import threading, time
+
+
+class Stop:
+    """A thread stopped, or waiting to, at `event' of `frame'.
+    `reason' is why, as in "info program", and `bp_number' the number
+    of the breakpoint it hit, if any."""
+
+    def __init__(self, number, frame, event, arg, reason='',
+                 bp_number=None):
+        self.number      = number
+        self.thread_id   = threading.currentThread().ident
+        self.thread_name = threading.currentThread().getName()
+        self.frame       = frame
+        self.event       = event
+        self.arg         = arg
+        self.reason      = reason
+        self.bp_number   = bp_number
+        self.time        = time.time()
+
+        # The stop to give the prompt to when this one gives it up.
+        # See StopQueue.switch().
+        self.switch_to   = None
+
+        # Set to have the thread go on without getting the prompt.
+        # See StopQueue.resume_at_breakpoint().
+        self.resume      = False
+        return
+
+    def __str__(self):
+        return '%d %s at %s:%d' % (self.number, self.thread_name,
+                                   self.frame.f_code.co_filename,
+                                   self.frame.f_lineno)
+    pass
+
+
+class StopQueue:
+    """The stops of threads in order of arrival, and which of them is
+    active. A stop gets the prompt when it arrives if no other one has
+    it, and afterwards when the one that has it switches to it or goes
+    away; the stop that arrived first then gets the prompt."""
+
+    def __init__(self):
+        self.condition   = threading.Condition()
+        self.stops       = []
+        self.active      = None
+        self.last_number = 0
+
+        # Number of stops not queued because the queue was full
+        self.dropped     = 0
+        return
+
+    def enter(self, frame, event, arg, reason='', bp_number=None,
+              limit=None):
+        """Queue a stop for the current thread at `event' of `frame'
+        and wait for it to become active, or to be resumed. Return the
+        Stop, or None without waiting if `limit' stops are queued
+        already."""
+        self.condition.acquire()
+        try:
+            if limit is not None and len(self.stops) >= limit:
+                self.dropped += 1
+                return None
+            self.last_number += 1
+            stop = Stop(self.last_number, frame, event, arg, reason,
+                        bp_number)
+            self.stops.append(stop)
+            if self.active is None:
+                self.active = stop
+                pass
+            self._wait_for(stop)
+        finally:
+            self.condition.release()
+            pass
+        return stop
+
+    def leave(self, stop):
+        """The thread of `stop' goes on running. Make the stop that has
+        waited longest active."""
+        self.condition.acquire()
+        try:
+            self.stops.remove(stop)
+            if self.active is stop:
+                self._activate(stop.switch_to)
+                pass
+        finally:
+            self.condition.release()
+            pass
+        return
+
+    def switch(self, stop):
+        """Give the prompt from `stop' to stop.switch_to, and wait for
+        `stop' to become active again."""
+        self.condition.acquire()
+        try:
+            other = stop.switch_to
+            stop.switch_to = None
+            self._activate(other)
+            self._wait_for(stop)
+        finally:
+            self.condition.release()
+            pass
+        return
+
+    def resume_at_breakpoint(self, bp_number):
+        """Have the threads waiting at breakpoint `bp_number' go on
+        running. Return the number of them."""
+        self.condition.acquire()
+        try:
+            count = 0
+            for stop in self.stops:
+                if stop is not self.active and stop.bp_number == bp_number:
+                    stop.resume = True
+                    count += 1
+                    pass
+                pass
+            self.condition.notifyAll()
+        finally:
+            self.condition.release()
+            pass
+        return count
+
+    def find(self, name_or_number):
+        """Return the stop having number, or else thread name,
+        `name_or_number', or None if there is none."""
+        for stop in list(self.stops):
+            if (str(stop.number) == name_or_number or
+                stop.thread_name == name_or_number):
+                return stop
+            pass
+        return None
+
+    def queued(self):
+        """Return a list of the stops in order of arrival."""
+        return list(self.stops)
+
+    def _activate(self, stop):
+        if stop is None or stop not in self.stops or stop.resume:
+            stop = None
+            for waiting in self.stops:
+                if not waiting.resume:
+                    stop = waiting
+                    break
+                pass
+            pass
+        self.active = stop
+        self.condition.notifyAll()
+        return
+
+    def _wait_for(self, stop):
+        while self.active is not stop and not stop.resume:
+            self.condition.wait()
+            pass
+        return
+
+    def __len__(self):
+        return len(self.stops)
+    pass
+
+# Demo it
+if __name__=='__main__':
+    import sys
+    stops = StopQueue()
+    stop = stops.enter(sys._getframe(), 'line', None)
+    print(stop)
+    print(stops.find('1') is stop, stops.find(stop.thread_name) is stop)
+    stops.leave(stop)
+    print(len(stops), stops.active)
+    pass
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2008-2009, 2013-2014 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2008-2009, 2013-2014, 2018 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -51,6 +51,70 @@ def id2thread_name(thread_id):
     return threading.Thread.getName(threading._active[thread_id])
 
 
+def thread_idents(name_or_id):
+    """Return the set of idents of the running threads that
+    `name_or_id' refers to. This is either a thread ident, as shown by
+    "info threads", or a thread name; several threads can have the same
+    name. The set is empty if there is no such thread."""
+    active = dict(threading._active)
+    try:
+        thread_id = int(name_or_id)
+        if thread_id in active:
+            return set([thread_id])
+    except ValueError:
+        pass
+    return set([ident for ident, thread in active.items()
+                if thread.getName() == name_or_id])
+
+
+def thread_id_name(thread_id):
+    """Return a string naming the thread with ident `thread_id'. The
+    thread may have finished, in which case we only have the ident."""
+    thread = threading._active.get(thread_id)
+    if thread is None:
+        return str(thread_id)
+    return '%s (%d)' % (thread.getName(), thread_id)
+
+
+class ThreadTarget:
+    """The one thread to start debugging in: the thread with ident
+    `thread_id', or a thread for which predicate(thread) is true, or
+    both. With neither, any thread will do. The first thread found to
+    be the target claims it, so that only one thread is debugged even
+    when a predicate fits several."""
+
+    def __init__(self, thread_id=None, predicate=None):
+        self.thread_id  = thread_id
+        self.predicate  = predicate
+        self.claimed_by = None
+        self.lock       = threading.Lock()
+        return
+
+    def matches(self, thread):
+        if self.thread_id is not None and thread.ident != self.thread_id:
+            return False
+        return self.predicate is None or self.predicate(thread)
+
+    def claim(self):
+        """Return True if the current thread is the target and no
+        thread has claimed it before."""
+        if self.claimed_by is not None:
+            return False
+        thread = threading.currentThread()
+        if not self.matches(thread):
+            return False
+        self.lock.acquire()
+        try:
+            if self.claimed_by is not None:
+                return False
+            self.claimed_by = thread.ident
+        finally:
+            self.lock.release()
+            pass
+        return True
+    pass
+
+
 def map_thread_names():
     '''Invert threading._active'''
     name2id = {}
@@ -78,6 +142,9 @@ if __name__ == '__main__':
         print('-' * 10)
         print('Thread->id map:')
         print(map_thread_names())
+        print(thread_idents(current_thread_name()))
+        target = ThreadTarget(predicate=lambda t: t.getName() != 'MainThread')
+        print('Claimed: %s' % target.claim())
         print('=' * 10)
     showit()
 
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Counters of what the debugger's trace hook does, so one can tell
+what debugging costs a program."""
+
+from array import array
+
+import tracer
+
+EVENT_NAMES = tracer.ALL_EVENT_NAMES
+EVENT_INDEX = dict([(name, i) for i, name in enumerate(EVENT_NAMES)])
+
+# One trace event in this many is timed. Timing each one would add
+# noticeably to what the trace hook costs.
+SAMPLE_INTERVAL = 64
+
+
+class TraceStats:
+    """Statistics kept by DebuggerCore.trace_dispatch().
+
+    These are plain counters that threads update without locking, so
+    under contention a few counts may be lost.
+
+    `events' has a count for each event name in EVENT_NAMES. Of those
+    events, `ignored' were by frames in the ignore filter, and
+    `rejected' weren't in the "set events" set. `bp_probes' counts
+    full breakpoint lookups, done when a quick check doesn't rule out
+    a breakpoint.
+
+    `stopped_time' is the time spent stopped in the debugger's command
+    loop. The rest of the time spent in the trace hook is estimated
+    from `samples' events, one in SAMPLE_INTERVAL, that took
+    `sample_time' not counting time stopped. `sample_countdown' is
+    the number of events until the next one that is timed. While
+    fast-forwarding through a "step N" or "next N", events are counted
+    but not timed.
+    """
+
+    def __init__(self):
+        self.reset()
+        return
+
+    def reset(self):
+        self.events        = array('l', [0] * len(EVENT_NAMES))
+        self.ignored       = 0
+        self.rejected      = 0
+        self.bp_probes     = 0
+        self.stopped_time  = 0.0
+
+        # The first event is timed, so that there is an estimate
+        # right away.
+        self.sample_countdown = 1
+        self.samples          = 0
+        self.sample_time      = 0.0
+        return
+
+    def as_dict(self, condition_evals=0):
+        """Return the statistics as a dictionary. The time the hook
+        cost the program, not counting time stopped, as estimated from
+        the sampled events, is under key 'overhead_time'; 'dispatch_time'
+        adds the time stopped to that. `condition_evals' is the number
+        of breakpoint condition evaluations, which the breakpoint
+        manager counts."""
+        total_events = sum(self.events)
+        if self.samples:
+            overhead_time = self.sample_time * total_events / self.samples
+        else:
+            overhead_time = 0.0
+            pass
+        return {
+            'events'          : dict(zip(EVENT_NAMES, self.events)),
+            'total_events'    : total_events,
+            'ignored'         : self.ignored,
+            'rejected'        : self.rejected,
+            'bp_probes'       : self.bp_probes,
+            'condition_evals' : condition_evals,
+            'sampled_events'  : self.samples,
+            'dispatch_time'   : overhead_time + self.stopped_time,
+            'stopped_time'    : self.stopped_time,
+            'overhead_time'   : overhead_time,
+            }
+    pass
+
+# Demo it
+if __name__=='__main__':
+    stats = TraceStats()
+    stats.events[EVENT_INDEX['line']] += 2
+    stats.ignored += 1
+    print(stats.as_dict())
+    pass
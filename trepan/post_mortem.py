@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-#   Copyright (C) 2009, 2013-2014 Rocky Bernstein <rocky@gnu.org>
+#   Copyright (C) 2009, 2013-2014, 2018 Rocky Bernstein <rocky@gnu.org>
 #
 #   This program is free software: you can redistribute it and/or modify
 #   it under the terms of the GNU General Public License as published by
@@ -15,13 +15,140 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # Post-Mortem interface
 
-import inspect, os, sys, re, traceback
+import imp, inspect, os, sys, re, threading, time, traceback
 
 # Our local modules
 from trepan import debugger as Mdebugger
 from trepan.exception import DebuggerQuit, DebuggerRestart
 
 
+# The Standby that post_mortem_excepthook() uses, if warm_standby()
+# has been called.
+standby = None
+
+
+class Standby:
+    """A post-mortem debugger that is built ahead of time, so that it
+    doesn't have to be built after the program has crashed.
+
+    Building a Debugger creates its interfaces, core, command
+    processor and commands, and looks at every signal. A Standby is
+    cheap to create; with `background' True, a daemon thread builds the
+    debugger from `dbg_opts' right away. Otherwise, or if the thread
+    hasn't finished, the debugger is built when it is first needed.
+
+    Python only lets the main thread set signal handlers, so a
+    debugger built in the background sets its SIGINT handler when it
+    is first used in the main thread.
+
+    Python 2 has a single import lock, and building the debugger
+    imports modules. So the background thread waits for any import in
+    progress, such as that of a module calling warm_standby(), to be
+    done before it starts. A thread that needs the debugger while it
+    holds the import lock builds one itself rather than wait for the
+    background thread, which may be waiting for it.
+
+    `build_time' is how long building the debugger took, and `latency'
+    the number of seconds from the last post-mortem exception getting
+    to us to the debugger prompt; each is None until known."""
+
+    def __init__(self, dbg_opts=None, background=True):
+        self.dbg_opts   = dbg_opts
+        self.dbg        = None
+        self.build_time = None
+        self.latency    = None
+        self.lock       = threading.Lock()
+        self.thread     = None
+        if background:
+            self.thread = threading.Thread(target=self._build_in_background,
+                                           name='trepan-standby')
+            self.thread.setDaemon(True)
+            self.thread.start()
+            pass
+        return
+
+    def _build(self):
+        """Build a debugger and keep it, unless one has been kept in
+        the meantime. Return the one kept."""
+        start = time.time()
+        dbg = Mdebugger.Debugger(self.dbg_opts)
+        build_time = time.time() - start
+        self.lock.acquire()
+        try:
+            if self.dbg is None:
+                self.dbg = dbg
+                self.build_time = build_time
+                pass
+        finally:
+            self.lock.release()
+            pass
+        return self.dbg
+
+    def _build_in_background(self):
+        while imp.lock_held():
+            time.sleep(0.01)
+            pass
+        if self.dbg is None:
+            self._build()
+            pass
+        return
+
+    def debugger(self):
+        """Return the debugger, building it first if that hasn't been
+        done. If the background thread is building it, wait for that,
+        unless this thread holds the import lock."""
+        thread = self.thread
+        if (self.dbg is None and thread is not None and
+            thread is not threading.currentThread() and
+            not holds_import_lock()):
+            thread.join()
+            pass
+        if self.dbg is None:
+            self._build()
+            pass
+        if isinstance(threading.currentThread(), threading._MainThread):
+            sigmgr = self.dbg.sigmgr
+            if 'SIGINT' in sigmgr.sigs:
+                sigmgr.check_and_adjust_sighandler('SIGINT', sigmgr.sigs)
+                pass
+            pass
+        return self.dbg
+
+    def time_entry(self, dbg, start):
+        """Have the prompt that `dbg' gives next set and report
+        `latency', counting from time `start'."""
+        def preloop_hook(proc):
+            proc.remove_preloop_hook(preloop_hook)
+            self.latency = time.time() - start
+            proc.msg('Post-mortem debugger entered %.3f seconds after '
+                     'the exception.' % self.latency)
+            return False
+        dbg.core.processor.add_preloop_hook(preloop_hook, 0)
+        return
+    pass
+
+
+def holds_import_lock():
+    """Return True if the current thread holds the import lock."""
+    try:
+        imp.release_lock()
+    except RuntimeError:
+        # Not ours
+        return False
+    imp.acquire_lock()
+    return True
+
+
+def warm_standby(dbg_opts=None, background=True):
+    """Have uncaught exceptions go to a post-mortem debugger that is
+    built now, in a background thread if `background' is True, rather
+    than after the exception. Return the Standby."""
+    global standby
+    standby = Standby(dbg_opts, background)
+    sys.excepthook = post_mortem_excepthook
+    return standby
+
+
 def get_last_or_frame_exception():
     """Intended to be used going into post mortem routines.  If
     sys.last_traceback is set, we will return that and assume that
@@ -53,6 +180,7 @@ def pm(frameno=1, dbg=None):
 
 def post_mortem_excepthook(exc_type, exc_value, exc_tb, tb_fn=None):
     if str(exc_type) == str(DebuggerQuit): return
+    start = time.time()
     try:
         if str(exc_type) == str(DebuggerRestart):
             if ( exc_value and exc_value.sys_argv and
@@ -70,7 +198,12 @@ def post_mortem_excepthook(exc_type, exc_value, exc_tb, tb_fn=None):
                 traceback.print_exception(exc_type, exc_value, exc_tb)
             print("Uncaught exception. Entering post-mortem debugger...")
             pass
-        post_mortem((exc_type, exc_value, exc_tb))
+        dbg = None
+        if standby is not None:
+            dbg = standby.debugger()
+            standby.time_entry(dbg, start)
+            pass
+        post_mortem((exc_type, exc_value, exc_tb), dbg=dbg)
         print("Post-mortem debugger finished.")
     except:
         pass
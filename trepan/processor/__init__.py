@@ -12,7 +12,7 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """ Copyright (C) 2008-2009, 2013-2014 Rocky Bernstein <rocky@gnu.org> """
 
-__import__('pkg_resources').declare_namespace(__name__)
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
 
 from trepan import misc as Mmisc
 __all__ = Mmisc.pyfiles(__file__) + ['command']
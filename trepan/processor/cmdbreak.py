@@ -14,16 +14,17 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
+import inspect, re
 import pyficache
 from trepan import misc as Mmisc
+from trepan.lib import thred as Mthread
 from trepan.processor.parse.semantics import build_bp_expr
 from trepan.processor.parse.parser import LocationError
 from trepan.processor.parse.scanner import ScannerError
 from trepan.processor.location import resolve_location
 
 def set_break(cmd_obj, func, filename, lineno, condition, temporary,
-              args, force=False):
+              args, force=False, thread_ids=None):
     if lineno is None:
         part1 = ("I don't understand '%s' as a line number, function name,"
                  % ' '.join(args[1:]))
@@ -48,8 +49,12 @@ def set_break(cmd_obj, func, filename, lineno, condition, temporary,
             else:
                 return False
         pass
-    bp =  cmd_obj.core.bpmgr.add_breakpoint(filename, lineno, temporary,
-                                         condition, func)
+    try:
+        bp =  cmd_obj.core.bpmgr.add_breakpoint(filename, lineno, temporary,
+                                                condition, func, thread_ids)
+    except SyntaxError:
+        cmd_obj.errmsg('Syntax error in condition: %s' % condition)
+        return False
     if func and inspect.isfunction(func):
         cmd_obj.msg('Breakpoint %d set on calling function %s()'
                  % (bp.number, func.func_name))
@@ -66,6 +71,38 @@ def set_break(cmd_obj, func, filename, lineno, condition, temporary,
     return True
 
 INVALID_PARSE_BREAK = (None, None, None, None)
+
+
+def parse_thread_clause(proc, args):
+    """Take a "thread *name-or-id*" clause, which comes after the
+    location and before any "if", out of the break command given by
+    `args' and proc.current_command.
+
+    Return the command arguments without the clause and the set of
+    idents of the threads named, or None for the set if there was no
+    clause. (None, None) is returned after an error message if no
+    running thread goes by that name."""
+    for i in range(1, len(args) - 1):
+        if args[i] == 'if':
+            break
+        if args[i] == 'thread' and (i + 2 == len(args) or
+                                    args[i+2] == 'if'):
+            name_or_id = args[i+1]
+            thread_ids = Mthread.thread_idents(name_or_id)
+            if not thread_ids:
+                proc.errmsg("Don't know about thread %s" % name_or_id)
+                return None, None
+            if proc.current_command is not None:
+                proc.current_command = \
+                  re.sub(r'\s+thread\s+%s(?=\s+if\s|\s*$)' %
+                         re.escape(name_or_id), '', proc.current_command,
+                         count=1)
+                pass
+            return args[:i] + args[i+2:], thread_ids
+        pass
+    return args, None
+
+
 def parse_break_cmd(proc, args):
     if proc.current_command is None:
         proc.errmsg("Internal error")
@@ -16,7 +16,6 @@
 import inspect, linecache, os, sys, shlex, tempfile, traceback, types
 import pyficache
 from repr import Repr
-from pygments.console import colorize
 
 
 from tracer import EVENT2SHORT
@@ -29,7 +28,7 @@ from trepan import misc as Mmisc
 from trepan.lib import file as Mfile
 from trepan.lib import stack as Mstack
 from trepan.lib import thred as Mthread
-from trepan.processor import complete as Mcomplete
+from trepan.processor import complete as Mcomplete, manifest as Mmanifest
 from trepan.processor.cmdfns import deparse_fn, source_tempfile_remap
 from trepan.lib.deparse import deparse_and_cache
 
@@ -99,7 +98,8 @@ def run_hooks(obj, hooks, *args):
 
 def resolve_name(obj, command_name):
     if command_name.lower() not in obj.commands:
-        if command_name in obj.aliases:
+        if (command_name in obj.aliases and
+            obj.aliases[command_name] in obj.commands):
             command_name = obj.aliases[command_name]
             pass
         else:
@@ -291,8 +291,7 @@ class CommandProcessor(Mprocessor.Processor):
         self.event2short['signal'] = '?!'
         self.event2short['brkpt']  = 'xx'
 
-        self.optional_modules = ('ipython', 'bpy')
-        self.cmd_instances    = self._populate_commands()
+        self.optional_modules = Mmanifest.OPTIONAL_COMMANDS
 
         # command argument string. Is like current_command, but the part
         # after cmd_name has been removed.
@@ -385,6 +384,7 @@ class CommandProcessor(Mprocessor.Processor):
                                        ')' * self.debug_nest)
         highlight = self.debugger.settings['highlight']
         if highlight and highlight in ('light', 'dark'):
+            from pygments.console import colorize
             self.prompt_str =  colorize('underline', self.prompt_str)
         self.prompt_str += ' '
 
@@ -827,131 +827,30 @@ class CommandProcessor(Mprocessor.Processor):
         return
 
     def _populate_commands(self):
-        """ Create an instance of each of the debugger
-        commands. Commands are found by importing files in the
-        directory 'command'. Some files are excluded via an array set
-        in __init__.  For each of the remaining files, we import them
-        and scan for class names inside those files and for each class
-        name, we will create an instance of that class. The set of
-        DebuggerCommand class instances form set of possible debugger
-        commands."""
-        import trepan.processor.command as Mcommand
-        if hasattr(Mcommand, '__modules__'):
-            return self.populate_commands_easy_install(Mcommand)
-        else:
-            return self.populate_commands_pip(Mcommand)
-
-    def populate_commands_pip(self, Mcommand):
-        cmd_instances = []
-        eval_cmd_template = 'command_mod.%s(self)'
-        for mod_name in Mcommand.__dict__.keys():
-            if mod_name.startswith('__'): continue
-            import_name = "trepan.processor.command." + mod_name
-            imp = __import__(import_name)
-            if imp.__name__ == 'trepan':
-                command_mod = imp.processor.command
-            else:
-                if mod_name in ('info_sub', 'set_sub', 'show_sub',):
-                    pass
-                try:
-                    command_mod = getattr(__import__(import_name), mod_name)
-                except:
-                    # Don't need to warn about optional modules
-                    if mod_name not in self.optional_modules:
-                        print('Error importing %s: %s' %
-                              (mod_name, sys.exc_info()[0]))
-                        pass
-                    continue
-                pass
-
-            classnames = [ tup[0] for tup in
-                           inspect.getmembers(command_mod, inspect.isclass)
-                           if ('DebuggerCommand' != tup[0] and
-                               tup[0].endswith('Command')) ]
-            for classname in classnames:
-                eval_cmd = eval_cmd_template % classname
-                try:
-                    instance = eval(eval_cmd)
-                    cmd_instances.append(instance)
-                except ImportError:
-                    pass
-                except:
-                    print('Error loading %s from %s: %s' %
-                          (classname, mod_name, sys.exc_info()[0]))
-                    pass
-                pass
-            pass
-        return cmd_instances
-
-    def populate_commands_easy_install(self, Mcommand):
-        cmd_instances = []
-
-        for mod_name in Mcommand.__modules__:
-            if mod_name in ('info_sub', 'set_sub', 'show_sub',):
-                pass
-            import_name = 'trepan.processor.command.' + mod_name
-            try:
-                command_mod = __import__(import_name, None, None, ['*'])
-            except:
-                if mod_name not in self.optional_modules:
-                    print('Error importing %s: %s' %
-                          (mod_name, sys.exc_info()[0]))
-                    pass
-                continue
-
-            classnames = [ tup[0] for tup in
-                           inspect.getmembers(command_mod, inspect.isclass)
-                           if ('DebuggerCommand' != tup[0] and
-                               tup[0].endswith('Command')) ]
-            for classname in classnames:
-                if False:
-                    instance = getattr(command_mod, classname)(self)
-                    cmd_instances.append(instance)
-                else:
-                    try:
-                        instance = getattr(command_mod, classname)(self)
-                        cmd_instances.append(instance)
-                    except:
-                        print('Error loading %s from %s: %s' %
-                              (classname, mod_name, sys.exc_info()[0]))
-                        pass
-                    pass
-                pass
-            pass
-        return cmd_instances
+        """Return a CommandMap of the debugger commands. The names,
+        aliases and categories of the commands come from module
+        manifest, and a command is created from its module when it is
+        first looked up."""
+        return Mmanifest.CommandMap(Mmanifest.COMMANDS,
+                                    'trepan.processor.command',
+                                    lambda cls: cls(self),
+                                    self.optional_modules, self.errmsg)
 
     def _populate_cmd_lists(self):
         """ Populate self.lists and hashes:
         self.commands, and self.aliases, self.category """
-        self.commands = {}
-        self.aliases = {}
-        self.category = {}
-#         self.short_help = {}
-        for cmd_instance in self.cmd_instances:
-            if not hasattr(cmd_instance, 'aliases'): continue
-            alias_names = cmd_instance.aliases
-            cmd_name = cmd_instance.name
-            self.commands[cmd_name] = cmd_instance
-            for alias_name in alias_names:
-                self.aliases[alias_name] = cmd_name
-                pass
-            cat  = getattr(cmd_instance, 'category')
-            if cat and self.category.get(cat):
-                self.category[cat].append(cmd_name)
-            else:
-                self.category[cat] = [cmd_name]
-                pass
-#             sh = getattr(cmd_instance, 'short_help')
-#             if sh:
-#                 self.short_help[cmd_name] = getattr(c, 'short_help')
-#                 pass
-            pass
-        for k in list(self.category.keys()):
-            self.category[k].sort()
-            pass
-
+        self.commands = self._populate_commands()
+        self.aliases  = Mmanifest.aliases()
+        self.category = Mmanifest.categories()
         return
 
+    def _get_cmd_instances(self):
+        return self.commands.values()
+
+    cmd_instances = property(_get_cmd_instances, doc="""
+        A list of all of the debugger commands. All of them get created
+        to make it.""")
+
     pass
 
 # Demo it
@@ -25,6 +25,16 @@ import columnize, re
 from pygments.console import colorize
 
 
+def doc_short_help(doc):
+    """Return the short help of a subcommand that doesn't give one,
+    from its docstring `doc'. That is the first line, or the third
+    when the first shows the syntax in bold."""
+    help = doc.split("\n")
+    if help[0][0] == '*' and len(help) > 2:
+        return help[2]
+    return help[0]
+
+
 # Note: don't end classname with Command (capital C) since cmdproc
 # will think this a command name like QuitCommand
 #                                         ^
@@ -58,12 +68,7 @@ class DebuggerSubcommand:
         self.settings = cmd.debugger.settings
 
         if not hasattr(self, 'short_help'):
-            help = self.__doc__.split("\n")
-            if len(help) > 0:
-                if help[0][0] == '*' and len(help) > 2:
-                    self.short_help = help[2]
-                else:
-                    self.short_help = help[0]
+            self.short_help = doc_short_help(self.__doc__)
             pass
 
         # By default the name of the subcommand will be the name of the
@@ -71,8 +76,10 @@ class DebuggerSubcommand:
         # in "shows.basename"). However it *is* possible for one to change
         # that -- perhaps one may want to put several subcommands into
         # a single file. So in those cases, one will have to set self.name
-        # accordingly by other means.
-        self.name  = self.__module__.split('.')[-1]
+        # accordingly, as a class variable.
+        if 'name' not in self.__class__.__dict__:
+            self.name  = self.__module__.split('.')[-1]
+            pass
 
         return
 
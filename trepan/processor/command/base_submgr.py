@@ -16,7 +16,7 @@
 import inspect, os, re, string, sys
 
 from trepan.processor.command import base_cmd as Mbase_cmd
-from trepan.processor import subcmd as Msubcmd
+from trepan.processor import manifest as Mmanifest, subcmd as Msubcmd
 from trepan.lib import complete as Mcomplete
 
 def abbrev_stringify(name, min_abbrev):
@@ -41,9 +41,17 @@ class SubcommandMgr(Mbase_cmd.DebuggerCommand):
         if name is None: name  = self.__module__.split('.')[-1]
         self.__class__.name = name
 
-        self.cmds = Msubcmd.Subcmd(name, self)
         self.name = name
-        self._load_debugger_subcommands(name)
+        manifest = Mmanifest.SUBCOMMANDS.get(name)
+        if manifest is None:
+            self.cmds = Msubcmd.Subcmd(name, self)
+            self._load_debugger_subcommands(name)
+        else:
+            # Subcommands are created when first used.
+            self.cmds = Msubcmd.Subcmd(name, self,
+                                       'trepan.processor.command.%s_subcmd'
+                                       % name, manifest)
+            pass
         self.proc = proc
 
         return
@@ -173,8 +181,7 @@ class SubcommandMgr(Mbase_cmd.DebuggerCommand):
             for subcmd_name in self.cmds.list():
                 # Some commands have lots of output.
                 # they are excluded here because 'in_list' is false.
-                subcmd = self.cmds.subcmds[subcmd_name]
-                self.summary_help(subcmd_name, subcmd)
+                self.summary_help(subcmd_name)
                 pass
             return False
 
@@ -199,10 +206,11 @@ class SubcommandMgr(Mbase_cmd.DebuggerCommand):
             return self.undefined_subcmd(self.name, subcmd_prefix)
         return  # Not reached
 
-    def summary_help(self, subcmd_name, subcmd):
+    def summary_help(self, subcmd_name):
+        min_abbrev, short_help = self.cmds.summary(subcmd_name)
         self.msg_nocr('  %-12s -- ' %
-                      abbrev_stringify(subcmd_name, subcmd.min_abbrev))
-        self.rst_msg(subcmd.short_help.rstrip("\n"))
+                      abbrev_stringify(subcmd_name, min_abbrev))
+        self.rst_msg(short_help.rstrip("\n"))
         return
     pass
 
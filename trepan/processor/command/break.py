@@ -22,7 +22,7 @@ from trepan.processor import complete as Mcomplete
 
 
 class BreakCommand(Mbase_cmd.DebuggerCommand):
-    """**break** [*location*] [if *condition*]]
+    """**break** [*location*] [**thread** *thread*] [if *condition*]]
 
 Sets a breakpoint, i.e. stopping point just before the
 execution of the instruction specified by *location*.
@@ -36,6 +36,12 @@ If the word `if` is given after *location*, subsequent arguments given
 Without arguments or an empty *location*, the breakpoint is set
 the current stopped location.
 
+If **thread** is given after *location*, only the named thread stops
+there. *thread* is a thread id or a thread name, as shown by `info
+threads`; if several running threads have that name, any of them
+stops. Other threads pass the breakpoint without its condition being
+evaluated.
+
 Normally we only allow stopping at lines that we think are
 stoppable. If the command has a `!` suffix, force the breakpoint anyway.
 
@@ -55,6 +61,8 @@ Examples:
    break os.path:45     # Break on line 45 file holding module os.path
    break myfile.py:2    # Break on line 2 of myfile.py
    break myfile.py:2 if i < j # Same as above but only if i < j
+   break 10 thread Worker-1   # Break on line 10 in thread Worker-1 only
+   break 10 thread Worker-1 if i < j # Same as above but only if i < j
    break "foo's.py":1"  # One way to specify path with a quote
    break 'c:\\foo.bat':1      # One way to specify a Windows file name,
    break '/My Docs/foo.py':1  # One way to specify path with blanks in it
@@ -76,11 +84,15 @@ See also:
 
     def run(self, args):
         force = True if args[0][-1] == '!' else False
+        args, thread_ids = Mcmdbreak.parse_thread_clause(self.proc, args)
+        if args is None:
+            return
         (func, filename, lineno,
          condition) = Mcmdbreak.parse_break_cmd(self.proc, args)
         if not (func == None and filename == None):
             Mcmdbreak.set_break(self, func, filename, lineno, condition,
-                                False, args, force=force)
+                                False, args, force=force,
+                                thread_ids=thread_ids)
         return
 
 # # Demo it
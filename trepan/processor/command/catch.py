@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2018 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from trepan.processor.command import base_cmd as Mbase_cmd
+from trepan.lib import catchpoint as Mcatchpoint
+
+
+class CatchCommand(Mbase_cmd.DebuggerCommand):
+    """**catch** [**uncaught**] *exception* [*exception* ...]
+
+**catch** **clear** [*exception* ...]
+
+**catch**
+
+Stop when an exception of one of the given classes, or of a subclass
+of one, is raised. With **uncaught**, stop only when such an exception
+is about to leave the program because nothing caught it. We then stop
+in the outermost frame of the program, or of the thread, as the
+exception leaves it.
+
+*exception* is an expression giving the class, evaluated once, in
+the current frame, when the catchpoint is set.
+
+**catch clear** removes the catchpoints for the given classes, or
+all catchpoints when none are given. Without arguments, the
+catchpoints are listed.
+
+Only exceptions that a catchpoint is for are looked at, so
+exceptions raised and handled within the program, such as
+*StopIteration* ending a loop, cost little. Note though that all
+frames have to be traced while there is a catchpoint that isn't
+**uncaught**.
+
+Examples:
+---------
+
+   catch KeyError IndexError   # Stop when any of these are raised
+   catch LookupError           # Same as above, and then some
+   catch uncaught ValueError   # Stop if a ValueError goes uncaught
+   catch clear KeyError        # Don't stop for KeyError anymore
+   catch clear                 # Remove all catchpoints
+
+See also:
+---------
+
+`break`, `set events`."""
+
+    category      = 'breakpoints'
+    min_args      = 0
+    max_args      = None
+    name          = os.path.basename(__file__).split('.')[0]
+    need_stack    = False
+    short_help    = 'Stop when an exception is raised or goes uncaught'
+
+    def run(self, args):
+        if len(args) == 1:
+            self.list_catchpoints()
+            return
+        if args[1] == 'clear':
+            self.clear(args[2:])
+            return
+        uncaught = args[1] == 'uncaught'
+        if uncaught:
+            names = args[2:]
+        else:
+            names = args[1:]
+            pass
+        if not names:
+            self.errmsg('Expecting an exception class after "uncaught"')
+            return
+        for name in names:
+            exc_type = self.resolve(name)
+            if exc_type is None:
+                continue
+            if self.core.add_catchpoint(exc_type, uncaught):
+                if uncaught:
+                    self.msg('Catchpoint for uncaught %s set.' %
+                             Mcatchpoint.type_name(exc_type))
+                else:
+                    self.msg('Catchpoint for %s set.' %
+                             Mcatchpoint.type_name(exc_type))
+                    pass
+            else:
+                self.errmsg('There already is a catchpoint for %s.' %
+                            Mcatchpoint.type_name(exc_type))
+                pass
+            pass
+        return
+
+    def clear(self, names):
+        if not names:
+            self.core.clear_catchpoints()
+            self.msg('All catchpoints removed.')
+            return
+        for name in names:
+            exc_type = self.resolve(name)
+            if exc_type is None:
+                continue
+            if self.core.remove_catchpoint(exc_type):
+                self.msg('Catchpoint for %s removed.' %
+                         Mcatchpoint.type_name(exc_type))
+            else:
+                self.errmsg('No catchpoint for %s.' %
+                            Mcatchpoint.type_name(exc_type))
+                pass
+            pass
+        return
+
+    def list_catchpoints(self):
+        catchpoints = self.core.catchpoints
+        if not catchpoints:
+            self.msg('No catchpoints.')
+            return
+        for title, exc_types in (('Raised', catchpoints.raised),
+                                 ('Uncaught', catchpoints.uncaught)):
+            if exc_types:
+                names = sorted([Mcatchpoint.type_name(exc_type)
+                                for exc_type in exc_types])
+                self.msg('%s: %s' % (title, ', '.join(names)))
+                pass
+            pass
+        return
+
+    def resolve(self, name):
+        """Return the exception class that `name' evaluates to, or
+        None after giving an error message."""
+        try:
+            if self.proc.curframe:
+                exc_type = self.proc.eval(name)
+            else:
+                exc_type = eval(name, {})
+                pass
+        except:
+            if not self.proc.curframe:
+                self.errmsg('Cannot evaluate %s' % name)
+                pass
+            return None
+        if not Mcatchpoint.is_exception_class(exc_type):
+            self.errmsg('%s is not an exception class' % name)
+            return None
+        return exc_type
+    pass
+
+if __name__ == '__main__':
+    from trepan import debugger as Mdebugger
+    d = Mdebugger.Debugger()
+    command = CatchCommand(d.core.processor)
+    for args in (['catch'], ['catch', 'KeyError', 'IndexError'],
+                 ['catch', 'uncaught', 'ValueError'], ['catch', 'int'],
+                 ['catch', 'KeyError'], ['catch'],
+                 ['catch', 'clear', 'KeyError'], ['catch'],
+                 ['catch', 'clear'], ['catch']):
+        print(args)
+        command.run(args)
+        pass
+    pass
@@ -57,9 +57,15 @@ See also:
             condition = ' '.join(args[2:])
         else:
             condition = None
+            pass
+        try:
+            bp.set_condition(condition)
+        except SyntaxError:
+            self.errmsg('Syntax error in condition: %s' % condition)
+            return
+        if condition is None:
             self.msg('Breakpoint %d is now unconditional.' % bp.number)
             pass
-        bp.condition = condition
         return
 
 if __name__ == '__main__':
@@ -76,5 +82,6 @@ if __name__ == '__main__':
     brkcmd.run(['break'])
     command.run(['condition', '1'])
     command.run(['condition', '1', 'x', '>', '10'])
+    command.run(['condition', '1', 'x', '>'])
     command.run(['condition', '1'])
     pass
@@ -22,6 +22,8 @@ from trepan.processor import cmdbreak as Mcmdbreak
 class ContinueCommand(Mbase_cmd.DebuggerCommand):
     """**continue** [*location*]
 
+**continue -b**
+
 Leave the debugger read-eval print loop and continue
 execution. Subsequent entry to the debugger however may occur via
 breakpoints or explicit calls, or exceptions.
@@ -29,10 +31,15 @@ breakpoints or explicit calls, or exceptions.
 If *location* is given, a temporary breakpoint is set at that
 position before continuing.
 
+In non-stop mode, **-b** also continues all the other threads waiting
+at the breakpoint we stopped at, without giving each of them the
+prompt. See `info stops`.
+
 Examples:
 ---------
 
     continue          # Continue execution
+    continue -b       # Same, and so do threads stopped at our breakpoint
     continue 5        # Continue with a one-time breakpoint at line 5
     continue basename # Go to os.path.basename if we have basename imported
     continue /usr/lib/python2.7/posixpath.py:110 # Possibly the same as
@@ -42,7 +49,7 @@ Examples:
 See also:
 ---------
 
-`step` `jump`, `next`, `finish` and `help syntax location`
+`step` `jump`, `next`, `finish`, `info stops` and `help syntax location`
 """
 
     category      = 'running'
@@ -55,7 +62,10 @@ See also:
     short_help    = 'Continue execution of debugged program'
 
     def run(self, args):
-        if len(args) > 1:
+        if args[1:] == ['-b']:
+            if not self.continue_breakpoint_herd():
+                return False
+        elif len(args) > 1:
             # FIXME: DRY this code. Better is to hook into tbreak.
             func, filename, lineno, condition = \
               Mcmdbreak.parse_break_cmd(self.proc, args)
@@ -66,6 +76,20 @@ See also:
         self.core.step_ignore = -1
         self.proc.continue_running = True  # Break out of command read loop
         return True
+
+    def continue_breakpoint_herd(self):
+        """Have the threads waiting at our breakpoint go on running."""
+        stop = self.core.stops.active
+        if not self.settings['nonstop'] or stop is None:
+            self.errmsg('"continue -b" needs "set nonstop on".')
+            return False
+        if stop.bp_number is None:
+            self.errmsg('We did not stop at a breakpoint.')
+            return False
+        count = self.core.stops.resume_at_breakpoint(stop.bp_number)
+        self.msg('Continuing %d other thread(s) at breakpoint %d.' %
+                 (count, stop.bp_number))
+        return True
     pass
 
 if __name__ == '__main__':
@@ -17,7 +17,6 @@ import os, sys
 
 # Our local modules
 from trepan.processor.command import base_cmd as Mbase_cmd
-from trepan.lib import stack as Mstack
 
 
 class FinishCommand(Mbase_cmd.DebuggerCommand):
@@ -28,6 +27,10 @@ specified, that many frame levels need to be popped. Note that *yield*
 and exceptions raised my reduce the number of stack frames. Also, if a
 thread is switched, we stop ignoring levels.
 
+When stopped at a *yield* of a generator, `finish` continues until the
+generator yields or returns again after it is resumed, wherever it is
+resumed from.
+
 See the `break` command if you want to stop at a particular point in a
 program."""
 
@@ -57,9 +60,19 @@ program."""
         # print "+++ %d" % levels
         self.core.step_events      = ['return']
         self.core.stop_on_finish   = True
-        self.core.stop_level       = \
-          Mstack.count_frames(self.proc.frame)-levels
-        self.core.last_frame       = self.proc.frame
+        if 1 == levels and self.core.is_at_yield(self.proc.frame):
+            # The generator returns next after it is resumed, from
+            # wherever that is. See core.set_next().
+            self.core.resume_frame = self.proc.frame
+            self.core.stop_level   = None
+            self.core.last_frame   = None
+        else:
+            # Stop on the return out of the frame *levels* up, counting
+            # the current one as 1.
+            self.core.last_level   = self.core.frame_level(self.proc.frame)
+            self.core.stop_level   = self.core.last_level-levels+1
+            self.core.last_frame   = self.proc.frame
+            pass
         self.proc.continue_running = True   # Break out of command read loop
         return True
     pass
@@ -17,6 +17,7 @@
 # Our local modules
 from trepan.processor.command import base_subcmd as Mbase_subcmd
 from trepan.processor import complete as Mcomplete
+from trepan.lib import thred as Mthread
 
 
 class InfoBreak(Mbase_subcmd.DebuggerSubcommand):
@@ -33,7 +34,8 @@ number of the breakpoint.
 
 Also shown are the number of times the breakpoint has been hit,
 when that count is at least one, and any conditions the breakpoint
-has.
+has. For a conditional breakpoint that has been hit, the time spent
+evaluating its condition is shown too.
 
 Example:
 --------
@@ -46,6 +48,8 @@ Example:
             breakpoint already hit 1 time
     3   breakpoint    keep y   at /tmp/fib.py:6
             stop only if x > 0
+            condition evaluation took 0.000012 seconds (0.000004 per hit)
+            breakpoint already hit 3 times
 
 See also:
 ---------
@@ -74,6 +78,16 @@ See also:
                  (bp.number, disp, self.core.filename(bp.filename), bp.line))
         if bp.condition:
             self.msg('\tstop only if %s' % (bp.condition))
+            if bp.hits:
+                self.msg('\tcondition evaluation took %.6f seconds'
+                         ' (%.6f per hit)' %
+                         (bp.condition_time, bp.condition_time / bp.hits))
+                pass
+            pass
+        if bp.thread_ids is not None:
+            self.msg('\tstop only in thread %s' %
+                     ', '.join([Mthread.thread_id_name(thread_id)
+                                for thread_id in sorted(bp.thread_ids)]))
             pass
         if bp.ignore:
             self.msg('\tignore next %d hits' % (bp.ignore))
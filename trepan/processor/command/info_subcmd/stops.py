@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class InfoStops(Mbase_subcmd.DebuggerSubcommand):
+    """**info stops**
+
+In non-stop mode, list the threads that have stopped, in the order
+they stopped, with why they stopped and how long ago. The one marked
+`=>` has the command prompt; the others are waiting for their turn.
+Use `thread` to switch to one of them.
+
+When several threads wait at the same breakpoint, `continue -b`
+continues all of them at once.
+
+Example:
+--------
+
+    (trepan2:Worker-3) info stops
+    => 1 Worker-3 at server.py:120, line breakpoint 1, 2.051s ago
+       2 Worker-7 at server.py:120, line breakpoint 1, 2.049s ago
+       3 MainThread at server.py:88, step, 0.310s ago
+    2 threads at breakpoint 1
+
+See also:
+---------
+
+`thread`, `continue`, `set nonstop`, `set maxstops`, `info threads`
+"""
+
+    min_abbrev = len('sto')  # Min is info sto
+    need_stack = False
+    short_help = "Threads stopped in non-stop mode"
+
+    def run(self, args):
+        stops = self.core.stops
+        queued = stops.queued()
+        if not queued:
+            if not self.settings['nonstop']:
+                self.msg('Not in non-stop mode; see "set nonstop".')
+            else:
+                self.msg('No threads are stopped.')
+                pass
+            return
+        now = time.time()
+        at_bp = {}
+        for stop in queued:
+            if stop is stops.active:
+                prefix = '=> '
+            else:
+                prefix = '   '
+                pass
+            reason = stop.reason
+            if reason.startswith('at '):
+                reason = reason[len('at '):]
+                pass
+            self.msg('%s%d %s at %s:%d, %s, %.3fs ago' %
+                     (prefix, stop.number, stop.thread_name,
+                      self.core.filename(stop.frame.f_code.co_filename),
+                      stop.frame.f_lineno, reason or stop.event,
+                      now - stop.time))
+            if stop.bp_number is not None:
+                at_bp[stop.bp_number] = at_bp.get(stop.bp_number, 0) + 1
+                pass
+            pass
+        for bp_number, count in sorted(at_bp.items()):
+            if count > 1:
+                self.msg('%d threads at breakpoint %d' % (count, bp_number))
+                pass
+            pass
+        if stops.dropped:
+            self.msg('%d more stops were not queued; see "set maxstops".'
+                     % stops.dropped)
+            pass
+        return
+    pass
+
+if __name__ == '__main__':
+    from trepan import debugger as Mdebugger
+    from trepan.processor.command import info as Minfo
+    d = Mdebugger.Debugger()
+    i = Minfo.InfoCommand(d.core.processor)
+    sub = InfoStops(i)
+    sub.run([])
+    pass
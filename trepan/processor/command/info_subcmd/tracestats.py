@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class InfoTraceStats(Mbase_subcmd.DebuggerSubcommand):
+    """**info trace-stats**
+
+Show statistics on the trace events the debugger has handled and the
+time it has taken to handle them. This is what having the debugger
+active costs the program.
+
+The time in the trace hook is estimated from timing one event in 64.
+The time spent stopped in the debugger is not counted in the trace
+hook's overhead. Under "set fastcontinue", calls that can't stop
+aren't traced at all, so their events aren't counted.
+
+Example:
+--------
+
+    (trepan2) info trace-stats
+    Trace events:
+    -------------
+        call           12
+        line           85
+        return         11
+    Events skipped by the ignore filter: 0
+    Events not in the "set events" set: 0
+    Breakpoint lookups: 3
+    Breakpoint condition evaluations: 2
+    Time in the trace hook: 0.002312 seconds (0.000021 per event)
+
+See also:
+---------
+
+`info breakpoints`, `set events`, `set fastcontinue`
+"""
+
+    min_abbrev = len('tr')  # Min is info tr
+    name       = 'trace-stats'
+    need_stack = False
+    short_help = "Statistics on trace events and their cost"
+
+    def run(self, args):
+        stats = self.core.trace_statistics()
+        self.section("Trace events:")
+        for event, count in sorted(stats['events'].items()):
+            if count:
+                self.msg("    %-12s %6d" % (event, count))
+                pass
+            pass
+        self.msg('Events skipped by the ignore filter: %d' %
+                 stats['ignored'])
+        self.msg('Events not in the "set events" set: %d' %
+                 stats['rejected'])
+        self.msg('Breakpoint lookups: %d' % stats['bp_probes'])
+        self.msg('Breakpoint condition evaluations: %d' %
+                 stats['condition_evals'])
+        overhead = stats['overhead_time']
+        if stats['total_events']:
+            self.msg('Time in the trace hook: %.6f seconds (%.6f per event)'
+                     % (overhead, overhead / stats['total_events']))
+        else:
+            self.msg('Time in the trace hook: %.6f seconds' % overhead)
+            pass
+        return
+    pass
+
+if __name__ == '__main__':
+    from trepan import debugger as Mdebugger
+    from trepan.processor.command import info as Minfo
+    d = Mdebugger.Debugger()
+    i = Minfo.InfoCommand(d.core.processor)
+    sub = InfoTraceStats(i)
+    sub.run([])
+    pass
@@ -17,7 +17,7 @@
 demonstrating how the command works.'''
 
 import sys
-from trepan.lib import breakpoint, default
+from trepan.lib import breakpoint, default, stack as Mstack
 
 class MockIO:
     def readline(self, prompt='', add_to_history=False):
@@ -100,8 +100,16 @@ class MockDebuggerCore:
     def set_next(self, frame, step_events=None):
         pass
 
+    def frame_level(self, frame):
+        return Mstack.count_frames(frame)
+
+    def is_at_yield(self, frame):
+        return False
+
     def stop(self): pass
 
+    def settings_changed(self, *names): pass
+
     def canonic(self, filename):
         return filename
 
@@ -122,7 +130,8 @@ class MockDebugger:
     def __init__(self):
         self.intf             = [MockUserInterface()]
         self.core             = MockDebuggerCore(self)
-        self.settings         = default.DEBUGGER_SETTINGS
+        self.settings         = default.probe_terminal(
+            default.DEBUGGER_SETTINGS)
         self.from_ipython     = False
         self.orig_sys_argv    = None
         self.program_sys_argv = []
@@ -41,6 +41,10 @@ With an integer argument, perform `next` that many times. However if
 an exception occurs at this level, or we *return*, *yield* or the
 thread changes, we stop regardless of count.
 
+When stopped at a *yield* of a generator, `next` continues until the
+generator is resumed and stops in it, however deep in the stack it is
+resumed from.
+
 A suffix of `+` on the command or an alias to the command forces to
 move to another line, while a suffix of `-` does the opposite and
 disables the requiring a move to a new line. If no suffix is given,
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class SetCodeBreak(Mbase_subcmd.DebuggerSetBoolSubcommand):
+    """**set codebreak** [ **on** | **off** ]
+
+Set whether line breakpoints work by rewriting code rather than by
+tracing.
+
+When this is on, the code of each function containing an enabled
+line breakpoint is changed to call the debugger at the start of that
+line. If the only breakpoints are such line breakpoints, `continue`
+turns off tracing altogether, so the program runs at full speed until
+it gets to one of them. Deleting or disabling a breakpoint gives the
+function back its original code.
+
+Some breakpoints still need tracing: those outside of any function,
+such as in module-level code, and function breakpoints. Also, a
+breakpoint on the first line of a loop stops only when the loop is
+entered, not on each iteration.
+
+See also:
+---------
+
+`show codebreak`, `break`, `set fastcontinue`
+"""
+    in_list    = True
+    min_abbrev = len('cod')   # Min is "set cod"
+    short_help = "Set rewriting code for line breakpoints"
+
+    def run(self, args):
+        Mbase_subcmd.DebuggerSetBoolSubcommand.run(self, args)
+        self.core.use_code_breakpoints(self.settings['codebreak'])
+        return
+    pass
+
+if __name__ == '__main__':
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+    Mhelper.demo_run(SetCodeBreak)
+    pass
@@ -64,6 +64,7 @@ See also:
             pass
         if [] != eventset:
             self.debugger.settings['printset'] = frozenset(eventset)
+            self.core.settings_changed('printset')
             pass
         return
 
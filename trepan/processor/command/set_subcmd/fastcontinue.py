@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class SetFastContinue(Mbase_subcmd.DebuggerSetBoolSubcommand):
+    """**set fastcontinue** [ **on** | **off** ]
+
+Set whether to skip tracing of function calls that can't stop.
+
+When this is on, each time a function is called we check whether
+execution could possibly stop inside it: is there a breakpoint in the
+function's lines, are we stepping into it, or is there an `until`
+condition or event tracing in effect? If not, no line events are
+traced in that function call, which makes `continue`, and `next` or
+`finish` over a function, run much closer to full speed.
+
+Turn this off if you suspect it of causing a missed stop.
+
+See also:
+---------
+
+`show fastcontinue`, `continue`, `set trace`
+"""
+    in_list    = True
+    min_abbrev = len('fa')    # Min is "set fa"
+    short_help = "Set skipping tracing of calls that can't stop"
+    pass
+
+if __name__ == '__main__':
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+    Mhelper.demo_run(SetFastContinue)
+    pass
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class SetJustMyCode(Mbase_subcmd.DebuggerSetBoolSubcommand):
+    """**set justmycode** [ **on** | **off** ]
+
+Set whether stepping stops only in your own code.
+
+When this is on, `step`, `next` and `finish` don't stop in code from
+the Python standard library or from installed (site-packages)
+packages. Stepping into a library call goes on to the next stop in
+your own code, such as a function of yours that the library calls, or
+the line after the call. Whether a function's code is library code is
+worked out once, from the name of its file.
+
+Unless `set fastcontinue` is off, library code also isn't traced at
+all. Breakpoints in library code still work.
+
+See also:
+---------
+
+`show justmycode`, `step`, `set fastcontinue`
+"""
+    in_list    = True
+    min_abbrev = len('ju')    # Min is "set ju"
+    short_help = "Set stepping only in your own code"
+    pass
+
+if __name__ == '__main__':
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+    Mhelper.demo_run(SetJustMyCode)
+    pass
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+from trepan.processor import cmdfns as Mcmdfns
+
+
+class SetMaxStops(Mbase_subcmd.DebuggerSubcommand):
+    """**set maxstops** *number*
+
+Set the most threads that can be stopped at the same time in non-stop
+mode. A thread that would stop beyond that goes on running instead;
+`info stops` says how many did.
+
+See also:
+---------
+
+`show maxstops`, `set nonstop`, `info stops`"""
+
+    in_list    = True
+    min_abbrev = len('maxsto')  # Need at least "set maxsto"
+    short_help = 'Set the most threads stopped at once in non-stop mode'
+
+    def run(self, args):
+        Mcmdfns.run_set_int(self, ' '.join(args),
+                            "The 'maxstops' command requires a number.",
+                            1, None)
+        return
+    pass
+
+if __name__ == '__main__':
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+    Mhelper.demo_run(SetMaxStops)
+    pass
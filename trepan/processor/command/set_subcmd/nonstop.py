@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class SetNonStop(Mbase_subcmd.DebuggerSetBoolSubcommand):
+    """**set nonstop** [ **on** | **off** ]
+
+Set whether, when a thread stops, the other threads go on running.
+
+Only one thread at a time has the command prompt. With this off,
+another thread that stops waits for the prompt without our knowing
+about it. With this on, its stop is queued: `info stops` shows it,
+and `thread` switches to it. When a stop is continued, the stop that
+has waited longest gets the prompt.
+
+Threads that don't stop run on in either case.
+
+See also:
+---------
+
+`show nonstop`, `info stops`, `thread`, `info threads`
+"""
+    in_list    = True
+    min_abbrev = len('non')    # Min is "set non"
+    short_help = "Set queueing stops of threads while others run"
+    pass
+
+if __name__ == '__main__':
+    from trepan.processor.command.set_subcmd import __demo_helper__ as Mhelper
+    Mhelper.demo_run(SetNonStop)
+    pass
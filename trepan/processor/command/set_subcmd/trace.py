@@ -33,6 +33,11 @@ See also:
     in_list    = True
     min_abbrev = len('trace')  # Must use at least "set trace"
     short_help = "Set event tracing"
+
+    def run(self, args):
+        Mbase_subcmd.DebuggerSetBoolSubcommand.run(self, args)
+        self.core.settings_changed('trace')
+        return
     pass
 
 if __name__ == '__main__':
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class ShowMaxStops(Mbase_subcmd.DebuggerShowIntSubcommand):
+    """**show maxstops**
+
+Show the most threads that can be stopped at the same time in
+non-stop mode.
+
+See also:
+--------
+
+`set maxstops`"""
+    min_abbrev = len('maxsto')
+    short_help = 'Show the most threads stopped at once in non-stop mode'
+    pass
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Our local modules
+from trepan.processor.command import base_subcmd as Mbase_subcmd
+
+
+class ShowNonStop(Mbase_subcmd.DebuggerShowBoolSubcommand):
+    """**show nonstop**
+
+Show whether stops of threads are queued while other threads run.
+
+See also:
+--------
+
+`set nonstop`, `info stops`"""
+    min_abbrev = len('non')  # Min: "show non"
+    short_help = "Show queueing stops of threads while others run"
+    pass
@@ -22,7 +22,7 @@ from trepan.processor import complete as Mcomplete
 
 
 class TempBreakCommand(Mbase_cmd.DebuggerCommand):
-    """**tbreak** [*location*] [**if** *condition*]
+    """**tbreak** [*location*] [**thread** *thread*] [**if** *condition*]
 
 Sets a temporary breakpoint, i.e. one that is removed the after
 the first time it is encountered.
@@ -36,6 +36,9 @@ If the word `if` is given after *location*, subsequent arguments given
 a boolean condition which must evaluate to True before the breakpoint
 is honored.
 
+With **thread**, only the thread or threads with that name or thread
+id stop; see `break`.
+
 Examples:
 ---------
 
@@ -67,10 +70,13 @@ See also:
     complete = Mcomplete.complete_break_linenumber
 
     def run(self, args):
+        args, thread_ids = Mcmdbreak.parse_thread_clause(self.proc, args)
+        if args is None:
+            return
         func, filename, lineno, condition = Mcmdbreak.parse_break_cmd(self.proc, args)
         if not (func == None and filename == None):
             Mcmdbreak.set_break(self, func, filename, lineno, condition,
-                                True, args)
+                                True, args, thread_ids=thread_ids)
         return
 
 # # Demo it
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2018 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from trepan.processor.command import base_cmd as Mbase_cmd
+
+
+class ThreadCommand(Mbase_cmd.DebuggerCommand):
+    """**thread** [*stop-number*|*thread-name*]
+
+In non-stop mode, give the command prompt to another thread that has
+stopped and is waiting its turn. The stop is given by its number, as
+shown by `info stops`, or by the name of its thread.
+
+The thread we are in stays stopped where it is. It gets the prompt
+back, in order of arrival, once a stop that has the prompt is
+continued.
+
+Without an argument, show the stop we are at.
+
+Examples:
+---------
+
+   thread 3          # Go to stop 3
+   thread Worker-1   # Go to where thread Worker-1 is stopped
+
+See also:
+---------
+
+`info stops`, `set nonstop`, `info threads`, `frame`
+"""
+
+    category      = 'running'
+    execution_set = ['Running']
+    min_args      = 0
+    max_args      = 1
+    name          = os.path.basename(__file__).split('.')[0]
+    need_stack    = True
+    short_help    = 'Switch to a stop of another thread'
+
+    def run(self, args):
+        if not self.settings['nonstop']:
+            self.errmsg('Switching threads needs "set nonstop on".')
+            return False
+        stops = self.core.stops
+        current = stops.active
+        if current is None:
+            self.errmsg('We are not at a non-stop stop.')
+            return False
+        if len(args) == 1:
+            self.msg('At stop %s' % current)
+            return False
+        stop = stops.find(args[1])
+        if stop is None:
+            self.errmsg("No stop %s; see \"info stops\"." % args[1])
+            return False
+        if stop is current:
+            self.msg('Already at stop %d.' % stop.number)
+            return False
+        current.switch_to = stop
+        self.msg('Switching to stop %s' % stop)
+        self.proc.continue_running = True  # Break out of command read loop
+        return True
+    pass
+
+if __name__ == '__main__':
+    from trepan import debugger as Mdebugger
+    d = Mdebugger.Debugger()
+    command = ThreadCommand(d.core.processor)
+    command.run(['thread'])
+    d.settings['nonstop'] = True
+    command.run(['thread'])
+    pass
@@ -0,0 +1,579 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2018 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""What the debugger commands are, without importing them.
+
+The command processor knows the names, aliases and categories of the
+commands from here, and the info, set and show commands know their
+subcommands. A command's module is imported only when the command is
+first needed: when it is run, completed, or asked for help.
+
+When adding, removing or changing a command or subcommand, update
+COMMANDS or SUBCOMMANDS. Running this file prints what they should
+be; test/unit/test-manifest.py checks that they match the modules."""
+
+import sys
+
+# Command name -> (module in trepan.processor.command, class name,
+#                  aliases, category, short help)
+COMMANDS = {
+    'alias': ('alias', 'AliasCommand',
+        (),
+        'support', 'Add an alias for a debugger command'),
+    'backtrace': ('backtrace', 'BacktraceCommand',
+        ('bt', 'where'),
+        'stack', 'Print backtrace of stack frames'),
+    'bpy': ('bpy', 'PythonCommand',
+        ('bpython',),
+        'support', 'Run bpython as a command subshell'),
+    'break': ('break', 'BreakCommand',
+        ('b', 'break!', 'b!'),
+        'breakpoints', 'Set breakpoint at specified line or function'),
+    'catch': ('catch', 'CatchCommand',
+        (),
+        'breakpoints', 'Stop when an exception is raised or goes uncaught'),
+    'cd': ('cd', 'CDCommand',
+        ('chdir',),
+        'files', 'Set working directory to DIR for debugger and program being debugged'),
+    'clear': ('clear', 'ClearCommand',
+        (),
+        'breakpoints', 'Remove all breakpoints on a line'),
+    'condition': ('condition', 'ConditionCommand',
+        ('cond',),
+        'breakpoints', 'Specify breakpoint number N to break only if COND is True'),
+    'continue': ('continue', 'ContinueCommand',
+        ('c',),
+        'running', 'Continue execution of debugged program'),
+    'debug': ('debug', 'DebugCommand',
+        (),
+        'support', 'Debug PYTHON-EXPR'),
+    'delete': ('delete', 'DeleteCommand',
+        ('delete!',),
+        'breakpoints', 'Delete some breakpoints or auto-display expressions'),
+    'deparse': ('deparse', 'DeparseCommand',
+        (),
+        'data', 'Deparse source via uncompyle6'),
+    'deval': ('deval', 'DEvalCommand',
+        ('deval?',),
+        'data', 'Print value of deparsed expression'),
+    'disable': ('disable', 'DisableCommand',
+        (),
+        'breakpoints', 'Disable some breakpoints'),
+    'disassemble': ('disassemble', 'DisassembleCommand',
+        ('disasm',),
+        'data', 'Disassemble Python bytecode'),
+    'display': ('display', 'DisplayCommand',
+        (),
+        'data', 'Display expressions when entering debugger'),
+    'down': ('down', 'DownCommand',
+        (),
+        'stack', 'Move stack frame to a more recent selected frame'),
+    'edit': ('edit', 'EditCommand',
+        ('ed',),
+        'files', 'Edit specified file or module'),
+    'enable': ('enable', 'EnableCommand',
+        ('en',),
+        'breakpoints', 'Enable some breakpoints'),
+    'eval': ('eval', 'EvalCommand',
+        ('eval?', '?'),
+        'data', 'Print value of expression EXP'),
+    'examine': ('examine', 'ExamineCommand',
+        ('x',),
+        'data', 'Examine value, type, and object attributes of an expression'),
+    'exit': ('exit', 'ExitCommand',
+        (),
+        'support', 'Exit program via sys.exit()'),
+    'finish': ('finish', 'FinishCommand',
+        ('fin',),
+        'running', 'Execute until selected stack frame returns'),
+    'frame': ('frame', 'FrameCommand',
+        (),
+        'stack', 'Select and print a stack frame'),
+    'handle': ('handle', 'HandleCommand',
+        (),
+        'running', 'Specify how to handle a signal'),
+    'help': ('help', 'HelpCommand',
+        ('?',),
+        'support', 'Print commands or give help for command(s)'),
+    'info': ('info', 'InfoCommand',
+        ('i',),
+        'status', 'Information about debugged program and its environment'),
+    'ipython': ('ipython', 'IPythonCommand',
+        (),
+        'support', 'Run IPython as a command subshell'),
+    'jump': ('jump', 'JumpCommand',
+        ('j',),
+        'running', 'Set the next line to be executed'),
+    'kill': ('kill', 'KillCommand',
+        ('kill!',),
+        'running', 'Send this process a POSIX signal ("9" for "kill -9")'),
+    'list': ('list', 'ListCommand',
+        ('l',),
+        'files', 'List source code'),
+    'macro': ('macro', 'MacroCommand',
+        (),
+        'support', 'Define a macro'),
+    'next': ('next', 'NextCommand',
+        ('next+', 'next-', 'n', 'n-', 'n+'),
+        'running', 'Step program without entering called functions'),
+    'p': ('p', 'PCommand',
+        ('print', 'pr'),
+        'data', 'Print value of expression EXP'),
+    'pdef': ('pdef', 'PrintDefCommand',
+        (),
+        'data', 'Print the definition header for a callable object'),
+    'pp': ('pp', 'PrettyPrintCommand',
+        (),
+        'data', 'Pretty print value of expression EXP'),
+    'pydocx': ('pydocx', 'PyDocCommand',
+        (),
+        'data', 'Run pydoc'),
+    'python': ('python', 'PythonCommand',
+        ('py', 'shell'),
+        'support', 'Run Python as a command subshell'),
+    'quit': ('quit', 'QuitCommand',
+        ('q', 'quit!'),
+        'running', 'Terminate the program - gently'),
+    'restart': ('restart', 'RestartCommand',
+        (),
+        'running', '(Hard) restart of program via execv()'),
+    'run': ('run', 'RunCommand',
+        ('R',),
+        'running', '(Soft) restart program via a DebuggerRestart exception'),
+    'set': ('set', 'SetCommand',
+        (),
+        'data', 'Modify parts of the debugger environment'),
+    'show': ('show', 'ShowCommand',
+        (),
+        'status', 'Show parts of the debugger environment'),
+    'skip': ('skip', 'SkipCommand',
+        ('sk',),
+        'running', 'Skip lines to be executed'),
+    'source': ('source', 'SourceCommand',
+        (),
+        'support', 'Read and run debugger commands from a file'),
+    'step': ('step', 'StepCommand',
+        ('step+', 'step-', 'step>', 'step<', 'step!', 's', 's+', 's-', 's<', 's>', 's!'),
+        'running', 'Step program (possibly entering called functions)'),
+    'tbreak': ('tbreak', 'TempBreakCommand',
+        (),
+        'breakpoints', 'Set temporary breakpoint at specified line or function'),
+    'thread': ('thread', 'ThreadCommand',
+        (),
+        'running', 'Switch to a stop of another thread'),
+    'unalias': ('unalias', 'UnaliasCommand',
+        (),
+        'support', 'Remove an alias'),
+    'undisplay': ('undisplay', 'UndisplayCommand',
+        ('und',),
+        'data', 'Cancel some expressions to be displayed when program stops'),
+    'up': ('up', 'UpCommand',
+        (),
+        'stack', 'Move frame in the direction of the caller of the last-selected frame'),
+    'whatis': ('whatis', 'WhatisCommand',
+        (),
+        'data', 'Print data type of expression EXP'),
+}
+
+# Commands whose module needs a package that may not be installed.
+# We find out whether they exist by trying to import them.
+OPTIONAL_COMMANDS = ('bpy', 'ipython')
+
+# Command with subcommands -> subcommand name ->
+#   (module in trepan.processor.command.<command>_subcmd, class name,
+#    minimum abbreviation, short help)
+SUBCOMMANDS = {
+    'info': {
+        'args': ('args', 'InfoArgs',
+            1, 'Argument variables of the current stack frame'),
+        'break': ('break', 'InfoBreak',
+            1, 'Status of user-settable breakpoints'),
+        'builtins': ('builtins', 'InfoBuiltins',
+            2, 'Show the builtins for current stack frame'),
+        'code': ('code', 'InfoCode',
+            2, 'Show detailed info about the Python code object'),
+        'display': ('display', 'InfoDisplay',
+            2, 'Expressions to display when program stops'),
+        'files': ('files', 'InfoFiles',
+            2, 'Show information about an imported or loaded Python file'),
+        'frame': ('frame', 'InfoFrame',
+            2, 'Show detailed info about the current frame'),
+        'globals': ('globals', 'InfoGlobals',
+            2, "Show the debugged programs's global variables"),
+        'line': ('line', 'InfoLine',
+            2, 'Show current-line information'),
+        'locals': ('locals', 'InfoLocals',
+            2, 'Show the local variables of current stack frame'),
+        'macro': ('macro', 'InfoMacro',
+            1, 'List of defined macros'),
+        'pc': ('pc', 'InfoPC',
+            2, 'Show Program Counter or Instruction Offset information'),
+        'program': ('program', 'InfoProgram',
+            1, 'Execution status of the program'),
+        'return': ('return', 'InfoReturn',
+            1, 'Show function return value'),
+        'signals': ('signals', 'InfoSignals',
+            3, 'What debugger does when program gets various signals'),
+        'source': ('source', 'InfoSource',
+            1, 'Information about the current Python file'),
+        'stops': ('stops', 'InfoStops',
+            3, 'Threads stopped in non-stop mode'),
+        'threads': ('threads', 'InfoThread',
+            2, 'List thread info'),
+        'trace-stats': ('tracestats', 'InfoTraceStats',
+            2, 'Statistics on trace events and their cost'),
+    },
+    'set': {
+        'autoeval': ('autoeval', 'SetAutoEval',
+            5, 'Evaluate unrecognized debugger commands.'),
+        'autolist': ('autolist', 'SetAutoList',
+            5, 'Run the `list` command every time we enter the debugger.'),
+        'autopython': ('autopython', 'SetAutoPython',
+            6, 'Go into a python on debugger entry.'),
+        'basename': ('basename', 'SetBasename',
+            2, 'Set basename (short filenames) in debugger output.'),
+        'cmdtrace': ('cmdtrace', 'SetCmdtrace',
+            4, 'Set echoing lines read from debugger command files'),
+        'codebreak': ('codebreak', 'SetCodeBreak',
+            3, 'Set rewriting code for line breakpoints'),
+        'confirm': ('confirm', 'SetConfirm',
+            2, 'Set confirmation of potentially dangerous operations.'),
+        'dbg_trepan': ('dbg_trepan', 'SetCmdDbgTrepan',
+            3, 'Set the ability to debug the debugger.'),
+        'different': ('different', 'SetDifferent',
+            3, 'Set different line location between consecutive debugger stops.'),
+        'events': ('events', 'SetEvents',
+            2, 'Set execution-tracing event set'),
+        'fastcontinue': ('fastcontinue', 'SetFastContinue',
+            2, "Set skipping tracing of calls that can't stop"),
+        'flush': ('flush', 'SetFlush',
+            3, 'Set flushing output after each write'),
+        'highlight': ('highlight', 'SetHighlight',
+            2, 'Set whether we use terminal highlighting'),
+        'justmycode': ('justmycode', 'SetJustMyCode',
+            2, 'Set stepping only in your own code'),
+        'listsize': ('listsize', 'SetListSize',
+            3, 'Set the number lines printed in a *list* command by default'),
+        'maxstops': ('maxstops', 'SetMaxStops',
+            6, 'Set the most threads stopped at once in non-stop mode'),
+        'maxstring': ('maxstring', 'SetMaxString',
+            3, 'Set maximum characters in showing strings'),
+        'nonstop': ('nonstop', 'SetNonStop',
+            3, 'Set queueing stops of threads while others run'),
+        'skip': ('skip', 'SetSkip',
+            2, 'Set stopping before def or class statements'),
+        'style': ('style', 'SetStyle',
+            3, 'Set the pygments style'),
+        'substitute': ('substitute', 'SetSubstitute',
+            3, 'Set filename substitution'),
+        'trace': ('trace', 'SetTrace',
+            5, 'Set event tracing'),
+        'width': ('width', 'SetWidth',
+            3, 'Set the width of the terminal'),
+    },
+    'show': {
+        'aliases': ('aliases', 'ShowAliases',
+            2, 'Show command aliases'),
+        'args': ('args', 'ShowArgs',
+            3, 'Show arguments when program is started'),
+        'autoeval': ('autoeval', 'ShowAutoEval',
+            5, 'Show Python evaluation of unrecognized debugger commands.'),
+        'autolist': ('autolist', 'ShowAutoList',
+            5, 'Show `list` on debugger entry'),
+        'autopython': ('autopython', 'ShowAutoPython',
+            6, 'Show automatic Python shell entry'),
+        'basename': ('basename', 'ShowBasename',
+            2, 'Show the basename portion only of filenames'),
+        'cmdtrace': ('cmdtrace', 'ShowCmdtrace',
+            4, 'Show debugger commands before running them'),
+        'codebreak': ('codebreak', 'ShowCodeBreak',
+            3, 'Show rewriting code for line breakpoints'),
+        'confirm': ('confirm', 'ShowConfirm',
+            3, 'Show confirmation of potentially dangerous operations'),
+        'dbg_trepan': ('dbg_trepan', 'ShowDbgTrepan',
+            4, 'Show debugging the debugger'),
+        'different': ('different', 'ShowDifferent',
+            3, 'Show whether stop on different file/line positions'),
+        'events': ('events', 'ShowEvents',
+            2, 'Show the kinds of events the debugger will stop on'),
+        'fastcontinue': ('fastcontinue', 'ShowFastContinue',
+            2, "Show skipping tracing of calls that can't stop"),
+        'flush': ('flush', 'ShowFlush',
+            3, 'Show confirmation of potentially dangerous operations'),
+        'highlight': ('highlight', 'ShowHighlight',
+            1, 'Show if we use terminal highlight'),
+        'justmycode': ('justmycode', 'ShowJustMyCode',
+            2, 'Show stepping only in your own code'),
+        'listsize': ('listsize', 'ShowListSize',
+            3, 'Show number of lines in `list`'),
+        'maxstops': ('maxstops', 'ShowMaxStops',
+            6, 'Show the most threads stopped at once in non-stop mode'),
+        'maxstring': ('maxstring', 'ShowMaxString',
+            4, 'Show max string length printed'),
+        'nonstop': ('nonstop', 'ShowNonStop',
+            3, 'Show queueing stops of threads while others run'),
+        'skip': ('skip', 'ShowSkip',
+            2, 'Show whether debugger steps over lines which define functions and classes'),
+        'style': ('style', 'ShowStyle',
+            3, 'Set the pygments style'),
+        'trace': ('trace', 'ShowTrace',
+            2, 'Show event tracing'),
+        'width': ('width', 'ShowWidth',
+            2, 'Show terminal width'),
+    },
+}
+
+
+def aliases():
+    """Return a dictionary mapping alias names to command names. When
+    commands share an alias, the first one by name gets it."""
+    alias2name = {}
+    for name in sorted(COMMANDS.keys(), reverse=True):
+        for alias in COMMANDS[name][2]:
+            alias2name[alias] = name
+            pass
+        pass
+    return alias2name
+
+
+def categories():
+    """Return a dictionary mapping category names to a sorted list of
+    the names of the commands in it."""
+    category2names = {}
+    for name in sorted(COMMANDS.keys()):
+        category2names.setdefault(COMMANDS[name][3], []).append(name)
+        pass
+    return category2names
+
+
+class CommandMap:
+    """Commands or subcommands by name, as a dictionary would have
+    them. A command is only created, and its module imported, the
+    first time it is looked up. Which commands there are comes from
+    `manifest', like COMMANDS or a dictionary of SUBCOMMANDS, whose
+    entries start with the module in `package' and the class name.
+    make(cls) creates a command of class `cls'.
+
+    Commands in `optional' need packages that may not be installed. We
+    find out if they are there by creating them when asked. A command
+    that isn't optional but can't be loaded is reported through
+    errmsg(), or if there is none the error is raised."""
+
+    def __init__(self, manifest, package, make, optional=(), errmsg=None):
+        self.manifest  = dict(manifest)  # Commands not created yet
+        self.package   = package
+        self.make      = make
+        self.instances = {}              # Commands created
+        self.optional  = optional
+        self.errmsg    = errmsg
+        return
+
+    def __getitem__(self, name):
+        instance = self.instances.get(name)
+        if instance is None:
+            instance = self._create(name)
+            pass
+        return instance
+
+    def __setitem__(self, name, instance):
+        self.instances[name] = instance
+        self.manifest.pop(name, None)
+        return
+
+    def __delitem__(self, name):
+        if name in self.instances:
+            del self.instances[name]
+        else:
+            del self.manifest[name]
+            pass
+        return
+
+    def __contains__(self, name):
+        if name in self.instances:
+            return True
+        if name not in self.manifest:
+            return False
+        if name in self.optional:
+            return self.get(name) is not None
+        return True
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+        return  # Not reached
+
+    def keys(self):
+        for name in self.optional:
+            if name in self.manifest:
+                self.get(name)
+                pass
+            pass
+        return list(self.instances.keys()) + list(self.manifest.keys())
+
+    def values(self):
+        return [self[name] for name in self.keys()]
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+    def created(self):
+        """Return the names of the commands created so far."""
+        return list(self.instances.keys())
+
+    def short_help(self, name):
+        """Return the short help of command `name', from the command
+        if it has been created, or else from its manifest entry, which
+        ends with it. This way listing commands doesn't create them."""
+        if name in self.instances:
+            return self.instances[name].short_help
+        return self.manifest[name][-1]
+
+    def _create(self, name):
+        """Import the module of command `name' and create the
+        command. If that fails, we forget about the command, and raise
+        KeyError as though it never was."""
+        module_name, classname = self.manifest[name][:2]
+        import_name = self.package + '.' + module_name
+        try:
+            command_mod = __import__(import_name, None, None, ['*'])
+            cls = getattr(command_mod, classname)
+        except (ImportError, AttributeError):
+            # Don't need to warn about optional modules
+            if name not in self.optional:
+                if self.errmsg is None:
+                    raise
+                self.errmsg('Error loading %s from %s: %s' %
+                            (classname, module_name, sys.exc_info()[1]))
+                pass
+            del self.manifest[name]
+            raise KeyError(name)
+        instance = self.make(cls)
+        self[name] = instance
+        return instance
+    pass
+
+
+
+
+def describe_module(package, module_name, class_test):
+    """Import `module_name' from `package' and return a list of
+    (name, module_name, class name, aliases, category, short help)
+    for each of its classes that class_test() accepts, as a manifest
+    entry for it would have."""
+    import inspect
+    mod = __import__(package + '.' + module_name, None, None, ['*'])
+    entries = []
+    for classname, cls in inspect.getmembers(mod, inspect.isclass):
+        if cls.__module__ != mod.__name__ or not class_test(classname):
+            continue
+        if cls.__dict__.get('name') is None:
+            name = module_name
+        else:
+            name = cls.name
+            pass
+        entries.append((name, module_name, classname,
+                        tuple(getattr(cls, 'aliases', ())),
+                        getattr(cls, 'category', None),
+                        getattr(cls, 'short_help', None)))
+        pass
+    return entries
+
+
+def command_entries():
+    """Return manifest entries, as describe_module() gives, for the
+    command modules that can be imported here."""
+    from trepan.processor import command as Mcommand
+    entries = []
+    for module_name in sorted(Mcommand.__modules__):
+        try:
+            entries += describe_module(
+                'trepan.processor.command', module_name,
+                lambda classname: (classname != 'DebuggerCommand' and
+                                   classname.endswith('Command')))
+        except ImportError:
+            pass
+        pass
+    return entries
+
+
+def subcommand_entries(cmd_name):
+    """Return manifest entries (name, module name, class name, minimum
+    abbreviation, short help) for the subcommands of command
+    `cmd_name'."""
+    from trepan.processor.command import base_subcmd as Mbase_subcmd
+    package = 'trepan.processor.command.%s_subcmd' % cmd_name
+    mod = __import__(package, None, None, ['*'])
+    class_prefix = cmd_name.capitalize()
+    entries = []
+    for module_name in sorted(mod.__modules__):
+        for entry in describe_module(package, module_name,
+                                     lambda classname:
+                                     classname.startswith(class_prefix)):
+            cls = getattr(sys.modules[package + '.' + module_name],
+                          entry[2])
+            short_help = entry[5]
+            if short_help is None:
+                short_help = Mbase_subcmd.doc_short_help(cls.__doc__)
+                pass
+            entries.append((entry[0], module_name, entry[2],
+                            cls.min_abbrev, short_help))
+            pass
+        pass
+    return entries
+
+
+def format_entries(entries, indent='    '):
+    """Format `entries' as the contents of a manifest dictionary."""
+    lines = []
+    for entry in sorted(entries):
+        lines.append(indent + '%r: (%r, %r,' % entry[:3])
+        for i in range(3, len(entry) - 2):
+            lines.append(indent + '    %r,' % (entry[i],))
+            pass
+        lines.append(indent + '    %r, %r),' % entry[-2:])
+        pass
+    return '\n'.join(lines)
+
+
+def format_subcommands():
+    """Format the contents of SUBCOMMANDS."""
+    lines = []
+    for cmd_name in sorted(SUBCOMMANDS.keys()):
+        lines.append('    %r: {' % cmd_name)
+        lines.append(format_entries(subcommand_entries(cmd_name),
+                                    indent='        '))
+        lines.append('    },')
+        pass
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    entries = command_entries()
+    found = set([entry[0] for entry in entries])
+    for name in OPTIONAL_COMMANDS:
+        if name not in found and name in COMMANDS:
+            entries.append((name,) + COMMANDS[name])
+            pass
+        pass
+    print('COMMANDS = {\n%s\n}' % format_entries(entries))
+    print('SUBCOMMANDS = {\n%s\n}' % format_subcommands())
+    pass
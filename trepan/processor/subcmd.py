@@ -15,25 +15,68 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Handles gdb-like subcommand processing."""
 
+from trepan.processor import manifest as Mmanifest
+
 
 class Subcmd:
-    """Gdb-like subcommand handling """
-    def __init__(self, name, cmd_obj):
+    """Gdb-like subcommand handling.
+
+    If `manifest' is given, it is a dictionary of SUBCOMMANDS in
+    module manifest: the subcommands in it are created from their
+    modules in `package' when they are first looked up."""
+    def __init__(self, name, cmd_obj, package=None, manifest=None):
+        if manifest is None: manifest = {}
         self.name    = name
         self.cmd_obj = cmd_obj
-        self.subcmds = {}
+        self.subcmds = Mmanifest.CommandMap(manifest, package,
+                                            lambda cls: cls(cmd_obj),
+                                            errmsg=cmd_obj.errmsg)
         self.cmdlist = []
+
+        # Subcommand name -> (minimum abbreviation, short help)
+        self.summaries = {}
+
+        # Every abbreviation that may be used for a subcommand ->
+        # subcommand name. See _add_abbrevs().
+        self.abbrevs = {}
+        for subcmd_name, entry in manifest.items():
+            self._add_name(subcmd_name, entry[2], entry[3])
+            pass
         return
 
     def lookup(self, subcmd_prefix):
         """Find subcmd in self.subcmds"""
-        for subcmd_name in list(self.subcmds.keys()):
-            if subcmd_name.startswith(subcmd_prefix) \
-               and len(subcmd_prefix) >= \
-               self.subcmds[subcmd_name].__class__.min_abbrev:
-                return self.subcmds[subcmd_name]
+        subcmd_name = self.abbrevs.get(subcmd_prefix)
+        if subcmd_name is None:
+            return None
+        return self.subcmds.get(subcmd_name)
+
+    def summary(self, subcmd_name):
+        """Return the minimum abbreviation and the short help of
+        subcommand `subcmd_name', without creating it."""
+        return self.summaries[subcmd_name]
+
+    def _add_name(self, subcmd_name, min_abbrev, short_help):
+        self.summaries[subcmd_name] = (min_abbrev, short_help)
+        self.cmdlist.append(subcmd_name)
+        self._add_abbrevs(subcmd_name, min_abbrev)
+        return
+
+    def _add_abbrevs(self, subcmd_name, min_abbrev):
+        """Enter each prefix of `subcmd_name' at least `min_abbrev'
+        long into self.abbrevs. Should several subcommands share an
+        abbreviation, a subcommand's full name is for that subcommand,
+        otherwise the first subcommand by name gets it."""
+        for i in range(max(min_abbrev, 1), len(subcmd_name) + 1):
+            prefix = subcmd_name[:i]
+            other = self.abbrevs.get(prefix)
+            if (other is None or
+                (other != prefix and
+                 (prefix == subcmd_name or subcmd_name < other))):
+                self.abbrevs[prefix] = subcmd_name
+                pass
             pass
-        return None
+        return
 
     def short_help(self, subcmd_cb, subcmd_name, label=False):
         """Show short help for a subcommand."""
@@ -67,7 +110,8 @@ class Subcmd:
         self.subcmds[subcmd_name] = subcmd_cb
 
         # We keep a list of subcommands to assist command completion
-        self.cmdlist.append(subcmd_name)
+        self._add_name(subcmd_name, subcmd_cb.__class__.min_abbrev,
+                       getattr(subcmd_cb, 'short_help', ''))
 
     def run(self, subcmd_name, arg):
         """Run subcmd_name with args using obj for the environent"""
@@ -102,9 +146,7 @@ List of %s subcommands:
                                 % (self.name, subcmd_prefix))
 
     def list(self):
-        l = list(self.subcmds.keys())
-        l.sort()
-        return l
+        return sorted(self.subcmds.keys())
 
     def undefined_subcmd(self, cmd, subcmd):
         """Error message when a subcommand doesn't exist"""
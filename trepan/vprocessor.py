@@ -15,7 +15,6 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 NotImplementedMessage = "This method must be overriden in a subclass"
 
-from pygments.console import colorize
 
 __all__ = ['Processor']
 
@@ -39,6 +38,7 @@ class Processor:
     def errmsg(self, message, opts={}):
         """ Convenience short-hand for self.intf[-1].errmsg """
         if 'plain' != self.debugger.settings['highlight']:
+            from pygments.console import colorize
             message = colorize('standout', message)
             pass
         return(self.intf[-1].errmsg(message))
@@ -64,6 +64,7 @@ class Processor:
 
     def section(self, message, opts={}):
         if 'plain' != self.settings('highlight'):
+            from pygments.console import colorize
             message = colorize('bold', message)
             pass
         return self.msg(message, opts)